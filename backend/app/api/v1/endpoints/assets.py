@@ -126,7 +126,7 @@ async def create_asset(
     asset_data = request.dict(exclude_unset=True)
 
     # Create asset
-    result = asset_service.create_asset(asset_data)
+    result = await asset_service.create_asset(asset_data)
 
     return AssetCreateResponse(**result)
 
@@ -3,14 +3,18 @@ Dashboard API Endpoints
 Provides statistics and monitoring data for the AI Security Operations Cockpit
 """
 
+import logging
 from typing import Optional
-from fastapi import APIRouter, HTTPException, Header
+from fastapi import APIRouter, HTTPException, Header, WebSocket, WebSocketDisconnect
 from pydantic import BaseModel
 from ....services.dashboard_service import DashboardService
+from ....services.cockpit_publisher import cockpit_publisher
 
 
 router = APIRouter()
 
+logger = logging.getLogger(__name__)
+
 
 class StatisticsResponse(BaseModel):
     """Response model for dashboard statistics"""
@@ -133,6 +137,51 @@ async def get_monitoring_status(
         )
 
 
+@router.websocket("/ws")
+async def cockpit_updates(websocket: WebSocket):
+    """
+    WebSocket 端点 - 推送驾驶舱数据
+
+    The client first sends {"type": "subscribe", "auth_code": ..., "base_url": ...,
+    "time_range": "week" | "month"} (credentials travel in the message, not the URL).
+    The server replies with {"type": "snapshot", "statistics": {...}, "monitoring": {...}}
+    and then pushes {"type": "delta", ...} with only the changed fields.
+
+    Args:
+        websocket: WebSocket 连接
+    """
+    await websocket.accept()
+    topic = None
+    try:
+        message = await websocket.receive_json()
+        auth_code = message.get("auth_code")
+        base_url = message.get("base_url")
+        time_range = message.get("time_range", "week")
+        if time_range not in ["week", "month"]:
+            time_range = "week"
+
+        if message.get("type") != "subscribe" or not auth_code or not base_url:
+            await websocket.send_json({
+                "type": "error",
+                "message": "First message must be a subscribe request with auth_code and base_url"
+            })
+            await websocket.close(code=1008)
+            return
+
+        topic = await cockpit_publisher.subscribe(websocket, auth_code, base_url, time_range)
+
+        while True:
+            # 保持连接活跃
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.warning("Cockpit WebSocket error: %s", e)
+    finally:
+        if topic is not None:
+            cockpit_publisher.unsubscribe(topic, websocket)
+
+
 @router.get("/health")
 async def health_check():
     """Health check endpoint for the dashboard service"""
@@ -3,9 +3,9 @@ IP Block API Endpoints
 Provides REST API for IP blocking operations
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter
 from typing import Optional, List
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from ....services.ipblock_service import IpBlockService
 
@@ -16,6 +16,7 @@ router = APIRouter()
 # Request/Response Models
 class CheckIPRequest(BaseModel):
     ip: str
+    fresh: bool = False  # True: skip the local rule index and query live
     auth_code: Optional[str] = None
     ak: Optional[str] = None
     sk: Optional[str] = None
@@ -47,10 +48,28 @@ class BlockIPRequest(BaseModel):
     flux_base_url: str
 
 
+class BlockIPsBatchRequest(BaseModel):
+    ips: List[str] = Field(..., max_length=IpBlockService.BLOCK_IPS_MAX_PER_REQUEST)
+    device_id: int
+    device_name: str
+    device_type: str = "AF"
+    device_version: str = ""
+    block_type: str = "SRC_IP"
+    time_type: str = "forever"
+    time_value: Optional[int] = None
+    time_unit: str = "d"
+    reason: str = ""
+    auth_code: Optional[str] = None
+    ak: Optional[str] = None
+    sk: Optional[str] = None
+    flux_base_url: str
+
+
 class CheckAndBlockRequest(BaseModel):
     ip: str
     device_name: str
     device_type: str = "AF"
+    fresh: bool = False  # True: skip the local rule index and query live
     auth_code: Optional[str] = None
     ak: Optional[str] = None
     sk: Optional[str] = None
@@ -85,7 +104,7 @@ async def check_ip_status(request: CheckIPRequest):
         )
 
         # Check IP status
-        result = service.check_ip_blocked(request.ip)
+        result = await service.check_ip_blocked(request.ip, fresh=request.fresh)
 
         if result["success"]:
             if result["blocked"]:
@@ -151,7 +170,7 @@ async def get_devices(request: GetDevicesRequest):
         )
 
         # Get devices
-        result = service.get_available_devices(request.device_type)
+        result = await service.get_available_devices(request.device_type)
 
         if result["success"]:
             return APIResponse(
@@ -205,7 +224,7 @@ async def block_ip(request: BlockIPRequest):
         )
 
         # Block IP
-        result = service.block_ip(
+        result = await service.block_ip(
             ip_address=request.ip,
             device_id=request.device_id,
             device_name=request.device_name,
@@ -250,6 +269,82 @@ async def block_ip(request: BlockIPRequest):
         )
 
 
+@router.post("/block-batch", response_model=APIResponse)
+async def block_ips_batch(request: BlockIPsBatchRequest):
+    """
+    Block many IP addresses on one device with a single rule per batch
+
+    Args:
+        request: BlockIPsBatchRequest with IP list and blocking parameters
+
+    Returns:
+        APIResponse with overall result and per-IP attribution
+    """
+    if not request.ips:
+        return APIResponse(
+            success=False,
+            message="IP列表不能为空",
+            error_info={
+                "error_type": "validation_error",
+                "friendly_message": "IP列表不能为空",
+                "raw_message": "ips must not be empty",
+                "suggestion": "请提供至少一个需要封禁的IP地址",
+                "actions": ["检查IP列表", "重新输入"]
+            }
+        )
+
+    try:
+        # Initialize service
+        service = IpBlockService(
+            base_url=request.flux_base_url,
+            auth_code=request.auth_code,
+            ak=request.ak,
+            sk=request.sk
+        )
+
+        # Block IPs
+        result = await service.block_ips(
+            ip_addresses=request.ips,
+            device_id=request.device_id,
+            device_name=request.device_name,
+            device_type=request.device_type,
+            device_version=request.device_version,
+            block_type=request.block_type,
+            time_type=request.time_type,
+            time_value=request.time_value,
+            time_unit=request.time_unit,
+            reason=request.reason
+        )
+
+        failed_results = [item for item in result["results"] if not item["success"]]
+        return APIResponse(
+            success=result["success"],
+            message=result["message"],
+            data={
+                "rule_ids": result.get("rule_ids", []),
+                "total": result["total"],
+                "succeeded": result["succeeded"],
+                "failed": result["failed"],
+                "results": result["results"],
+                "device": request.device_name
+            },
+            error_info=failed_results[0].get("error_info") if failed_results else None
+        )
+
+    except Exception as e:
+        return APIResponse(
+            success=False,
+            message=f"执行批量IP封禁时发生错误: {str(e)}",
+            error_info={
+                "error_type": "system_error",
+                "friendly_message": "系统错误",
+                "raw_message": str(e),
+                "suggestion": "请联系系统管理员",
+                "actions": ["查看日志", "联系管理员"]
+            }
+        )
+
+
 @router.post("/check-and-block", response_model=APIResponse)
 async def check_and_block(request: CheckAndBlockRequest):
     """
@@ -271,10 +366,11 @@ async def check_and_block(request: CheckAndBlockRequest):
         )
 
         # Check and prepare block
-        result = service.check_and_block(
+        result = await service.check_and_block(
             ip_address=request.ip,
             device_name=request.device_name,
-            device_type=request.device_type
+            device_type=request.device_type,
+            fresh=request.fresh
         )
 
         if result["action"] == "already_blocked":
@@ -1,5 +1,5 @@
 from typing import Optional, List, AsyncGenerator
-from fastapi import APIRouter, HTTPException, Header
+from fastapi import APIRouter, HTTPException
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 import json
@@ -118,6 +118,59 @@ async def chat_with_llm(request: ChatRequest):
     return ChatResponse(**result)
 
 
+@router.post("/chat/stream")
+async def chat_with_llm_stream(request: ChatRequest):
+    """
+    与大模型进行流式对话（SSE）
+
+    普通聊天的回复以 token 事件逐段推送；技能结果（事件列表、封禁确认等）
+    以一个 result 事件返回，结构与 /chat 的响应相同。result 总是最后一个事件。
+
+    Args:
+        request: 同 /chat
+
+    Returns:
+        Server-Sent Events stream
+    """
+    if not request.api_key:
+        raise HTTPException(status_code=400, detail="API Key不能为空")
+
+    if not request.messages:
+        raise HTTPException(status_code=400, detail="消息列表不能为空")
+
+    messages = [
+        {"role": msg.role, "content": msg.content}
+        for msg in request.messages
+    ]
+
+    async def event_generator() -> AsyncGenerator[str, None]:
+        try:
+            async for event, data in llm_service.chat_with_asset_support_stream(
+                messages=messages,
+                provider=request.provider,
+                api_key=request.api_key,
+                base_url=request.base_url,
+                auth_code=request.auth_code,
+                flux_base_url=request.flux_base_url
+            ):
+                if event == "result":
+                    data = ChatResponse(**data).dict(exclude_none=True)
+                yield f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+        except Exception as e:
+            error_result = {"success": False, "type": "text", "message": f"抱歉，我现在无法回复：{str(e)}"}
+            yield f"event: result\ndata: {json.dumps(error_result, ensure_ascii=False)}\n\n"
+
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no"  # 禁用nginx缓冲
+        }
+    )
+
+
 class AssetConfirmRequest(BaseModel):
     """Request model for confirming asset creation"""
     params: dict
@@ -146,7 +199,7 @@ async def confirm_asset_creation(request: AssetConfirmRequest):
         )
 
         # Create asset
-        result = asset_service.create_asset(request.params)
+        result = await asset_service.create_asset(request.params)
 
         # Format response
         if result.get("success"):
@@ -204,6 +257,17 @@ async def get_supported_providers():
     }
 
 
+@router.get("/metrics")
+async def get_routing_metrics():
+    """
+    获取意图路由统计（本地路由命中、推测参数提取命中/取消次数）
+
+    Returns:
+        统计数据
+    """
+    return llm_service.get_routing_metrics()
+
+
 @router.get("/skills", response_model=SkillsResponse)
 async def get_supported_skills():
     """
@@ -6,16 +6,15 @@ Provides REST API for querying network security log statistics in Flux XDR
 from typing import Optional, List
 from fastapi import APIRouter, HTTPException, Header
 from pydantic import BaseModel, Field, validator
-from ....services.network_logs_service import NetworkLogsService
+from ....services.network_logs_service import NetworkLogsService, PIVOT_DIMENSIONS
+from ....services.log_anomaly_detector import ANOMALY_HISTORY_DAYS, ANOMALY_LOOKBACK_DAYS
 
 
 router = APIRouter()
 
 
-class LogCountRequest(BaseModel):
-    """Request model for querying log count"""
-    startTimestamp: Optional[int] = Field(None, description="Start timestamp (Unix timestamp)")
-    endTimestamp: Optional[int] = Field(None, description="End timestamp (Unix timestamp)")
+class LogFilterRequest(BaseModel):
+    """Common filters for network security log queries"""
     productTypes: Optional[List[str]] = Field(None, description="Product types: STA, EDR, AC, CWPP, SSL VPN, NTA, SIP SecLog, Logger")
     accessDirections: Optional[List[int]] = Field(None, description="Access directions: 1=外对内, 2=内对外, 3=内对内")
     threatClasses: Optional[List[str]] = Field(None, description="Threat class (一级分类)")
@@ -23,9 +22,6 @@ class LogCountRequest(BaseModel):
     dstIps: Optional[List[str]] = Field(None, description="Destination IP addresses")
     attackStates: Optional[List[int]] = Field(None, description="Attack states: 0=尝试, 1=失败, 2=成功, 3=失陷")
     severities: Optional[List[int]] = Field(None, description="Severity levels: 0=信息, 1=低危, 2=中危, 3=高危, 4=严重")
-    includeComparison: Optional[bool] = Field(False, description="Include comparison data (上周、上月)")
-    includeDistribution: Optional[bool] = Field(False, description="Include distribution data (严重程度、访问方向、产品类型)")
-    includeTrend: Optional[bool] = Field(False, description="Include trend data (按天统计)")
 
     @validator('accessDirections')
     def validate_access_directions(cls, v):
@@ -61,6 +57,43 @@ class LogCountRequest(BaseModel):
         return v
 
 
+class LogRangeRequest(LogFilterRequest):
+    """Filters plus a time range"""
+    startTimestamp: Optional[int] = Field(None, description="Start timestamp (Unix timestamp)")
+    endTimestamp: Optional[int] = Field(None, description="End timestamp (Unix timestamp)")
+
+
+class LogCountRequest(LogRangeRequest):
+    """Request model for querying log count"""
+    includeComparison: Optional[bool] = Field(False, description="Include comparison data (上周、上月)")
+    includeDistribution: Optional[bool] = Field(False, description="Include distribution data (严重程度、访问方向、产品类型)")
+    includeTrend: Optional[bool] = Field(False, description="Include trend data (按天统计)")
+
+
+class LogPivotRequest(LogRangeRequest):
+    """Request model for querying a multi-dimension log count cube"""
+    dimensions: List[str] = Field(..., description="Cube dimensions: severity, access_direction, product_type, day")
+
+    @validator('dimensions')
+    def validate_dimensions(cls, v):
+        if not v:
+            raise ValueError("At least one dimension is required")
+        for dimension in v:
+            if dimension not in PIVOT_DIMENSIONS:
+                raise ValueError(f"Invalid dimension: {dimension}. Must be one of: {', '.join(PIVOT_DIMENSIONS)}")
+        if len(set(v)) != len(v):
+            raise ValueError("Dimensions must not repeat")
+        return v
+
+
+class LogAnomalyRequest(LogFilterRequest):
+    """Request model for detecting anomalous days in the daily log count series"""
+    lookbackDays: Optional[int] = Field(
+        ANOMALY_LOOKBACK_DAYS, ge=1, le=ANOMALY_HISTORY_DAYS,
+        description="Days to report anomalies for (also loaded as history for a new filter set)"
+    )
+
+
 class LogCountResponse(BaseModel):
     """Response model for log count"""
     success: bool
@@ -126,7 +159,95 @@ async def get_log_count(
         include_trend=include_trend
     )
 
-    # Return response
+    return _build_response(result)
+
+
+@router.post("/networksecurity/pivot", response_model=LogCountResponse)
+async def get_log_pivot(
+    request: LogPivotRequest,
+    x_auth_code: Optional[str] = Header(None, alias="X-Auth-Code"),
+    x_base_url: Optional[str] = Header(None, alias="X-Base-Url")
+):
+    """
+    Query network security log counts broken down by several dimensions at once
+
+    Args:
+        request: Pivot request with dimensions and filters
+        x_auth_code: Flux authentication code (from header)
+        x_base_url: Flux API base URL (from header)
+
+    Returns:
+        Dense count cube with per-dimension marginals and the grand total
+    """
+    if not x_auth_code:
+        raise HTTPException(status_code=400, detail="X-Auth-Code header is required")
+
+    if not x_base_url:
+        raise HTTPException(status_code=400, detail="X-Base-Url header is required")
+
+    service = NetworkLogsService()
+
+    result = await service.get_log_pivot(
+        auth_code=x_auth_code,
+        base_url=x_base_url,
+        dimensions=request.dimensions,
+        start_timestamp=request.startTimestamp,
+        end_timestamp=request.endTimestamp,
+        product_types=request.productTypes,
+        access_directions=request.accessDirections,
+        threat_classes=request.threatClasses,
+        src_ips=request.srcIps,
+        dst_ips=request.dstIps,
+        attack_states=request.attackStates,
+        severities=request.severities
+    )
+
+    return _build_response(result)
+
+
+@router.post("/anomalies", response_model=LogCountResponse)
+async def detect_log_anomalies(
+    request: LogAnomalyRequest,
+    x_auth_code: Optional[str] = Header(None, alias="X-Auth-Code"),
+    x_base_url: Optional[str] = Header(None, alias="X-Base-Url")
+):
+    """
+    Detect anomalous days in the daily log count series of a filter set
+
+    Args:
+        request: Anomaly request with filters and lookback window
+        x_auth_code: Flux authentication code (from header)
+        x_base_url: Flux API base URL (from header)
+
+    Returns:
+        Anomalous closed days and the learned baseline
+    """
+    if not x_auth_code:
+        raise HTTPException(status_code=400, detail="X-Auth-Code header is required")
+
+    if not x_base_url:
+        raise HTTPException(status_code=400, detail="X-Base-Url header is required")
+
+    service = NetworkLogsService()
+
+    result = await service.detect_anomalies(
+        auth_code=x_auth_code,
+        base_url=x_base_url,
+        lookback_days=request.lookbackDays or ANOMALY_LOOKBACK_DAYS,
+        product_types=request.productTypes,
+        access_directions=request.accessDirections,
+        threat_classes=request.threatClasses,
+        src_ips=request.srcIps,
+        dst_ips=request.dstIps,
+        attack_states=request.attackStates,
+        severities=request.severities
+    )
+
+    return _build_response(result)
+
+
+def _build_response(result: dict) -> LogCountResponse:
+    """Convert a service result into a response, raising HTTP errors on failure"""
     if result.get("success"):
         return LogCountResponse(
             success=True,
@@ -139,7 +260,9 @@ async def get_log_count(
         error_type = result.get("error_type", "unknown_error")
 
         # Map error types to appropriate HTTP status codes
-        if error_type == "auth_error":
+        if error_type == "invalid_params":
+            raise HTTPException(status_code=400, detail=error_message)
+        elif error_type == "auth_error":
             raise HTTPException(status_code=401, detail=error_message)
         elif error_type == "connection_error":
             raise HTTPException(status_code=503, detail=error_message)
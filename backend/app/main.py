@@ -1,6 +1,11 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.v1.endpoints import auth, connectivity, llm, assets, ipblock, incidents, logs, dashboard
+from app.utils.xdr_client import xdr_client_pool
+from app.utils.llm_client import llm_client_pool
+from app.services.block_rule_index import block_rule_index_registry
+from app.services.dashboard_service import dashboard_result_cache
+from app.services.cockpit_publisher import cockpit_publisher
 
 
 app = FastAPI(
@@ -29,6 +34,20 @@ app.include_router(logs.router, prefix="/api/v1/logs", tags=["日志统计"])
 app.include_router(dashboard.router, prefix="/api/v1/dashboard", tags=["驾驶舱"])
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    # 停止封禁规则索引的后台同步
+    await block_rule_index_registry.aclose()
+    # 停止驾驶舱推送
+    await cockpit_publisher.aclose()
+    # 取消驾驶舱结果缓存的后台刷新
+    await dashboard_result_cache.aclose()
+    # 关闭共享的 XDR 连接池
+    await xdr_client_pool.aclose()
+    # 关闭共享的大模型连接池
+    await llm_client_pool.aclose()
+
+
 @app.get("/")
 async def root():
     return {"message": "Flux API is running", "version": "1.0.0"}
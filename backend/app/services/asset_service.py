@@ -5,9 +5,12 @@ Handles asset creation, validation, and parameter inference
 
 import re
 import ipaddress
+import httpx
 import requests
 from typing import Dict, Any, Optional, List
 from ..utils.sdk.aksk_py3 import Signature
+from ..utils.signature_cache import get_signature
+from ..utils.xdr_client import send_xdr_request
 from ..utils.error_handler import parse_api_error, format_error_message
 
 
@@ -34,7 +37,9 @@ class AssetService:
 
         # Initialize signature if credentials are provided
         if auth_code or (ak and sk):
-            self.signature = Signature(auth_code=auth_code, ak=ak, sk=sk)
+            self.signature = (
+                Signature(ak=ak, sk=sk) if ak and sk else get_signature(auth_code)
+            )
 
     def validate_ip(self, ip: str) -> bool:
         """Validate IP address format"""
@@ -149,7 +154,7 @@ class AssetService:
             "ipad": (7, 700003),
         }
 
-    def create_asset(self, asset_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def create_asset(self, asset_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Create a new asset via the Flux XDR API
 
@@ -312,10 +317,7 @@ class AssetService:
             self.signature.signature(req)
 
             # Send request
-            session = requests.Session()
-            session.verify = False  # Disable SSL verification for development
-
-            response = session.send(req.prepare())
+            response = await send_xdr_request(req)
 
             if response.status_code == 200:
                 result = response.json()
@@ -334,7 +336,7 @@ class AssetService:
                 error_info = parse_api_error(response.status_code, response.text)
                 return error_info
 
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             return {
                 "success": False,
                 "status_code": 500,
@@ -1,4 +1,4 @@
-from ..utils.sdk.aksk_py3 import Signature
+from ..utils.signature_cache import get_signature
 
 
 class AuthService:
@@ -16,7 +16,7 @@ class AuthService:
         """
         try:
             # SDK 会自动解码联动码，如果格式错误会抛出异常
-            signature = Signature(auth_code=auth_code)
+            signature = get_signature(auth_code)
             return True, "验证成功"
         except Exception as e:
             return False, f"联动码验证失败: {str(e)}"
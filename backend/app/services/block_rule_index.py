@@ -0,0 +1,366 @@
+"""
+Block Rule Index
+Per-appliance in-memory index of active IP block rules, kept in sync in the background
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from ..utils.ip_ranges import IpRangeIndex
+from ..utils.signature_cache import fingerprint_auth_code
+
+logger = logging.getLogger(__name__)
+
+# Rule statuses that mean the IP is currently blocked
+ACTIVE_BLOCK_STATUSES = ["block success", "block ip in deal"]
+
+# Sync settings
+BLOCK_RULE_PAGE_SIZE = 100  # API allows 10/20/50/100
+BLOCK_RULE_REFRESH_INTERVAL = 30.0  # seconds between incremental refreshes
+BLOCK_RULE_MAX_STALENESS = 60.0  # lookups older than this trigger a refresh
+BLOCK_RULE_FULL_SYNC_INTERVAL = 600.0  # full resync also catches deleted rules
+BLOCK_RULE_MAX_INCREMENTAL_PAGES = 5  # beyond this a full resync is cheaper
+BLOCK_RULE_IDLE_TIMEOUT = 900.0  # stop background sync when nobody queries
+
+# Registry bounds
+BLOCK_RULE_MAX_INDEXES = 64  # appliances/credentials indexed at once (least recently used evicted)
+
+# Newest changes first, so incremental refresh can stop at the watermark
+UPDATE_TIME_DESC = {"name": "updateTime", "sort": "desc"}
+
+# The rule list API returns only the last 7 days unless a time range is given;
+# active rules (forever or long temporary blocks) can be much older
+BLOCK_RULE_EARLIEST_TIMESTAMP = 0
+BLOCK_RULE_END_MARGIN = 86400  # the API's default range ends at the end of today; also absorbs clock skew
+
+SearchRules = Callable[..., Awaitable[Dict[str, Any]]]
+
+
+def all_rules_time_range() -> Tuple[int, int]:
+    """(startTimestamp, endTimestamp) covering every block rule on the appliance"""
+    return BLOCK_RULE_EARLIEST_TIMESTAMP, int(time.time()) + BLOCK_RULE_END_MARGIN
+
+
+class BlockRuleIndex:
+    """
+    Active block rules of one appliance indexed by the IPs/CIDRs/ranges they block
+
+    Rules are loaded across every page, then refreshed incrementally by
+    walking rules newest-first by updateTime until the previous watermark.
+    """
+
+    def __init__(self, search_rules: SearchRules, on_idle: Optional[Callable[["BlockRuleIndex"], None]] = None):
+        self._search_rules = search_rules
+        self._on_idle = on_idle
+        self._rules: Dict[Any, Dict[str, Any]] = {}
+        self._views = IpRangeIndex()
+        self._watermark: Any = None
+        self._synced_at: Optional[float] = None
+        self._full_synced_at: Optional[float] = None
+        self._dirty = False
+        self._last_used = time.monotonic()
+        self._lock = asyncio.Lock()
+        self._refresh_event = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        """Whether the index holds a complete snapshot"""
+        return self._synced_at is not None
+
+    def attach(self, search_rules: SearchRules):
+        """Use the latest caller's credentials for future syncs"""
+        self._search_rules = search_rules
+
+    def mark_dirty(self):
+        """Force a refresh before the next lookup (e.g. after creating a rule)"""
+        self._dirty = True
+        self._refresh_event.set()
+
+    async def ensure_fresh(self) -> bool:
+        """
+        Make sure the index can answer lookups, refreshing if needed
+
+        Returns:
+            True if lookups can be served from the index
+        """
+        now = time.monotonic()
+        self._last_used = now
+        if self.ready and not self._dirty and now - self._synced_at < BLOCK_RULE_MAX_STALENESS:
+            return True
+        return await self.refresh()
+
+    @property
+    def last_used(self) -> float:
+        """Monotonic time of the last lookup or freshness check"""
+        return self._last_used
+
+    @property
+    def rule_count(self) -> int:
+        """Number of active block rules"""
+        return len(self._rules)
+
+    @property
+    def blocked_count(self) -> int:
+        """Number of distinct IPs/CIDRs/ranges blocked by active rules"""
+        return self._views.distinct_count
+
+    def lookup(self, ip_address: str) -> List[Dict[str, Any]]:
+        """Return the active rules that block an IP, directly or via a CIDR/range"""
+        self._last_used = time.monotonic()
+        rule_ids = self._views.lookup(ip_address)
+        return [self._rules[rule_id] for rule_id in rule_ids if rule_id in self._rules]
+
+    def lookup_many(self, ip_addresses: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """Return the active rules for each IP"""
+        return {ip_address: self.lookup(ip_address) for ip_address in ip_addresses}
+
+    async def refresh(self, full: bool = False) -> bool:
+        """
+        Bring the index up to date (single-flight: concurrent callers share one sync)
+
+        Args:
+            full: Reload every page instead of applying recent changes only
+
+        Returns:
+            True if the index is usable after the refresh
+        """
+        requested_at = time.monotonic()
+        async with self._lock:
+            # Another caller finished a sync while we were waiting
+            if not full and not self._dirty and self._synced_at is not None and self._synced_at >= requested_at:
+                return True
+
+            self._dirty = False
+            try:
+                if full or not self.ready:
+                    synced = await self._full_sync()
+                else:
+                    synced = await self._incremental_sync()
+                    if synced is None:
+                        synced = await self._full_sync()
+            except Exception:
+                logger.exception("Block rule index sync failed")
+                synced = False
+
+            if not synced:
+                self._dirty = True
+            return synced and self.ready
+
+    def start(self):
+        """Start the background sync task if it is not running"""
+        if self._task is None or self._task.done():
+            self._last_used = time.monotonic()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Stop the background sync task"""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    def close(self):
+        """Cancel background sync and drop the snapshot (for eviction outside a coroutine)"""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        self._task = None
+        self._reset()
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._refresh_event.wait(), timeout=BLOCK_RULE_REFRESH_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self._refresh_event.clear()
+
+            now = time.monotonic()
+            if now - self._last_used > BLOCK_RULE_IDLE_TIMEOUT:
+                # 长时间无人查询: 释放索引, 下次使用时重新全量同步
+                self._reset()
+                if self._on_idle is not None:
+                    self._on_idle(self)
+                return
+
+            full = self._full_synced_at is None or now - self._full_synced_at > BLOCK_RULE_FULL_SYNC_INTERVAL
+            await self.refresh(full=full)
+
+    def _reset(self):
+        self._rules = {}
+        self._views = IpRangeIndex()
+        self._watermark = None
+        self._synced_at = None
+        self._full_synced_at = None
+
+    async def _fetch_page(self, page: int) -> Optional[Dict[str, Any]]:
+        start_timestamp, end_timestamp = all_rules_time_range()
+        result = await self._search_rules(
+            page_size=BLOCK_RULE_PAGE_SIZE,
+            page=page,
+            sort_info=UPDATE_TIME_DESC,
+            start_timestamp=start_timestamp,
+            end_timestamp=end_timestamp
+        )
+        return result["data"] if result.get("success") else None
+
+    async def _full_sync(self) -> bool:
+        first_page = await self._fetch_page(1)
+        if first_page is None:
+            return False
+
+        total = first_page.get("total", 0) or 0
+        total_pages = max(1, (total + BLOCK_RULE_PAGE_SIZE - 1) // BLOCK_RULE_PAGE_SIZE)
+        pages = [first_page]
+        if total_pages > 1:
+            pages.extend(await asyncio.gather(*[
+                self._fetch_page(page) for page in range(2, total_pages + 1)
+            ]))
+            if any(page is None for page in pages):
+                return False
+
+        rules: Dict[Any, Dict[str, Any]] = {}
+        views = IpRangeIndex()
+        watermark = None
+        seen_ids = set()
+        for page in pages:
+            for item in page.get("item", []) or []:
+                seen_ids.add(item.get("id"))
+                watermark = self._max_update_time(watermark, item.get("updateTime"))
+                if item.get("status") in ACTIVE_BLOCK_STATUSES:
+                    self._add_rule(rules, views, item)
+
+        if len(seen_ids) != total:
+            # Rules were added/removed between pages (or the API windowed the list);
+            # a partial snapshot would report blocked IPs as unblocked
+            logger.warning("Block rule full sync saw %d rules but the API reported %d; retrying", len(seen_ids), total)
+            return False
+
+        self._rules = rules
+        self._views = views
+        self._watermark = watermark
+        self._synced_at = self._full_synced_at = time.monotonic()
+        return True
+
+    async def _incremental_sync(self) -> Optional[bool]:
+        """
+        Apply rules changed since the watermark
+
+        Returns:
+            True/False for success, None when the change set is too large and a
+            full resync should be done instead
+        """
+        changed: List[Dict[str, Any]] = []
+        for page_number in range(1, BLOCK_RULE_MAX_INCREMENTAL_PAGES + 1):
+            page = await self._fetch_page(page_number)
+            if page is None:
+                return False
+
+            items = page.get("item", []) or []
+            reached_watermark = False
+            for item in items:
+                update_time = item.get("updateTime")
+                if self._watermark is not None and update_time is not None and update_time < self._watermark:
+                    reached_watermark = True
+                    break
+                changed.append(item)
+
+            if reached_watermark or len(items) < BLOCK_RULE_PAGE_SIZE:
+                break
+        else:
+            return None
+
+        watermark = self._watermark
+        for item in changed:
+            watermark = self._max_update_time(watermark, item.get("updateTime"))
+            self._remove_rule(self._rules, self._views, item.get("id"))
+            if item.get("status") in ACTIVE_BLOCK_STATUSES:
+                self._add_rule(self._rules, self._views, item)
+
+        self._watermark = watermark
+        self._synced_at = time.monotonic()
+        return True
+
+    @staticmethod
+    def _max_update_time(current: Any, update_time: Any) -> Any:
+        if update_time is None:
+            return current
+        if current is None or update_time > current:
+            return update_time
+        return current
+
+    @staticmethod
+    def _add_rule(rules: Dict[Any, Dict[str, Any]], views: IpRangeIndex, item: Dict[str, Any]):
+        rule_id = item.get("id")
+        rules[rule_id] = item
+        for view in (item.get("blockIpRule") or {}).get("view", []) or []:
+            views.add(rule_id, view)
+
+    @staticmethod
+    def _remove_rule(rules: Dict[Any, Dict[str, Any]], views: IpRangeIndex, rule_id: Any):
+        if rules.pop(rule_id, None) is not None:
+            views.remove(rule_id)
+
+
+class BlockRuleIndexRegistry:
+    """
+    One BlockRuleIndex per (appliance, credential)
+
+    Indexes leave the registry when their background sync stops for idleness,
+    and the least recently used one is evicted beyond max_indexes.
+    """
+
+    def __init__(self, max_indexes: int = BLOCK_RULE_MAX_INDEXES):
+        self.max_indexes = max_indexes
+        self._indexes: Dict[Tuple[str, str], BlockRuleIndex] = {}
+
+    @staticmethod
+    def _key(base_url: str, auth_code: str) -> Tuple[str, str]:
+        return base_url.rstrip('/').lower(), fingerprint_auth_code(auth_code)
+
+    def get(self, base_url: str, auth_code: str, search_rules: SearchRules) -> BlockRuleIndex:
+        """Return the index for an appliance, starting its background sync"""
+        key = self._key(base_url, auth_code)
+        index = self._indexes.get(key)
+        if index is None:
+            while len(self._indexes) >= self.max_indexes:
+                self._evict_least_recently_used()
+            index = BlockRuleIndex(search_rules, on_idle=lambda idle_index: self._discard(key, idle_index))
+            self._indexes[key] = index
+        else:
+            index.attach(search_rules)
+        index.start()
+        return index
+
+    def __len__(self) -> int:
+        return len(self._indexes)
+
+    def _discard(self, key: Tuple[str, str], index: BlockRuleIndex):
+        if self._indexes.get(key) is index:
+            del self._indexes[key]
+
+    def _evict_least_recently_used(self):
+        key = min(self._indexes, key=lambda existing: self._indexes[existing].last_used)
+        self._indexes.pop(key).close()
+
+    def mark_dirty(self, base_url: str, auth_code: str):
+        """Flag an appliance's index as stale after rules were changed through this service"""
+        index = self._indexes.get(self._key(base_url, auth_code))
+        if index is not None:
+            index.mark_dirty()
+
+    async def aclose(self):
+        """Stop every background sync task (called on application shutdown)"""
+        indexes = list(self._indexes.values())
+        self._indexes.clear()
+        for index in indexes:
+            await index.stop()
+
+
+# 全局封禁规则索引实例
+block_rule_index_registry = BlockRuleIndexRegistry()
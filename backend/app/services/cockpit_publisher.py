@@ -0,0 +1,175 @@
+"""
+Cockpit Publisher
+One poller per appliance computes cockpit data and pushes changed fields to every subscribed cockpit
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, Optional
+
+from fastapi import WebSocket
+
+from ..utils.signature_cache import fingerprint_auth_code
+from ..websocket.manager import manager
+from .dashboard_service import DashboardService
+
+
+# Seconds between polls of one appliance
+COCKPIT_PUSH_INTERVAL = 10.0
+
+logger = logging.getLogger(__name__)
+
+
+def _changed_fields(previous: Optional[Dict[str, Any]], current: Dict[str, Any]) -> Dict[str, Any]:
+    """Top-level fields whose value differs from the previous snapshot"""
+    if previous is None:
+        return dict(current)
+    return {key: value for key, value in current.items() if previous.get(key) != value}
+
+
+class CockpitFeed:
+    """Poller for one (appliance, credential, time range) topic"""
+
+    def __init__(self, topic: str, auth_code: str, base_url: str, time_range: str):
+        self.topic = topic
+        self.auth_code = auth_code
+        self.base_url = base_url
+        self.time_range = time_range
+        self.statistics: Optional[Dict[str, Any]] = None
+        self.monitoring: Optional[Dict[str, Any]] = None
+        self._dashboard_service = DashboardService()
+        self._refresh_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    async def snapshot(self) -> Dict[str, Any]:
+        """Full cockpit data, computed on first use"""
+        if self.statistics is None or self.monitoring is None:
+            await self.refresh()
+        return {"statistics": self.statistics, "monitoring": self.monitoring}
+
+    async def refresh(self) -> Dict[str, Any]:
+        """
+        Recompute cockpit data
+
+        Returns:
+            Changed fields per section, e.g. {"statistics": {...}, "monitoring": {...}}
+            (sections without changes are omitted)
+        """
+        async with self._refresh_lock:
+            statistics, monitoring = await asyncio.gather(
+                self._dashboard_service.get_statistics(self.auth_code, self.base_url, self.time_range),
+                self._dashboard_service.get_monitoring(self.auth_code, self.base_url)
+            )
+
+            delta = {}
+            statistics_delta = _changed_fields(self.statistics, statistics)
+            if statistics_delta:
+                delta["statistics"] = statistics_delta
+            monitoring_delta = _changed_fields(self.monitoring, monitoring)
+            if monitoring_delta:
+                delta["monitoring"] = monitoring_delta
+
+            self.statistics = statistics
+            self.monitoring = monitoring
+            return delta
+
+    def start(self):
+        """Start polling if it is not running"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def cancel(self):
+        """Stop polling without waiting"""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+
+    async def stop(self):
+        """Stop polling"""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    async def _run(self):
+        while manager.subscriber_count(self.topic):
+            await asyncio.sleep(COCKPIT_PUSH_INTERVAL)
+            if not manager.subscriber_count(self.topic):
+                break
+            try:
+                delta = await self.refresh()
+            except Exception as e:
+                logger.warning("Cockpit feed refresh failed: %s", e)
+                continue
+            if delta:
+                await manager.publish(self.topic, {"type": "delta", **delta})
+
+
+class CockpitPublisher:
+    """Registry of cockpit feeds; the feed of a topic runs while it has subscribers"""
+
+    def __init__(self):
+        self._feeds: Dict[str, CockpitFeed] = {}
+
+    @staticmethod
+    def topic(auth_code: str, base_url: str, time_range: str) -> str:
+        """Subscription topic; the auth code is fingerprinted, never used as-is"""
+        return f"cockpit:{base_url.rstrip('/').lower()}:{fingerprint_auth_code(auth_code)}:{time_range}"
+
+    async def subscribe(
+        self,
+        websocket: WebSocket,
+        auth_code: str,
+        base_url: str,
+        time_range: str = "week"
+    ) -> str:
+        """
+        Subscribe an accepted WebSocket to cockpit updates
+
+        The subscriber first receives a full snapshot, then deltas from the
+        shared poller of its topic.
+
+        Returns:
+            The topic (pass it to unsubscribe)
+        """
+        topic = self.topic(auth_code, base_url, time_range)
+        feed = self._feeds.get(topic)
+        if feed is None:
+            feed = CockpitFeed(topic, auth_code, base_url, time_range)
+            self._feeds[topic] = feed
+
+        try:
+            snapshot = await feed.snapshot()
+            await websocket.send_json({"type": "snapshot", **snapshot})
+        except BaseException:
+            # Don't keep a feed nobody got subscribed to (also on cancellation)
+            if not manager.subscriber_count(topic) and self._feeds.get(topic) is feed:
+                del self._feeds[topic]
+            raise
+
+        # The last subscriber may have left (dropping the feed) while the snapshot loaded
+        feed = self._feeds.setdefault(topic, feed)
+        manager.subscribe(topic, websocket)
+        feed.start()
+        return topic
+
+    def unsubscribe(self, topic: str, websocket: WebSocket):
+        """Remove a subscriber; its feed stops polling once nobody is left"""
+        manager.unsubscribe(topic, websocket)
+        if not manager.subscriber_count(topic):
+            feed = self._feeds.pop(topic, None)
+            if feed is not None:
+                feed.cancel()
+
+    async def aclose(self):
+        """Stop every feed (called on application shutdown)"""
+        feeds = list(self._feeds.values())
+        self._feeds.clear()
+        for feed in feeds:
+            await feed.stop()
+
+
+# 全局驾驶舱推送实例
+cockpit_publisher = CockpitPublisher()
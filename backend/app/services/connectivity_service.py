@@ -2,7 +2,8 @@ import asyncio
 import time
 import json
 import requests
-from ..utils.sdk.aksk_py3 import Signature
+from ..utils.signature_cache import get_signature
+from ..utils.xdr_client import send_xdr_request
 from ..websocket.manager import manager
 from .security_incidents_service import SecurityIncidentsService
 
@@ -39,7 +40,7 @@ class ConnectivityService:
             })
 
             # 创建签名对象
-            signature = Signature(auth_code=auth_code)
+            signature = get_signature(auth_code)
 
             # 构造请求（参考 test_aksk.py）
             headers = {
@@ -55,9 +56,7 @@ class ConnectivityService:
 
             # 发送请求并计时
             start_time = time.time()
-            session = requests.Session()
-            session.verify = False  # 忽略 SSL 证书验证
-            response = session.send(req.prepare())
+            response = await send_xdr_request(req)
             end_time = time.time()
 
             latency = round((end_time - start_time) * 1000, 2)
@@ -3,12 +3,50 @@ Dashboard Service
 Aggregates data from multiple services for the AI Security Operations Cockpit
 """
 
-import time
 import asyncio
 from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from .security_incidents_service import SecurityIncidentsService
 from .ipblock_service import IpBlockService
+from .log_count_cache import LogCountCache
+from ..utils.latency_tracker import latency_tracker
+from ..utils.result_cache import ResultCache
+from ..utils.signature_cache import fingerprint_auth_code
+
+
+# Smallest page the incidents list API accepts; only "total" is used for counts
+INCIDENT_COUNT_PAGE_SIZE = 5
+
+# Maximum concurrent incident count queries per statistics refresh
+DASHBOARD_COUNT_CONCURRENCY = 16
+
+# Time field of the cached trend/distribution counts: an incident's creation
+# time never moves, unlike endTime, which advances while the incident recurs
+INCIDENT_COUNT_TIME_FIELD = "insertTime"
+
+# Distribution categories (display order)
+SEVERITY_NAMES = {4: "严重", 3: "高危", 2: "中危", 1: "低危"}
+THREAT_DEFINE_NAMES = {
+    900: "定向攻击",
+    450: "疑似定向攻击",
+    500: "病毒",
+    400: "扫描器攻击",
+    300: "脆弱性风险",
+    200: "业务行为",
+    0: "未知威胁"
+}
+
+# Result cache lifetimes (seconds); the cockpit refreshes every 30s
+STATISTICS_CACHE_TTL = 20.0
+STATISTICS_STALE_TTL = 60.0
+MONITORING_CACHE_TTL = 10.0
+MONITORING_STALE_TTL = 30.0
+
+# 全局事件计数缓存实例 (creation-time counts of closed days never change)
+incident_count_cache = LogCountCache()
+
+# 全局驾驶舱结果缓存实例 (shared by every open cockpit of the same appliance)
+dashboard_result_cache = ResultCache()
 
 
 class DashboardService:
@@ -27,6 +65,9 @@ class DashboardService:
         """
         Get dashboard statistics including handled incidents, blocked IPs, etc.
 
+        Results are cached per (appliance, credential, time range) and served
+        stale while they refresh; concurrent identical requests share one load.
+
         Args:
             auth_code: Flux authentication code
             base_url: Flux API base URL
@@ -35,91 +76,12 @@ class DashboardService:
         Returns:
             Dictionary with statistics data
         """
-        try:
-            # Determine date range based on time_range
-            if time_range == "week":
-                days = 7
-            elif time_range == "month":
-                days = 30
-            else:
-                days = 7  # Default to week
-
-            # Calculate timestamps
-            end_timestamp = int(datetime.now().timestamp())
-            week_start_timestamp = int((datetime.now() - timedelta(days=7)).timestamp())
-            month_start_timestamp = int((datetime.now() - timedelta(days=30)).timestamp())
-
-            # Fetch incidents data in parallel
-            weekly_incidents_task = self._fetch_incidents_count(
-                auth_code=auth_code,
-                base_url=base_url,
-                start_timestamp=week_start_timestamp,
-                end_timestamp=end_timestamp
-            )
-
-            monthly_incidents_task = self._fetch_incidents_count(
-                auth_code=auth_code,
-                base_url=base_url,
-                start_timestamp=month_start_timestamp,
-                end_timestamp=end_timestamp
-            )
-
-            pending_incidents_task = self._fetch_pending_incidents_count(
-                auth_code=auth_code,
-                base_url=base_url
-            )
-
-            # Fetch IP block statistics
-            blocked_ips_task = self._fetch_blocked_ips_count(
-                auth_code=auth_code,
-                base_url=base_url,
-                start_timestamp=month_start_timestamp
-            )
-
-            # Execute all tasks in parallel
-            weekly_incidents, monthly_incidents, pending_incidents, blocked_ips = await asyncio.gather(
-                weekly_incidents_task,
-                monthly_incidents_task,
-                pending_incidents_task,
-                blocked_ips_task,
-                return_exceptions=True
-            )
-
-            # Handle exceptions and set default values
-            weekly_handled = weekly_incidents if not isinstance(weekly_incidents, Exception) else 0
-            monthly_handled = monthly_incidents if not isinstance(monthly_incidents, Exception) else 0
-            pending_count = pending_incidents if not isinstance(pending_incidents, Exception) else 0
-            blocked_count = blocked_ips if not isinstance(blocked_ips, Exception) else 0
-
-            # Calculate success rate (handled / total)
-            total_incidents = weekly_handled + pending_count
-            success_rate = round((weekly_handled / total_incidents * 100), 1) if total_incidents > 0 else 100.0
-
-            # Generate trend data (mock data for now, can be enhanced with real historical data)
-            trend = self._generate_trend_data(days=days)
-
-            return {
-                "weeklyHandled": weekly_handled,
-                "monthlyHandled": monthly_handled,
-                "blockedIPs": blocked_count,
-                "pendingIncidents": pending_count,
-                "successRate": success_rate,
-                "trend": trend,
-                "distribution": self._get_distribution_data(auth_code, base_url)
-            }
-
-        except Exception as e:
-            print(f"Error in get_statistics: {str(e)}")
-            # Return default values on error
-            return {
-                "weeklyHandled": 0,
-                "monthlyHandled": 0,
-                "blockedIPs": 0,
-                "pendingIncidents": 0,
-                "successRate": 100.0,
-                "trend": [],
-                "distribution": {}
-            }
+        return await dashboard_result_cache.get_or_load(
+            self._cache_key("statistics", auth_code, base_url, time_range),
+            lambda: self._load_statistics(auth_code, base_url, time_range),
+            ttl=STATISTICS_CACHE_TTL,
+            stale_ttl=STATISTICS_STALE_TTL
+        )
 
     async def get_monitoring(
         self,
@@ -129,6 +91,8 @@ class DashboardService:
         """
         Get real-time monitoring data including system status and alerts
 
+        Cached like get_statistics, with a shorter lifetime.
+
         Args:
             auth_code: Flux authentication code
             base_url: Flux API base URL
@@ -136,60 +100,158 @@ class DashboardService:
         Returns:
             Dictionary with monitoring data
         """
-        try:
-            # Get pending high-severity incidents for alerts
-            recent_incidents = await self._fetch_recent_high_severity_incidents(
-                auth_code=auth_code,
-                base_url=base_url,
-                limit=10
-            )
-
-            # Count active alerts (high and critical severity incidents)
-            active_alerts = len([inc for inc in recent_incidents if inc.get("severity", 0) >= 3])
-
-            # Determine system status based on alerts
-            if active_alerts == 0:
-                system_status = "online"
-            elif active_alerts < 5:
-                system_status = "warning"
-            else:
-                system_status = "offline"  # High alert state
-
-            # Measure API latency
-            start_time = time.time()
-            await self._test_api_latency(auth_code, base_url)
-            api_latency = round((time.time() - start_time) * 1000, 2)
-
-            # Calculate performance metrics
-            success_rate = max(95.0, 100.0 - (active_alerts * 0.5))  # Mock calculation
-            error_rate = 100.0 - success_rate
-
-            return {
-                "systemStatus": system_status,
-                "activeAlerts": active_alerts,
-                "lastUpdate": int(datetime.now().timestamp()),
-                "recentIncidents": recent_incidents[:5],  # Last 5 incidents
-                "performanceMetrics": {
-                    "apiLatency": api_latency,
-                    "successRate": round(success_rate, 1),
-                    "errorRate": round(error_rate, 1)
-                }
-            }
+        return await dashboard_result_cache.get_or_load(
+            self._cache_key("monitoring", auth_code, base_url),
+            lambda: self._load_monitoring(auth_code, base_url),
+            ttl=MONITORING_CACHE_TTL,
+            stale_ttl=MONITORING_STALE_TTL
+        )
+
+    @staticmethod
+    def _cache_key(kind: str, auth_code: str, base_url: str, *args: str) -> tuple:
+        """Result cache key; the auth code is fingerprinted, never stored"""
+        return (kind, base_url.rstrip('/').lower(), fingerprint_auth_code(auth_code)) + args
+
+    async def _load_statistics(
+        self,
+        auth_code: str,
+        base_url: str,
+        time_range: str = "week"
+    ) -> Dict[str, Any]:
+        """
+        Compute dashboard statistics from the XDR APIs
 
-        except Exception as e:
-            print(f"Error in get_monitoring: {str(e)}")
-            # Return default values on error
-            return {
-                "systemStatus": "offline",
-                "activeAlerts": 0,
-                "lastUpdate": int(datetime.now().timestamp()),
-                "recentIncidents": [],
-                "performanceMetrics": {
-                    "apiLatency": 0,
-                    "successRate": 0.0,
-                    "errorRate": 0.0
-                }
+        Raises if any part fails, so the result cache keeps serving the last
+        good value instead of caching zeros.
+        """
+        # Determine date range based on time_range
+        if time_range == "week":
+            days = 7
+        elif time_range == "month":
+            days = 30
+        else:
+            days = 7  # Default to week
+
+        # Calculate timestamps
+        end_timestamp = int(datetime.now().timestamp())
+        week_start_timestamp = int((datetime.now() - timedelta(days=7)).timestamp())
+        month_start_timestamp = int((datetime.now() - timedelta(days=30)).timestamp())
+
+        # Fetch incidents data in parallel
+        weekly_incidents_task = self._fetch_incidents_count(
+            auth_code=auth_code,
+            base_url=base_url,
+            start_timestamp=week_start_timestamp,
+            end_timestamp=end_timestamp
+        )
+
+        monthly_incidents_task = self._fetch_incidents_count(
+            auth_code=auth_code,
+            base_url=base_url,
+            start_timestamp=month_start_timestamp,
+            end_timestamp=end_timestamp
+        )
+
+        pending_incidents_task = self._fetch_pending_incidents_count(
+            auth_code=auth_code,
+            base_url=base_url
+        )
+
+        # Fetch IP block statistics
+        blocked_ips_task = self._fetch_blocked_ips_count(
+            auth_code=auth_code,
+            base_url=base_url
+        )
+
+        # Daily trend and distribution over the same window
+        trend_task = self._fetch_trend_and_distribution(
+            auth_code=auth_code,
+            base_url=base_url,
+            days=days
+        )
+
+        # Execute all tasks in parallel
+        weekly_handled, monthly_handled, pending_count, blocked_count, (trend, distribution) = await asyncio.gather(
+            weekly_incidents_task,
+            monthly_incidents_task,
+            pending_incidents_task,
+            blocked_ips_task,
+            trend_task
+        )
+
+        # Calculate success rate (handled / total)
+        total_incidents = weekly_handled + pending_count
+        success_rate = round((weekly_handled / total_incidents * 100), 1) if total_incidents > 0 else 100.0
+
+        return {
+            "weeklyHandled": weekly_handled,
+            "monthlyHandled": monthly_handled,
+            "blockedIPs": blocked_count,
+            "pendingIncidents": pending_count,
+            "successRate": success_rate,
+            "trend": trend,
+            "distribution": distribution
+        }
+
+    async def _load_monitoring(
+        self,
+        auth_code: str,
+        base_url: str
+    ) -> Dict[str, Any]:
+        """
+        Compute monitoring data from the XDR APIs
+
+        Raises if the incident query fails, so the result cache keeps serving
+        the last good value instead of caching an "offline" placeholder.
+        """
+        # Get pending high-severity incidents for alerts
+        recent_incidents = await self._fetch_recent_high_severity_incidents(
+            auth_code=auth_code,
+            base_url=base_url,
+            limit=10
+        )
+
+        # Count active alerts (high and critical severity incidents)
+        active_alerts = len([inc for inc in recent_incidents if inc.get("severity", 0) >= 3])
+
+        # Determine system status based on alerts
+        if active_alerts == 0:
+            system_status = "online"
+        elif active_alerts < 5:
+            system_status = "warning"
+        else:
+            system_status = "offline"  # High alert state
+
+        # Latency percentiles and error rate of the real XDR calls made recently
+        # (including the one above), so no probe request is needed
+        latency = latency_tracker.summary(base_url) or {
+            "count": 0, "p50": 0, "p95": 0, "p99": 0, "errorRate": 0.0, "endpoints": {}
+        }
+        error_rate = latency["errorRate"]
+        success_rate = 100.0 - error_rate
+
+        return {
+            "systemStatus": system_status,
+            "activeAlerts": active_alerts,
+            "lastUpdate": int(datetime.now().timestamp()),
+            "recentIncidents": recent_incidents[:5],  # Last 5 incidents
+            "performanceMetrics": {
+                "apiLatency": latency["p50"],
+                "latencyP95": latency["p95"],
+                "latencyP99": latency["p99"],
+                "sampleCount": latency["count"],
+                "successRate": round(success_rate, 1),
+                "errorRate": round(error_rate, 1),
+                "endpoints": latency["endpoints"]
             }
+        }
+
+    @staticmethod
+    def _check_result(result: Dict[str, Any], what: str) -> Dict[str, Any]:
+        """Return the data of a successful service result, raising on failure"""
+        if not result.get("success"):
+            raise RuntimeError(f"Failed to fetch {what}: {result.get('message', 'unknown error')}")
+        return result.get("data") or {}
 
     async def _fetch_incidents_count(
         self,
@@ -199,25 +261,18 @@ class DashboardService:
         end_timestamp: int
     ) -> int:
         """Fetch count of incidents in the given time range"""
-        try:
-            incidents_service = SecurityIncidentsService()
-            result = await incidents_service.get_incidents(
-                auth_code=auth_code,
-                base_url=base_url,
-                start_timestamp=start_timestamp,
-                end_timestamp=end_timestamp,
-                page_size=1,  # We only need the count
-                page=1
-            )
-
-            if not result.get("success"):
-                return 0
-
-            data = result.get("data") or {}
-            return int(data.get("total", 0) or 0)
-        except Exception as e:
-            print(f"Error fetching incidents count: {str(e)}")
-            return 0
+        incidents_service = SecurityIncidentsService()
+        result = await incidents_service.get_incidents(
+            auth_code=auth_code,
+            base_url=base_url,
+            start_timestamp=start_timestamp,
+            end_timestamp=end_timestamp,
+            page_size=INCIDENT_COUNT_PAGE_SIZE,  # We only need the count
+            page=1
+        )
+
+        data = self._check_result(result, "incidents count")
+        return int(data.get("total", 0) or 0)
 
     async def _fetch_pending_incidents_count(
         self,
@@ -225,59 +280,36 @@ class DashboardService:
         base_url: str
     ) -> int:
         """Fetch count of pending (not handled) incidents"""
-        try:
-            incidents_service = SecurityIncidentsService()
-            # Get today's incidents with severity >= 3 and dealStatus = 0
-            end_timestamp = int(datetime.now().timestamp())
-            start_timestamp = int((datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)).timestamp())
-
-            result = await incidents_service.get_incidents(
-                auth_code=auth_code,
-                base_url=base_url,
-                start_timestamp=start_timestamp,
-                end_timestamp=end_timestamp,
-                severities=[3, 4],
-                deal_status=[0],  # Not handled
-                page_size=1,
-                page=1
-            )
-
-            if not result.get("success"):
-                return 0
-
-            data = result.get("data") or {}
-            return int(data.get("total", 0) or 0)
-        except Exception as e:
-            print(f"Error fetching pending incidents: {str(e)}")
-            return 0
+        incidents_service = SecurityIncidentsService()
+        # Get today's incidents with severity >= 3 and dealStatus = 0
+        end_timestamp = int(datetime.now().timestamp())
+        start_timestamp = int((datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)).timestamp())
+
+        result = await incidents_service.get_incidents(
+            auth_code=auth_code,
+            base_url=base_url,
+            start_timestamp=start_timestamp,
+            end_timestamp=end_timestamp,
+            severities=[3, 4],
+            deal_status=[0],  # Not handled
+            page_size=INCIDENT_COUNT_PAGE_SIZE,
+            page=1
+        )
+
+        data = self._check_result(result, "pending incidents")
+        return int(data.get("total", 0) or 0)
 
     async def _fetch_blocked_ips_count(
         self,
         auth_code: str,
-        base_url: str,
-        start_timestamp: int
+        base_url: str
     ) -> int:
-        """Fetch count of blocked IPs in the given time range"""
-        try:
-            ipblock_service = IpBlockService(base_url=base_url, auth_code=auth_code)
-            # Query block rules and keep only active statuses
-            result = await ipblock_service.search_rules(
-                page_size=200,
-                page=1
-            )
-
-            if not result.get("success"):
-                return 0
-
-            rules = (result.get("data") or {}).get("item", []) or []
-            active_rules = [
-                rule for rule in rules
-                if rule.get("status") in IpBlockService.ACTIVE_BLOCK_STATUSES
-            ]
-            return len(active_rules)
-        except Exception as e:
-            print(f"Error fetching blocked IPs: {str(e)}")
-            return 0
+        """Fetch the number of distinct IPs/CIDRs blocked by active rules"""
+        ipblock_service = IpBlockService(base_url=base_url, auth_code=auth_code)
+        result = await ipblock_service.count_blocked()
+        if not result.get("success"):
+            raise RuntimeError(f"Failed to fetch blocked IPs: {result['error_info']['raw_message']}")
+        return result["blocked_ips"]
 
     async def _fetch_recent_high_severity_incidents(
         self,
@@ -286,85 +318,152 @@ class DashboardService:
         limit: int = 10
     ) -> List[Dict[str, Any]]:
         """Fetch recent high-severity incidents"""
-        try:
-            incidents_service = SecurityIncidentsService()
-            end_timestamp = int(datetime.now().timestamp())
-            start_timestamp = int((datetime.now() - timedelta(hours=24)).timestamp())
-
-            result = await incidents_service.get_incidents(
-                auth_code=auth_code,
-                base_url=base_url,
-                start_timestamp=start_timestamp,
-                end_timestamp=end_timestamp,
-                severities=[3, 4],  # High and critical
-                page_size=limit,
-                page=1
-            )
+        incidents_service = SecurityIncidentsService()
+        end_timestamp = int(datetime.now().timestamp())
+        start_timestamp = int((datetime.now() - timedelta(hours=24)).timestamp())
+
+        result = await incidents_service.get_incidents(
+            auth_code=auth_code,
+            base_url=base_url,
+            start_timestamp=start_timestamp,
+            end_timestamp=end_timestamp,
+            severities=[3, 4],  # High and critical
+            page_size=limit,
+            page=1
+        )
+
+        incidents = self._check_result(result, "recent incidents").get("item", []) or []
+        return [
+            {
+                "id": inc.get("uuId", ""),
+                "severity": inc.get("severity", 0),
+                "message": inc.get("name", "Unknown"),
+                "timestamp": inc.get("endTime", 0)
+            }
+            for inc in incidents
+        ]
 
-            if not result.get("success"):
-                return []
-
-            incidents = (result.get("data") or {}).get("item", []) or []
-            return [
-                {
-                    "id": inc.get("uuId", ""),
-                    "severity": inc.get("severity", 0),
-                    "message": inc.get("name", "Unknown"),
-                    "timestamp": inc.get("endTime", 0)
-                }
-                for inc in incidents
-            ]
-        except Exception as e:
-            print(f"Error fetching recent incidents: {str(e)}")
-            return []
-
-    async def _test_api_latency(
+    async def _fetch_trend_and_distribution(
         self,
         auth_code: str,
-        base_url: str
-    ) -> bool:
-        """Test API latency by making a quick call"""
-        try:
-            incidents_service = SecurityIncidentsService()
-            await incidents_service.test_connectivity(
-                auth_code=auth_code,
-                base_url=base_url
-            )
-            return True
-        except Exception:
-            return False
-
-    def _generate_trend_data(self, days: int = 7) -> List[Dict[str, Any]]:
-        """Generate mock trend data (can be replaced with real historical data)"""
-        trend = []
+        base_url: str,
+        days: int = 7
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Fetch per-day incident counts and severity/type distribution for the last N days
+
+        Every count is issued in one concurrent batch. Incidents are bucketed
+        by creation time, so closed days (and the closed part of the window)
+        never change and are memoized; a warm refresh only queries today's
+        live window.
+
+        Args:
+            auth_code: Flux authentication code
+            base_url: Flux API base URL
+            days: Number of calendar days including today
+
+        Returns:
+            (trend: [{"date", "count"}], distribution: {"severity": {...}, "type": {...}})
+
+        Raises:
+            RuntimeError: If any count failed
+        """
+        now = datetime.now()
+        today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        window_start = today_start - timedelta(days=days - 1)
+        now_ts = int(now.timestamp())
+        today_ts = int(today_start.timestamp())
+        window_ts = int(window_start.timestamp())
+
+        queries: List[Dict[str, Any]] = []
+
+        # One count per day; every day but today is closed
+        day_labels = []
         for i in range(days):
-            date = (datetime.now() - timedelta(days=days - i - 1)).strftime("%Y-%m-%d")
-            # Mock data with some variation
-            count = max(5, 20 - abs(i - days // 2) * 2 + (i % 3))
-            trend.append({
-                "date": date,
-                "count": count
+            day_start = window_start + timedelta(days=i)
+            day_labels.append(day_start.strftime("%Y-%m-%d"))
+            queries.append({
+                "startTimestamp": int(day_start.timestamp()),
+                "endTimestamp": min(int((day_start + timedelta(days=1)).timestamp()), now_ts),
+                "timeField": INCIDENT_COUNT_TIME_FIELD
             })
-        return trend
 
-    def _get_distribution_data(
+        # Distribution = closed part of the window (cacheable all day) + today so far
+        spans = [(today_ts, now_ts)]
+        if window_ts < today_ts:
+            spans.insert(0, (window_ts, today_ts))
+        categories = [("severity", "severities", value, name) for value, name in SEVERITY_NAMES.items()]
+        categories += [("type", "threatDefines", value, name) for value, name in THREAT_DEFINE_NAMES.items()]
+        for _, field, value, _ in categories:
+            for span_start, span_end in spans:
+                queries.append({
+                    "startTimestamp": span_start,
+                    "endTimestamp": span_end,
+                    "timeField": INCIDENT_COUNT_TIME_FIELD,
+                    field: [value]
+                })
+
+        counts = await self._fetch_incident_counts(auth_code, base_url, queries)
+        failed = sum(count is None for count in counts)
+        if failed:
+            raise RuntimeError(f"Failed to fetch {failed} of {len(counts)} incident counts")
+
+        trend = [{"date": date, "count": count} for date, count in zip(day_labels, counts[:days])]
+
+        distribution: Dict[str, Dict[str, int]] = {"severity": {}, "type": {}}
+        category_counts = counts[days:]
+        for index, (group, _, _, name) in enumerate(categories):
+            distribution[group][name] = sum(category_counts[index * len(spans):(index + 1) * len(spans)])
+
+        return trend, distribution
+
+    async def _fetch_incident_counts(
         self,
         auth_code: str,
-        base_url: str
-    ) -> Dict[str, Any]:
-        """Get distribution data for incidents (severity and type)"""
-        # This is a simplified version - can be enhanced with real data
-        return {
-            "severity": {
-                "严重": 2,
-                "高危": 8,
-                "中危": 15,
-                "低危": 25
-            },
-            "type": {
-                "恶意文件": 5,
-                "网络攻击": 12,
-                "异常行为": 8,
-                "其他": 25
-            }
-        }
+        base_url: str,
+        queries: List[Dict[str, Any]]
+    ) -> List[Optional[int]]:
+        """
+        Count incidents for many filter sets concurrently, serving closed windows from the cache
+
+        Args:
+            auth_code: Flux authentication code
+            base_url: Flux API base URL
+            queries: Filters per count (startTimestamp/endTimestamp/timeField plus list API filters)
+
+        Returns:
+            Count per query (None where it failed), in order
+        """
+        keys = [incident_count_cache.key(base_url, auth_code, query) for query in queries]
+        counts: List[Optional[int]] = [incident_count_cache.get(key) for key in keys]
+        missing = [index for index, count in enumerate(counts) if count is None]
+        if not missing:
+            return counts
+
+        incidents_service = SecurityIncidentsService()
+        semaphore = asyncio.Semaphore(DASHBOARD_COUNT_CONCURRENCY)
+
+        async def fetch(query: Dict[str, Any]) -> Optional[int]:
+            filters = dict(query)
+            async with semaphore:
+                result = await incidents_service.get_incidents(
+                    auth_code=auth_code,
+                    base_url=base_url,
+                    start_timestamp=filters.pop("startTimestamp"),
+                    end_timestamp=filters.pop("endTimestamp"),
+                    time_field=filters.pop("timeField", INCIDENT_COUNT_TIME_FIELD),
+                    severities=filters.pop("severities", None),
+                    page_size=INCIDENT_COUNT_PAGE_SIZE,
+                    page=1,
+                    **filters
+                )
+            if not result.get("success"):
+                return None
+            return int((result.get("data") or {}).get("total", 0) or 0)
+
+        fetched = await asyncio.gather(*[fetch(queries[index]) for index in missing])
+        for index, count in zip(missing, fetched):
+            counts[index] = count
+            incident_count_cache.put(keys[index], count)
+
+        return counts
@@ -0,0 +1,248 @@
+"""
+Intent Router
+Local character n-gram TF-IDF classifier that routes clear-cut chat messages without an LLM round trip
+"""
+
+import math
+import re
+import threading
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+from .skills_registry import SKILLS_REGISTRY
+
+
+# Feature settings
+ROUTER_NGRAM_RANGE = (1, 3)
+
+# Decision thresholds: route locally only when the best class is both similar and clearly ahead
+ROUTER_MIN_SIMILARITY = 0.30
+ROUTER_MIN_MARGIN = 0.12
+
+# Online learning from LLM-labelled traffic
+ROUTER_LEARN_MIN_CONFIDENCE = 0.9  # only confident LLM decisions become training data
+ROUTER_MAX_LEARNED = 2000  # most recent learned messages kept
+ROUTER_REBUILD_EVERY = 20  # learned messages between model rebuilds
+
+GENERAL_CHAT_INTENT = "general_chat"
+
+# Seed examples for messages that belong to no skill
+GENERAL_CHAT_EXAMPLES = [
+    "你好", "您好，你是谁", "谢谢你的帮助", "你能做什么",
+    "什么是SQL注入攻击", "解释一下什么是XDR", "如何防范勒索病毒", "介绍一下零信任架构",
+    "Hello", "What can you do", "Thanks a lot", "Explain what a DDoS attack is",
+]
+
+# Entities are replaced by placeholders so examples generalize across concrete values
+_IPV4 = re.compile(r"\b\d{1,3}(?:\.\d{1,3}){3}(?:/\d{1,2})?\b")
+_INCIDENT_ID = re.compile(r"incident-[0-9a-zA-Z-]+", re.IGNORECASE)
+_NUMBER = re.compile(r"\d+")
+_WHITESPACE = re.compile(r"\s+")
+IP_PLACEHOLDER = "\ue000"
+INCIDENT_PLACEHOLDER = "\ue001"
+NUMBER_PLACEHOLDER = "\ue002"
+
+SparseVector = Dict[str, float]
+
+
+def _normalize(text: str) -> str:
+    text = _INCIDENT_ID.sub(INCIDENT_PLACEHOLDER, text.lower())
+    text = _IPV4.sub(IP_PLACEHOLDER, text)
+    text = _NUMBER.sub(NUMBER_PLACEHOLDER, text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def _ngram_counts(text: str) -> Dict[str, int]:
+    """Character n-gram counts of a normalized message"""
+    padded = f" {_normalize(text)} "
+    counts: Dict[str, int] = {}
+    low, high = ROUTER_NGRAM_RANGE
+    for size in range(low, high + 1):
+        for start in range(len(padded) - size + 1):
+            gram = padded[start:start + size]
+            if gram.strip():
+                counts[gram] = counts.get(gram, 0) + 1
+    return counts
+
+
+def _l2_normalize(vector: SparseVector) -> SparseVector:
+    norm = math.sqrt(sum(value * value for value in vector.values()))
+    if not norm:
+        return vector
+    return {feature: value / norm for feature, value in vector.items()}
+
+
+def _seed_examples() -> List[Tuple[str, str]]:
+    """(text, intent) pairs from the skills registry"""
+    examples = []
+    for skill in SKILLS_REGISTRY:
+        intent = skill["intent"]
+        examples.append((skill["intent_description"], intent))
+        examples.append((skill["name"], intent))
+        for prompt in skill.get("examplePrompts", []):
+            for language in ("chinese", "english"):
+                if prompt.get(language):
+                    examples.append((prompt[language], intent))
+    examples.extend((text, GENERAL_CHAT_INTENT) for text in GENERAL_CHAT_EXAMPLES)
+    return examples
+
+
+class IntentRouter:
+    """
+    Nearest-centroid classifier over sublinear TF-IDF character n-grams
+
+    Trained from the skills registry's examplePrompts/intent_description,
+    plus messages the LLM later labelled with high confidence. Rebuilding
+    is linear in the training set, so it is cheap enough to run inline.
+    """
+
+    def __init__(self):
+        self._seed = _seed_examples()
+        self._learned: Deque[Tuple[str, str]] = deque(maxlen=ROUTER_MAX_LEARNED)
+        self._pending = 0
+        self._idf: Dict[str, float] = {}
+        self._centroids: Dict[str, SparseVector] = {}
+        self._lock = threading.Lock()
+        self.local_hits = 0
+        self.fallbacks = 0
+        self._rebuild()
+
+    def classify(self, message: str) -> List[Tuple[str, float]]:
+        """
+        Score a message against every intent
+
+        Returns:
+            (intent, cosine similarity) pairs, best first
+        """
+        with self._lock:
+            if self._pending >= ROUTER_REBUILD_EVERY:
+                self._rebuild()
+            idf, centroids = self._idf, self._centroids
+
+        vector = self._vectorize(message, idf)
+        scores = [
+            (intent, sum(weight * centroid.get(feature, 0.0) for feature, weight in vector.items()))
+            for intent, centroid in centroids.items()
+        ]
+        scores.sort(key=lambda item: item[1], reverse=True)
+        return scores
+
+    def route(self, message: str) -> Optional[Dict[str, object]]:
+        """
+        Decide an intent locally if the message is unambiguous
+
+        Returns:
+            {"intent", "confidence", "margin", "source": "local"} or None
+            when the LLM should decide
+        """
+        scores = self.classify(message)
+        if not scores:
+            self.fallbacks += 1
+            return None
+
+        intent, similarity = scores[0]
+        margin = similarity - (scores[1][1] if len(scores) > 1 else 0.0)
+        if similarity < ROUTER_MIN_SIMILARITY or margin < ROUTER_MIN_MARGIN:
+            self.fallbacks += 1
+            return None
+
+        self.local_hits += 1
+        return {
+            "intent": intent,
+            "confidence": round(similarity, 3),
+            "margin": round(margin, 3),
+            "source": "local"
+        }
+
+    def learn(self, message: str, intent: str, confidence: float):
+        """Add an LLM-labelled message to the training set (low-confidence labels are ignored)"""
+        if not message or confidence < ROUTER_LEARN_MIN_CONFIDENCE:
+            return
+        with self._lock:
+            if intent not in self._centroids:
+                return
+            self._learned.append((message, intent))
+            self._pending += 1
+
+    def _rebuild(self):
+        """Recompute IDF weights and per-intent centroids (caller holds the lock or is __init__)"""
+        examples = self._seed + list(self._learned)
+        counts = [(_ngram_counts(text), intent) for text, intent in examples]
+
+        document_frequency: Dict[str, int] = {}
+        for grams, _ in counts:
+            for gram in grams:
+                document_frequency[gram] = document_frequency.get(gram, 0) + 1
+        total = len(counts)
+        idf = {gram: math.log((1 + total) / (1 + frequency)) + 1.0 for gram, frequency in document_frequency.items()}
+
+        sums: Dict[str, SparseVector] = {}
+        for grams, intent in counts:
+            centroid = sums.setdefault(intent, {})
+            for feature, weight in self._weigh(grams, idf).items():
+                centroid[feature] = centroid.get(feature, 0.0) + weight
+
+        self._idf = idf
+        self._centroids = {intent: _l2_normalize(vector) for intent, vector in sums.items()}
+        self._pending = 0
+
+    @classmethod
+    def _vectorize(cls, message: str, idf: Dict[str, float]) -> SparseVector:
+        return cls._weigh(_ngram_counts(message), idf)
+
+    @staticmethod
+    def _weigh(grams: Dict[str, int], idf: Dict[str, float]) -> SparseVector:
+        """Sublinear TF x IDF, L2-normalized; n-grams unseen in training are dropped"""
+        return _l2_normalize({
+            gram: (1.0 + math.log(count)) * idf[gram]
+            for gram, count in grams.items()
+            if gram in idf
+        })
+
+
+class SpeculationStats:
+    """
+    Outcome counters for speculative parameter extraction
+
+    launched: extractors started alongside LLM intent detection
+    hits: turns where the detected intent had been speculated
+    misses: turns where it had not (the params of the fused intent call are used)
+    cancelled: speculative extractors discarded because their intent was not chosen
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.turns = 0
+        self.launched = 0
+        self.hits = 0
+        self.misses = 0
+        self.cancelled = 0
+
+    def record(self, launched: int, hit: bool, cancelled: int):
+        """Record one speculated chat turn"""
+        with self._lock:
+            self.turns += 1
+            self.launched += launched
+            self.cancelled += cancelled
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "turns": self.turns,
+                "launched": self.launched,
+                "hits": self.hits,
+                "misses": self.misses,
+                "cancelled": self.cancelled,
+                "hitRate": round(self.hits / self.turns * 100, 1) if self.turns else 0.0
+            }
+
+
+# 全局意图路由实例
+intent_router = IntentRouter()
+
+# 全局推测提取统计实例
+speculation_stats = SpeculationStats()
@@ -4,18 +4,35 @@ Handles IP blocking status checking, device management, and blocking operations
 """
 
 import re
+import asyncio
 import ipaddress
+import logging
+import httpx
 import requests
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 from ..utils.sdk.aksk_py3 import Signature
-from ..utils.error_handler import parse_api_error, format_error_message
+from ..utils.signature_cache import get_signature
+from ..utils.xdr_client import send_xdr_request
+from ..utils.error_handler import parse_api_error
+from ..utils.ip_ranges import IpRangeIndex, parse_ip_interval
+from .block_rule_index import (
+    ACTIVE_BLOCK_STATUSES, BlockRuleIndex, all_rules_time_range, block_rule_index_registry
+)
+
+logger = logging.getLogger(__name__)
 
 
 class IpBlockService:
     """IP blocking service for Flux XDR API"""
 
     # Active block status values that indicate an IP is currently blocked
-    ACTIVE_BLOCK_STATUSES = ["block success", "block ip in deal"]
+    ACTIVE_BLOCK_STATUSES = ACTIVE_BLOCK_STATUSES
+
+    # Maximum IPs packed into a single block rule's view list
+    BLOCK_IPS_BATCH_SIZE = 100
+
+    # Maximum IPs accepted by one /ipblock/block-batch call (bounds the rule writes per request)
+    BLOCK_IPS_MAX_PER_REQUEST = 1000
 
     def __init__(self, base_url: str, auth_code: Optional[str] = None,
                  ak: Optional[str] = None, sk: Optional[str] = None):
@@ -36,7 +53,9 @@ class IpBlockService:
 
         # Initialize signature if credentials are provided
         if auth_code or (ak and sk):
-            self.signature = Signature(auth_code=auth_code, ak=ak, sk=sk)
+            self.signature = (
+                Signature(ak=ak, sk=sk) if ak and sk else get_signature(auth_code)
+            )
 
     def validate_ip(self, ip: str) -> bool:
         """Validate IP address format"""
@@ -55,12 +74,69 @@ class IpBlockService:
         normalized = re.sub(r'\s+', '', normalized)
         return normalized.lower()
 
-    def check_ip_blocked(self, ip_address: str) -> Dict[str, Any]:
+    @staticmethod
+    def _format_blocked_rule(item: Dict[str, Any]) -> Dict[str, Any]:
+        """Extract the fields reported for an active block rule"""
+        return {
+            "id": item.get("id"),
+            "name": item.get("name"),
+            "status": item.get("status"),
+            "createTime": item.get("createTime"),
+            "updateTime": item.get("updateTime"),
+            "blockIpMethod": item.get("blockIpMethod"),
+            "blockIpTimeRange": item.get("blockIpTimeRange"),
+            "blockIpRule": item.get("blockIpRule", {}),
+            "reason": item.get("reason"),
+            "createUser": item.get("createUser")
+        }
+
+    @staticmethod
+    def _views_cover(view_list: List[str], ip_address: str) -> bool:
+        """Whether any view entry (IP, CIDR or range) contains the IP"""
+        if ip_address in view_list:
+            return True
+        interval = parse_ip_interval(ip_address)
+        if interval is None:
+            return False
+        version, point, _ = interval
+        for view in view_list:
+            view_interval = parse_ip_interval(view)
+            if view_interval and view_interval[0] == version and view_interval[1] <= point <= view_interval[2]:
+                return True
+        return False
+
+    def _blocked_status(self, items: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Build a check_ip_blocked-style result from the active rules matching an IP"""
+        all_devices = []
+        for item in items:
+            all_devices.extend(item.get("devices", []))
+        return {
+            "success": True,
+            "blocked": len(items) > 0,
+            "rules": [self._format_blocked_rule(item) for item in items],
+            "devices": all_devices,
+            "total_rules": len(items)
+        }
+
+    async def _get_rule_index(self) -> Optional[BlockRuleIndex]:
+        """Return this appliance's up-to-date block rule index, or None if unavailable"""
+        if not self.auth_code or not self.signature:
+            return None
+        index = block_rule_index_registry.get(self.base_url, self.auth_code, self.search_rules)
+        if await index.ensure_fresh():
+            return index
+        return None
+
+    async def check_ip_blocked(self, ip_address: str, fresh: bool = False) -> Dict[str, Any]:
         """
         Check if an IP address is already blocked
 
+        Answered from the local block rule index unless fresh is set or the index
+        is unavailable, in which case the rule list is queried live.
+
         Args:
             ip_address: IP address to check
+            fresh: Skip the local index and query the appliance directly
 
         Returns:
             Dict with keys:
@@ -84,14 +160,22 @@ class IpBlockService:
                 }
             }
 
+        if not fresh:
+            index = await self._get_rule_index()
+            if index is not None:
+                return self._blocked_status(index.lookup(ip_address))
+
         try:
             # Prepare API request
             api_endpoint = f"{self.base_url}/api/xdr/v1/responses/blockiprule/list"
 
-            # Build request body - search for IP in view field
+            # Build request body - search for IP in view field across every rule, not just the last 7 days
+            start_timestamp, end_timestamp = all_rules_time_range()
             request_body = {
                 "pageSize": 100,
                 "page": 1,
+                "startTimestamp": start_timestamp,
+                "endTimestamp": end_timestamp,
                 "searchInfos": [
                     {
                         "fieldName": "view",
@@ -125,9 +209,7 @@ class IpBlockService:
             self.signature.signature(req)
 
             # Send request
-            session = requests.Session()
-            session.verify = False  # Disable SSL verification for development
-            response = session.send(req.prepare())
+            response = await send_xdr_request(req)
 
             # Parse response
             if response.status_code == 200:
@@ -145,20 +227,9 @@ class IpBlockService:
                         block_ip_rule = item.get("blockIpRule", {})
                         view_list = block_ip_rule.get("view", [])
 
-                        # Check if IP matches (exact match or in list) AND rule is active
-                        if ip_address in view_list and item.get("status") in self.ACTIVE_BLOCK_STATUSES:
-                            blocked_rules.append({
-                                "id": item.get("id"),
-                                "name": item.get("name"),
-                                "status": item.get("status"),
-                                "createTime": item.get("createTime"),
-                                "updateTime": item.get("updateTime"),
-                                "blockIpMethod": item.get("blockIpMethod"),
-                                "blockIpTimeRange": item.get("blockIpTimeRange"),
-                                "blockIpRule": block_ip_rule,
-                                "reason": item.get("reason"),
-                                "createUser": item.get("createUser")
-                            })
+                        # Check if IP matches (exact, CIDR or range) AND rule is active
+                        if self._views_cover(view_list, ip_address) and item.get("status") in self.ACTIVE_BLOCK_STATUSES:
+                            blocked_rules.append(self._format_blocked_rule(item))
 
                             # Collect devices
                             devices = item.get("devices", [])
@@ -186,7 +257,7 @@ class IpBlockService:
                     "error_info": parse_api_error(response.status_code, response.text)
                 }
 
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             return {
                 "success": False,
                 "blocked": False,
@@ -211,7 +282,94 @@ class IpBlockService:
                 }
             }
 
-    def get_available_devices(self, device_type: str = "AF") -> Dict[str, Any]:
+    async def check_ips_blocked(
+        self,
+        ip_addresses: List[str],
+        fresh: bool = False
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Check block status for many IP addresses in a single pass
+
+        Answered from the local block rule index when available. Otherwise walks
+        the block rule list once (pages fetched concurrently) and matches every
+        IP locally, falling back to concurrent per-IP searches when the rule list
+        has more pages than there are IPs to check.
+
+        Args:
+            ip_addresses: IP addresses to check
+            fresh: Skip the local index and query the appliance directly
+
+        Returns:
+            Dict mapping each IP to a check_ip_blocked-style result
+        """
+        results: Dict[str, Dict[str, Any]] = {}
+        valid_ips = []
+        for ip_address in dict.fromkeys(ip_addresses):
+            if self.validate_ip(ip_address):
+                valid_ips.append(ip_address)
+            else:
+                results[ip_address] = await self.check_ip_blocked(ip_address)
+
+        if not valid_ips:
+            return results
+
+        if not fresh:
+            index = await self._get_rule_index()
+            if index is not None:
+                for ip_address, items in index.lookup_many(valid_ips).items():
+                    results[ip_address] = self._blocked_status(items)
+                return results
+
+        page_size = 100
+        first_page = await self.search_rules(page_size=page_size, page=1)
+        if not first_page["success"]:
+            for ip_address in valid_ips:
+                results[ip_address] = {
+                    "success": False,
+                    "blocked": False,
+                    "error_info": first_page.get("error_info")
+                }
+            return results
+
+        total = first_page["data"].get("total", 0) or 0
+        total_pages = max(1, (total + page_size - 1) // page_size)
+
+        pages = [first_page]
+        if total_pages - 1 > len(valid_ips):
+            pages = None
+        elif total_pages > 1:
+            pages.extend(await asyncio.gather(*[
+                self.search_rules(page_size=page_size, page=page)
+                for page in range(2, total_pages + 1)
+            ]))
+            if not all(page["success"] for page in pages):
+                pages = None
+
+        if pages is None:
+            # Rule list too large (or incomplete) - search each IP directly
+            per_ip_results = await asyncio.gather(*[
+                self.check_ip_blocked(ip_address, fresh=True) for ip_address in valid_ips
+            ])
+            results.update(zip(valid_ips, per_ip_results))
+            return results
+
+        # Index active rules by the IPs, CIDRs and ranges they cover
+        active_rules: List[Dict[str, Any]] = []
+        views = IpRangeIndex()
+        for page in pages:
+            for item in page["data"].get("item", []):
+                if item.get("status") not in self.ACTIVE_BLOCK_STATUSES:
+                    continue
+                for view in item.get("blockIpRule", {}).get("view", []):
+                    views.add(len(active_rules), view)
+                active_rules.append(item)
+
+        for ip_address, positions in views.lookup_many(valid_ips).items():
+            results[ip_address] = self._blocked_status([active_rules[i] for i in sorted(positions)])
+
+        return results
+
+    async def get_available_devices(self, device_type: str = "AF") -> Dict[str, Any]:
         """
         Get available blocking devices
 
@@ -258,9 +416,7 @@ class IpBlockService:
             self.signature.signature(req)
 
             # Send request
-            session = requests.Session()
-            session.verify = False
-            response = session.send(req.prepare())
+            response = await send_xdr_request(req)
 
             # Parse response
             if response.status_code == 200:
@@ -305,7 +461,7 @@ class IpBlockService:
                     "error_info": parse_api_error(response.status_code, response.text)
                 }
 
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             return {
                 "success": False,
                 "devices": [],
@@ -330,11 +486,48 @@ class IpBlockService:
                 }
             }
 
+    async def count_blocked(self) -> Dict[str, Any]:
+        """
+        Count what is currently blocked on the appliance
+
+        Served from the local block rule index, which loads every rule page
+        concurrently once and then refreshes incrementally.
+
+        Returns:
+            Dict with keys:
+                - success: bool
+                - blocked_ips: number of distinct IPs/CIDRs/ranges in active rules
+                - rules: number of active rules
+                - error_info: dict (if the index could not be loaded)
+        """
+        index = await self._get_rule_index()
+        if index is None:
+            return {
+                "success": False,
+                "blocked_ips": 0,
+                "rules": 0,
+                "error_info": {
+                    "error_type": "network_error",
+                    "friendly_message": "封禁规则加载失败",
+                    "raw_message": "Block rule index unavailable",
+                    "suggestion": "请检查网络连接和认证信息",
+                    "actions": ["检查网络连接", "检查认证配置", "重试"]
+                }
+            }
+        return {
+            "success": True,
+            "blocked_ips": index.blocked_count,
+            "rules": index.rule_count
+        }
+
     async def search_rules(
         self,
         page_size: int = 100,
         page: int = 1,
-        search_infos: Optional[List[Dict[str, str]]] = None
+        search_infos: Optional[List[Dict[str, str]]] = None,
+        sort_info: Optional[Dict[str, str]] = None,
+        start_timestamp: Optional[int] = None,
+        end_timestamp: Optional[int] = None
     ) -> Dict[str, Any]:
         """
         Search IP block rules.
@@ -343,6 +536,9 @@ class IpBlockService:
             page_size: Number of records per page
             page: Page number
             search_infos: Optional search filters
+            sort_info: Optional sort, e.g. {"name": "updateTime", "sort": "desc"}
+            start_timestamp: Range start (default: every rule; the API itself defaults to the last 7 days)
+            end_timestamp: Range end (default: now)
 
         Returns:
             Dict with keys:
@@ -353,14 +549,20 @@ class IpBlockService:
         try:
             api_endpoint = f"{self.base_url}/api/xdr/v1/responses/blockiprule/list"
 
+            default_start, default_end = all_rules_time_range()
             request_body: Dict[str, Any] = {
                 "pageSize": page_size,
-                "page": page
+                "page": page,
+                "startTimestamp": default_start if start_timestamp is None else start_timestamp,
+                "endTimestamp": default_end if end_timestamp is None else end_timestamp
             }
 
             if search_infos:
                 request_body["searchInfos"] = search_infos
 
+            if sort_info:
+                request_body["sortInfo"] = sort_info
+
             req = requests.Request(
                 "POST",
                 api_endpoint,
@@ -383,9 +585,7 @@ class IpBlockService:
 
             self.signature.signature(req)
 
-            session = requests.Session()
-            session.verify = False
-            response = session.send(req.prepare())
+            response = await send_xdr_request(req)
 
             if response.status_code == 200:
                 result = response.json()
@@ -413,7 +613,7 @@ class IpBlockService:
                 "error_info": parse_api_error(response.status_code, response.text)
             }
 
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             return {
                 "success": False,
                 "data": {"item": [], "total": 0},
@@ -438,7 +638,7 @@ class IpBlockService:
                 }
             }
 
-    def block_ip(
+    async def block_ip(
         self,
         ip_address: str,
         device_id: int,
@@ -488,6 +688,182 @@ class IpBlockService:
                 }
             }
 
+        return await self._create_block_rule(
+            ips=[ip_address],
+            rule_name=f"Block {ip_address} on {device_name}",
+            success_message=f"IP {ip_address} 已成功在设备 {device_name} 上封禁",
+            device_id=device_id,
+            device_name=device_name,
+            device_type=device_type,
+            device_version=device_version,
+            block_type=block_type,
+            time_type=time_type,
+            time_value=time_value,
+            time_unit=time_unit,
+            reason=reason
+        )
+
+    async def block_ips(
+        self,
+        ip_addresses: List[str],
+        device_id: int,
+        device_name: str,
+        device_type: str = "AF",
+        device_version: str = "",
+        block_type: str = "SRC_IP",
+        time_type: str = "forever",
+        time_value: Optional[int] = None,
+        time_unit: str = "d",
+        reason: str = ""
+    ) -> Dict[str, Any]:
+        """
+        Block many IP addresses with as few rule-creation requests as possible
+
+        IPs sharing the same device/duration/reason are packed into one rule's view
+        list (up to BLOCK_IPS_BATCH_SIZE per rule). If the appliance rejects a
+        multi-IP rule, that chunk is retried per IP so the failure is attributed
+        to the offending address.
+
+        Args:
+            ip_addresses: IP addresses to block
+            device_id: Device ID for blocking
+            device_name: Device name
+            device_type: Device type (AF, EDR, etc.)
+            device_version: Device version
+            block_type: Block entity type (SRC_IP, DST_IP, URL, DNS)
+            time_type: Duration type ("forever" or "temporary")
+            time_value: Duration value when temporary
+            time_unit: Duration unit ("d", "h", "m")
+            reason: Block reason
+
+        Returns:
+            Dict with keys:
+                - success: bool (True if every IP was blocked)
+                - rule_ids: list of all created rule IDs
+                - message: str
+                - total / succeeded / failed: int
+                - results: list of per-IP results ({ip, success, rule_ids, message, error_info})
+        """
+        results: Dict[str, Dict[str, Any]] = {}
+        valid_ips = []
+        for ip_address in dict.fromkeys(ip_addresses):
+            if self.validate_ip(ip_address):
+                valid_ips.append(ip_address)
+            else:
+                results[ip_address] = {
+                    "success": False,
+                    "rule_ids": [],
+                    "message": "IP地址格式不正确",
+                    "error_info": {
+                        "error_type": "validation_error",
+                        "friendly_message": f"IP地址格式不正确: {ip_address}",
+                        "raw_message": f"Invalid IP address format: {ip_address}",
+                        "suggestion": "请检查IP地址格式，应如192.168.1.1",
+                        "actions": ["检查IP地址格式", "重新输入"]
+                    }
+                }
+
+        rule_params = {
+            "device_id": device_id,
+            "device_name": device_name,
+            "device_type": device_type,
+            "device_version": device_version,
+            "block_type": block_type,
+            "time_type": time_type,
+            "time_value": time_value,
+            "time_unit": time_unit,
+            "reason": reason
+        }
+
+        if time_type == "temporary" and time_value is None:
+            # 时长参数缺失与具体IP无关，直接返回校验错误，不发起请求
+            for ip_address in valid_ips:
+                results[ip_address] = await self.block_ip(ip_address=ip_address, **rule_params)
+            valid_ips = []
+
+        async def block_chunk(chunk: List[str]) -> Dict[str, Dict[str, Any]]:
+            if len(chunk) == 1:
+                result = await self.block_ip(ip_address=chunk[0], **rule_params)
+                return {chunk[0]: result}
+
+            result = await self._create_block_rule(
+                ips=chunk,
+                rule_name=f"Block {len(chunk)} IPs on {device_name}",
+                success_message=f"已成功在设备 {device_name} 上批量封禁 {len(chunk)} 个IP",
+                **rule_params
+            )
+            error_type = (result.get("error_info") or {}).get("error_type")
+            if result["success"] or error_type in ("network_error", "auth_error"):
+                return {ip_address: result for ip_address in chunk}
+
+            # 批量规则被拒绝: 逐个封禁以确定具体失败的IP
+            single_results = await asyncio.gather(*[
+                self.block_ip(ip_address=ip_address, **rule_params) for ip_address in chunk
+            ])
+            return dict(zip(chunk, single_results))
+
+        chunk_results = await asyncio.gather(*[
+            block_chunk(valid_ips[i:i + self.BLOCK_IPS_BATCH_SIZE])
+            for i in range(0, len(valid_ips), self.BLOCK_IPS_BATCH_SIZE)
+        ])
+        for chunk_result in chunk_results:
+            results.update(chunk_result)
+
+        per_ip = []
+        all_rule_ids = []
+        for ip_address in dict.fromkeys(ip_addresses):
+            result = results[ip_address]
+            for rule_id in result.get("rule_ids", []):
+                if rule_id not in all_rule_ids:
+                    all_rule_ids.append(rule_id)
+            per_ip.append({
+                "ip": ip_address,
+                "success": result.get("success", False),
+                "rule_ids": result.get("rule_ids", []),
+                "message": result.get("message", ""),
+                "error_info": result.get("error_info")
+            })
+
+        succeeded = sum(1 for item in per_ip if item["success"])
+        failed = len(per_ip) - succeeded
+        if failed == 0:
+            message = f"已成功在设备 {device_name} 上封禁 {succeeded} 个IP"
+        elif succeeded > 0:
+            message = f"部分封禁成功: {succeeded}/{len(per_ip)} 个IP已在设备 {device_name} 上封禁"
+        else:
+            message = f"封禁失败: {len(per_ip)} 个IP均未能封禁"
+
+        return {
+            "success": failed == 0 and len(per_ip) > 0,
+            "rule_ids": all_rule_ids,
+            "message": message,
+            "total": len(per_ip),
+            "succeeded": succeeded,
+            "failed": failed,
+            "results": per_ip
+        }
+
+    async def _create_block_rule(
+        self,
+        ips: List[str],
+        rule_name: str,
+        success_message: str,
+        device_id: int,
+        device_name: str,
+        device_type: str = "AF",
+        device_version: str = "",
+        block_type: str = "SRC_IP",
+        time_type: str = "forever",
+        time_value: Optional[int] = None,
+        time_unit: str = "d",
+        reason: str = ""
+    ) -> Dict[str, Any]:
+        """
+        Create one block rule covering the given (already validated) IPs
+
+        Returns:
+            Dict with keys: success, rule_ids, message, rule_count, error_info (if error)
+        """
         # Validate temporary block parameters
         if time_type == "temporary":
             if time_value is None:
@@ -510,12 +886,12 @@ class IpBlockService:
 
             # Build request body
             request_body = {
-                "name": f"Block {ip_address} on {device_name}",
+                "name": rule_name,
                 "timeType": time_type,
                 "blockIpRule": {
                     "type": block_type,
                     "mode": "in",
-                    "view": [ip_address]
+                    "view": list(ips)
                 },
                 "devices": [
                     {
@@ -567,50 +943,46 @@ class IpBlockService:
             # Sign the request
             self.signature.signature(req)
 
-            # Log the request for debugging
-            print(f"[DEBUG] IP Block Request:")
-            print(f"  URL: {api_endpoint}")
-            print(f"  Body: {request_body}")
-            print(f"  Headers: {req.headers}")
+            logger.debug("IP block request: url=%s body=%s", api_endpoint, request_body)
 
-            # Send request with retry logic for connection issues
+            # Send request with retry logic for connection issues and transient server errors
             max_retries = 3
+            retry_statuses = [429, 500, 502, 503, 504]
             for attempt in range(max_retries):
                 try:
-                    session = requests.Session()
-                    session.verify = False
-
-                    # Configure session with better SSL/TLS handling
-                    from requests.adapters import HTTPAdapter
-                    from urllib3.util.retry import Retry
-
-                    retry_strategy = Retry(
-                        total=3,
-                        backoff_factor=1,
-                        status_forcelist=[429, 500, 502, 503, 504],
-                        allowed_methods=["POST"]
-                    )
-                    adapter = HTTPAdapter(
-                        max_retries=retry_strategy,
-                        pool_connections=10,
-                        pool_maxsize=10
-                    )
-                    session.mount('https://', adapter)
-                    session.mount('http://', adapter)
-
-                    # Increase timeout
-                    response = session.send(req.prepare(), timeout=(10, 30))
+                    response = await send_xdr_request(req, timeout=httpx.Timeout(30.0, connect=10.0))
+
+                    if response.status_code in retry_statuses and attempt < max_retries - 1:
+                        logger.warning(
+                            "IP block request returned %s (attempt %d/%d), retrying",
+                            response.status_code, attempt + 1, max_retries
+                        )
+                        await asyncio.sleep(1)  # Wait before retry
+                        continue
 
                     # If we get here, request succeeded
                     break
 
-                except (requests.exceptions.ConnectionError,
-                        requests.exceptions.ConnectionResetError,
-                        requests.exceptions.SSLError) as e:
+                except httpx.TimeoutException:
+                    return {
+                        "success": False,
+                        "rule_ids": [],
+                        "message": "请求超时，服务器未响应",
+                        "error_info": {
+                            "error_type": "network_error",
+                            "friendly_message": "请求超时",
+                            "raw_message": "Request timeout",
+                            "suggestion": "请检查网络连接或稍后重试",
+                            "actions": ["检查网络", "重试", "联系管理员"]
+                        }
+                    }
+                except (httpx.NetworkError, httpx.RemoteProtocolError) as e:
                     if attempt < max_retries - 1:
-                        print(f"[DEBUG] Connection error (attempt {attempt + 1}/{max_retries}): {e}, retrying...")
-                        import time
-                        time.sleep(1)  # Wait before retry
+                        logger.warning(
+                            "IP block connection error (attempt %d/%d): %s, retrying",
+                            attempt + 1, max_retries, e
+                        )
+                        await asyncio.sleep(1)  # Wait before retry
                         continue
                     else:
                         return {
@@ -625,24 +997,8 @@ class IpBlockService:
                                 "actions": ["检查网络连接", "检查API服务器状态", "重试"]
                             }
                         }
-                except requests.exceptions.Timeout:
-                    return {
-                        "success": False,
-                        "rule_ids": [],
-                        "message": "请求超时，服务器未响应",
-                        "error_info": {
-                            "error_type": "network_error",
-                            "friendly_message": "请求超时",
-                            "raw_message": "Request timeout",
-                            "suggestion": "请检查网络连接或稍后重试",
-                            "actions": ["检查网络", "重试", "联系管理员"]
-                        }
-                    }
 
-            # Log the response
-            print(f"[DEBUG] IP Block Response:")
-            print(f"  Status: {response.status_code}")
-            print(f"  Body: {response.text[:500]}")  # Log first 500 chars
+            logger.debug("IP block response: status=%s body=%s", response.status_code, response.text[:500])
 
             # Parse response
             if response.status_code == 200:
@@ -652,10 +1008,14 @@ class IpBlockService:
                     data = result.get("data", {})
                     rule_ids = data.get("ids", [])
 
+                    # 新规则生效后本地索引已过期
+                    if self.auth_code:
+                        block_rule_index_registry.mark_dirty(self.base_url, self.auth_code)
+
                     return {
                         "success": True,
                         "rule_ids": rule_ids,
-                        "message": f"IP {ip_address} 已成功在设备 {device_name} 上封禁",
+                        "message": success_message,
                         "rule_count": len(rule_ids)
                     }
                 else:
@@ -677,7 +1037,7 @@ class IpBlockService:
                     "error_info": error_info
                 }
 
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             return {
                 "success": False,
                 "rule_ids": [],
@@ -704,11 +1064,12 @@ class IpBlockService:
                 }
             }
 
-    def check_and_block(
+    async def check_and_block(
         self,
         ip_address: str,
         device_name: str,
-        device_type: str = "AF"
+        device_type: str = "AF",
+        fresh: bool = False
     ) -> Dict[str, Any]:
         """
         Check IP status and prepare block parameters if not blocked
@@ -717,6 +1078,7 @@ class IpBlockService:
             ip_address: IP address to check and potentially block
             device_name: Device name for blocking
             device_type: Device type (default: "AF")
+            fresh: Check block status live instead of using the local index
 
         Returns:
             Dict with keys:
@@ -726,7 +1088,7 @@ class IpBlockService:
                 - error_info: dict (if error)
         """
         # Step 1: Check if IP is already blocked
-        check_result = self.check_ip_blocked(ip_address)
+        check_result = await self.check_ip_blocked(ip_address, fresh=fresh)
 
         if not check_result["success"]:
             return {
@@ -736,20 +1098,10 @@ class IpBlockService:
 
         if check_result["blocked"]:
             # Already blocked
-            return {
-                "action": "already_blocked",
-                "current_status": {
-                    "ip_address": ip_address,
-                    "blocked": True,
-                    "rules": check_result.get("rules", []),
-                    "devices": check_result.get("devices", []),
-                    "total_rules": check_result.get("total_rules", 0),
-                    "message": f"IP {ip_address} 已被封禁"
-                }
-            }
+            return self._already_blocked_action(ip_address, check_result)
 
         # Step 2: Get available devices
-        devices_result = self.get_available_devices(device_type)
+        devices_result = await self.get_available_devices(device_type)
 
         if not devices_result["success"]:
             return {
@@ -757,18 +1109,125 @@ class IpBlockService:
                 "error_info": devices_result.get("error_info")
             }
 
+        target_device, error_info = self._resolve_target_device(devices_result["devices"], device_name)
+        if error_info:
+            return {
+                "action": "error",
+                "error_info": error_info
+            }
+
+        # Step 3: Return block parameters for confirmation
+        return self._need_block_action(ip_address, target_device, device_name)
+
+    async def plan_blocks(
+        self,
+        ip_addresses: List[str],
+        device_name: str,
+        device_type: str = "AF",
+        fresh: bool = False
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Plan blocking for many IPs: resolve the device once and check all IPs in one pass
+
+        Args:
+            ip_addresses: IP addresses to check and potentially block
+            device_name: Device name for blocking
+            device_type: Device type (default: "AF")
+            fresh: Check block status live instead of using the local index
+
+        Returns:
+            Dict mapping each IP to a check_and_block-style result
+        """
+        check_results, devices_result = await asyncio.gather(
+            self.check_ips_blocked(ip_addresses, fresh=fresh),
+            self.get_available_devices(device_type)
+        )
+
+        target_device, device_error = None, None
+        if devices_result["success"]:
+            target_device, device_error = self._resolve_target_device(devices_result["devices"], device_name)
+        else:
+            device_error = devices_result.get("error_info")
+
+        plan = {}
+        for ip_address in dict.fromkeys(ip_addresses):
+            check_result = check_results[ip_address]
+            if not check_result["success"]:
+                plan[ip_address] = {
+                    "action": "error",
+                    "error_info": check_result.get("error_info")
+                }
+            elif check_result["blocked"]:
+                plan[ip_address] = self._already_blocked_action(ip_address, check_result)
+            elif device_error:
+                plan[ip_address] = {
+                    "action": "error",
+                    "error_info": device_error
+                }
+            else:
+                plan[ip_address] = self._need_block_action(ip_address, target_device, device_name)
+
+        return plan
+
+    @staticmethod
+    def _already_blocked_action(ip_address: str, check_result: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the already_blocked result from a block status check"""
+        return {
+            "action": "already_blocked",
+            "current_status": {
+                "ip_address": ip_address,
+                "blocked": True,
+                "rules": check_result.get("rules", []),
+                "devices": check_result.get("devices", []),
+                "total_rules": check_result.get("total_rules", 0),
+                "message": f"IP {ip_address} 已被封禁"
+            }
+        }
+
+    @staticmethod
+    def _need_block_action(ip_address: str, target_device: Dict[str, Any], device_name: str) -> Dict[str, Any]:
+        """Build the need_block result with block parameters for the target device"""
+        return {
+            "action": "need_block",
+            "block_params": {
+                "ip": ip_address,
+                "device_id": target_device["device_id"],
+                "device_name": target_device["device_name"],
+                "device_type": target_device["device_type"],
+                "device_version": target_device.get("device_version", ""),
+                "block_type": "SRC_IP",
+                "time_type": "forever",
+                "time_value": None,
+                "time_unit": "d",
+                "reason": "",
+                "device_status": target_device["device_status"]
+            },
+            "message": f"IP {ip_address} 未被封禁，准备使用设备 {device_name} 进行封禁"
+        }
+
+    def _resolve_target_device(
+        self,
+        devices: List[Dict[str, Any]],
+        device_name: str
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """
+        Find the requested device and make sure it can execute blocks
+
+        Returns:
+            (device, None) on success, (None, error_info) otherwise
+        """
         # Find the specified device
         target_device = None
         normalized_requested = self._normalize_device_name(device_name)
 
-        for device in devices_result["devices"]:
+        for device in devices:
             if device["device_name"] == device_name:
                 target_device = device
                 break
 
         if not target_device and normalized_requested:
             # Tolerant match for quoted/space-variant user input
-            for device in devices_result["devices"]:
+            for device in devices:
                 normalized_device = self._normalize_device_name(device.get("device_name", ""))
                 if not normalized_device:
                     continue
@@ -778,7 +1237,7 @@ class IpBlockService:
 
         if not target_device and normalized_requested and len(normalized_requested) >= 3:
             # Last resort: partial match when user input contains extra words
-            for device in devices_result["devices"]:
+            for device in devices:
                 normalized_device = self._normalize_device_name(device.get("device_name", ""))
                 if not normalized_device:
                     continue
@@ -787,50 +1246,27 @@ class IpBlockService:
                     break
 
         if not target_device:
-            return {
-                "action": "error",
-                "error_info": {
-                    "error_type": "device_not_found",
-                    "friendly_message": f"未找到指定的设备: {device_name}",
-                    "raw_message": f"Device {device_name} not found",
-                    "suggestion": "请检查设备名称或查询可用设备列表",
-                    "actions": ["查询设备列表", "检查设备名称", "选择其他设备"]
-                }
+            return None, {
+                "error_type": "device_not_found",
+                "friendly_message": f"未找到指定的设备: {device_name}",
+                "raw_message": f"Device {device_name} not found",
+                "suggestion": "请检查设备名称或查询可用设备列表",
+                "actions": ["查询设备列表", "检查设备名称", "选择其他设备"]
             }
 
         # Check device status - 只有离线(offline)和未接入(not_active)不能联动
         # online（在线）和告警状态都可以联动
         if target_device["device_status"] in ["offline", "not_active"]:
             status_text = "离线" if target_device["device_status"] == "offline" else "未接入"
-            return {
-                "action": "error",
-                "error_info": {
-                    "error_type": "device_offline",
-                    "friendly_message": f"设备 {device_name} 当前{status_text}，无法执行封禁操作",
-                    "raw_message": f"Device {device_name} is {target_device['device_status']}",
-                    "suggestion": "请检查设备网络连接或选择其他可用设备",
-                    "actions": ["检查设备状态", "选择其他设备", "联系设备管理员"]
-                }
+            return None, {
+                "error_type": "device_offline",
+                "friendly_message": f"设备 {device_name} 当前{status_text}，无法执行封禁操作",
+                "raw_message": f"Device {device_name} is {target_device['device_status']}",
+                "suggestion": "请检查设备网络连接或选择其他可用设备",
+                "actions": ["检查设备状态", "选择其他设备", "联系设备管理员"]
             }
 
-        # Step 3: Return block parameters for confirmation
-        return {
-            "action": "need_block",
-            "block_params": {
-                "ip": ip_address,
-                "device_id": target_device["device_id"],
-                "device_name": target_device["device_name"],
-                "device_type": target_device["device_type"],
-                "device_version": target_device.get("device_version", ""),
-                "block_type": "SRC_IP",
-                "time_type": "forever",
-                "time_value": None,
-                "time_unit": "d",
-                "reason": "",
-                "device_status": target_device["device_status"]
-            },
-            "message": f"IP {ip_address} 未被封禁，准备使用设备 {device_name} 进行封禁"
-        }
+        return target_device, None
 
     def extract_device_from_text(self, text: str) -> Dict[str, Any]:
         """
@@ -1,8 +1,30 @@
+import asyncio
 import os
 import httpx
 import json
 import re
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, AsyncIterator, Tuple
+
+from ..utils.llm_client import llm_client_pool
+from .intent_router import (
+    GENERAL_CHAT_INTENT,
+    ROUTER_MIN_MARGIN,
+    ROUTER_MIN_SIMILARITY,
+    intent_router,
+    speculation_stats
+)
+
+
+# 推测式参数提取：本地路由在几个技能间难以取舍时，LLM识别意图的同时
+# 并发用各技能专用的提取器提取这些候选意图的参数
+INTENT_SPECULATION_ENABLED = True
+INTENT_SPECULATION_TOP_K = 2  # 每个候选意图额外消耗一次LLM调用
+# 与 ROUTER_MIN_SIMILARITY 同一尺度（余弦相似度）；低于此值说明本地分类器没有有效信号
+INTENT_SPECULATION_MIN_SCORE = ROUTER_MIN_SIMILARITY - 0.10
+
+
+class LLMStreamError(Exception):
+    """流式对话失败（错误信息可直接展示给用户）"""
 
 
 class LLMService:
@@ -99,36 +121,37 @@ class LLMService:
             }
 
             # 发送请求
-            async with httpx.AsyncClient(timeout=30.0, verify=False) as client:
-                response = await client.post(
-                    endpoint,
-                    headers=headers,
-                    json=payload
-                )
+            client = llm_client_pool.get_client(provider, effective_base_url)
+            response = await client.post(
+                endpoint,
+                headers=headers,
+                json=payload,
+                timeout=30.0
+            )
 
-                if response.status_code == 200:
-                    data = response.json()
-                    return {
-                        "success": True,
-                        "message": f"连接成功! 提供商: {self.providers.get(provider, {}).get('name', provider)}, 模型: {model}",
-                        "provider": provider,
-                        "model": model,
-                    }
-                elif response.status_code == 401:
-                    return {
-                        "success": False,
-                        "message": f"API Key验证失败,请检查您的密钥是否正确",
-                    }
-                elif response.status_code == 404:
-                    return {
-                        "success": False,
-                        "message": f"API端点未找到,请检查Base URL是否正确",
-                    }
-                else:
-                    return {
-                        "success": False,
-                        "message": f"连接失败: HTTP {response.status_code} - {response.text}",
-                    }
+            if response.status_code == 200:
+                data = response.json()
+                return {
+                    "success": True,
+                    "message": f"连接成功! 提供商: {self.providers.get(provider, {}).get('name', provider)}, 模型: {model}",
+                    "provider": provider,
+                    "model": model,
+                }
+            elif response.status_code == 401:
+                return {
+                    "success": False,
+                    "message": f"API Key验证失败,请检查您的密钥是否正确",
+                }
+            elif response.status_code == 404:
+                return {
+                    "success": False,
+                    "message": f"API端点未找到,请检查Base URL是否正确",
+                }
+            else:
+                return {
+                    "success": False,
+                    "message": f"连接失败: HTTP {response.status_code} - {response.text}",
+                }
 
         except httpx.TimeoutException:
             return {
@@ -166,64 +189,35 @@ class LLMService:
             对话响应结果
         """
         try:
-            # 确定使用的base_url
-            if base_url:
-                effective_base_url = base_url
-            else:
-                provider_config = self.providers.get(provider, {})
-                effective_base_url = provider_config.get("base_url", "")
-
-            if not effective_base_url:
+            chat_request = self._build_chat_request(messages, provider, api_key, base_url)
+            if chat_request is None:
                 return {
                     "success": False,
                     "message": f"未知的提供商: {provider}",
                 }
-
-            # 根据提供商选择模型
-            if provider == "zhipu":
-                model = "glm-4-plus"
-            elif provider == "openai":
-                model = "gpt-4"
-            elif provider == "deepseek":
-                model = "deepseek-chat"
-            else:
-                model = "gpt-4"
-
-            # 构造请求
-            endpoint = f"{effective_base_url.rstrip('/')}/chat/completions"
-
-            headers = {
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json",
-            }
-
-            payload = {
-                "model": model,
-                "messages": messages,
-                "max_tokens": 2000,
-                "temperature": 0.7,
-            }
+            effective_base_url, endpoint, headers, payload = chat_request
 
             # 发送请求
-            async with httpx.AsyncClient(timeout=60.0, verify=False) as client:
-                response = await client.post(
-                    endpoint,
-                    headers=headers,
-                    json=payload
-                )
+            client = llm_client_pool.get_client(provider, effective_base_url)
+            response = await client.post(
+                endpoint,
+                headers=headers,
+                json=payload,
+                timeout=60.0
+            )
 
-                if response.status_code == 200:
-                    data = response.json()
-                    assistant_message = data.get("choices", [{}])[0].get("message", {}).get("content", "")
-                    return {
-                        "success": True,
-                        "message": assistant_message,
-                    }
-                else:
-                    return {
-                        "success": False,
-                        "message": f"API错误: {response.status_code} - {response.text}",
-                    }
+            if response.status_code == 200:
+                data = response.json()
+                assistant_message = data.get("choices", [{}])[0].get("message", {}).get("content", "")
+                return {
+                    "success": True,
+                    "message": assistant_message,
+                }
+            else:
+                return {
+                    "success": False,
+                    "message": f"API错误: {response.status_code} - {response.text}",
+                }
 
         except httpx.TimeoutException:
             return {
@@ -236,6 +230,115 @@ class LLMService:
                 "message": f"请求失败: {str(e)}",
             }
 
+    async def chat_stream(
+        self,
+        messages: List[Dict[str, str]],
+        provider: str,
+        api_key: str,
+        base_url: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        与大模型进行流式对话（OpenAI兼容的 stream: true 协议）
+
+        逐行解析 SSE 数据块，每收到一段增量内容立即产出。
+
+        Args:
+            messages: 对话历史列表
+            provider: 模型提供商名称
+            api_key: API密钥
+            base_url: 自定义的API Base URL(可选)
+
+        Yields:
+            增量文本片段
+
+        Raises:
+            LLMStreamError: 提供商未知、HTTP错误或连接失败
+        """
+        chat_request = self._build_chat_request(messages, provider, api_key, base_url, stream=True)
+        if chat_request is None:
+            raise LLMStreamError(f"未知的提供商: {provider}")
+        effective_base_url, endpoint, headers, payload = chat_request
+
+        client = llm_client_pool.get_client(provider, effective_base_url)
+        try:
+            async with client.stream("POST", endpoint, headers=headers, json=payload, timeout=60.0) as response:
+                if response.status_code != 200:
+                    body = (await response.aread()).decode("utf-8", errors="replace")
+                    raise LLMStreamError(f"API错误: {response.status_code} - {body}")
+
+                async for line in response.aiter_lines():
+                    # SSE: 只关心 data 行，忽略注释、event 行和空行
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[5:].strip()
+                    if data == "[DONE]":
+                        break
+                    try:
+                        chunk = json.loads(data)
+                    except json.JSONDecodeError:
+                        continue
+                    choices = chunk.get("choices") or [{}]
+                    content = (choices[0].get("delta") or {}).get("content")
+                    if content:
+                        yield content
+        except httpx.TimeoutException:
+            raise LLMStreamError("请求超时,请稍后重试")
+        except httpx.HTTPError as e:
+            raise LLMStreamError(f"请求失败: {str(e)}")
+
+    def _build_chat_request(
+        self,
+        messages: List[Dict[str, str]],
+        provider: str,
+        api_key: str,
+        base_url: Optional[str] = None,
+        stream: bool = False
+    ) -> Optional[Tuple[str, str, Dict[str, str], Dict[str, Any]]]:
+        """
+        构造对话请求
+
+        Returns:
+            (effective_base_url, endpoint, headers, payload)，提供商未知时返回 None
+        """
+        # 确定使用的base_url
+        if base_url:
+            effective_base_url = base_url
+        else:
+            provider_config = self.providers.get(provider, {})
+            effective_base_url = provider_config.get("base_url", "")
+
+        if not effective_base_url:
+            return None
+
+        # 根据提供商选择模型
+        if provider == "zhipu":
+            model = "glm-4-plus"
+        elif provider == "openai":
+            model = "gpt-4"
+        elif provider == "deepseek":
+            model = "deepseek-chat"
+        else:
+            model = "gpt-4"
+
+        # 构造请求
+        endpoint = f"{effective_base_url.rstrip('/')}/chat/completions"
+
+        headers = {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+        }
+
+        payload = {
+            "model": model,
+            "messages": messages,
+            "max_tokens": 2000,
+            "temperature": 0.7,
+        }
+        if stream:
+            payload["stream"] = True
+
+        return effective_base_url, endpoint, headers, payload
+
     def get_supported_providers(self) -> Dict[str, str]:
         """获取支持的模型提供商列表"""
         return {
@@ -243,6 +346,20 @@ class LLMService:
             for key, config in self.providers.items()
         }
 
+    def get_routing_metrics(self) -> Dict[str, Any]:
+        """获取意图路由与推测参数提取的统计"""
+        return {
+            "localRouter": {
+                "localHits": intent_router.local_hits,
+                "fallbacks": intent_router.fallbacks
+            },
+            "speculation": {
+                "enabled": INTENT_SPECULATION_ENABLED,
+                "topK": INTENT_SPECULATION_TOP_K,
+                **speculation_stats.snapshot()
+            }
+        }
+
     def _extract_incident_uuids_from_text(self, text: str) -> List[str]:
         """从文本中提取 incident UUID 列表（按出现顺序去重）"""
         if not text:
@@ -570,147 +687,356 @@ class LLMService:
             对话响应结果
         """
         try:
-            # 获取最后一条用户消息
-            last_message = messages[-1] if messages else {}
-            user_message = last_message.get("content", "")
+            result = await self._route_intent(
+                messages, provider, api_key, base_url, auth_code, flux_base_url
+            )
+            if result is not None:
+                return result
+
+            # 普通聊天
+            chat_result = await self.chat(messages, provider, api_key, base_url)
+            chat_result["type"] = "text"
+            return chat_result
 
-            if not user_message:
+        except Exception as e:
+            # 任何错误都回退到普通聊天
+            try:
                 chat_result = await self.chat(messages, provider, api_key, base_url)
                 chat_result["type"] = "text"
                 return chat_result
+            except Exception as chat_error:
+                # 如果聊天也失败了，返回错误信息
+                return {
+                    "success": False,
+                    "type": "text",
+                    "message": f"抱歉，我现在无法回复：{str(e)}"
+                }
 
-            # Step 1: 检测意图
-            # 先检查场景确认关键词（优先级最高，避免误识别）
-            if "确认执行" in user_message or "confirm" in user_message.lower():
-                # 场景确认消息，直接识别为场景意图
-                intent = "daily_high_risk_closure"
-                confidence = 1.0
-            elif self._is_ipblock_direct_intent(messages, user_message):
-                # 明确封禁/查询IP状态，不依赖LLM意图识别
-                intent = "ipblock"
-                confidence = 1.0
-            elif self._is_ipblock_followup_intent(messages, user_message):
-                # 强上下文兜底：设备名追问/代词追问直接走ip封禁
-                intent = "ipblock"
-                confidence = 1.0
+    async def chat_with_asset_support_stream(
+        self,
+        messages: List[Dict[str, str]],
+        provider: str,
+        api_key: str,
+        base_url: Optional[str] = None,
+        auth_code: Optional[str] = None,
+        flux_base_url: Optional[str] = None
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        chat_with_asset_support 的流式版本
+
+        意图识别与技能处理与非流式版本一致；技能结果（事件列表、封禁确认等）
+        作为一个完整的 result 事件返回，只有普通聊天的回复逐段推送。
+
+        Args:
+            同 chat_with_asset_support
+
+        Yields:
+            (event, data)：
+                - ("token", {"content": 增量文本})
+                - ("result", 与 chat_with_asset_support 相同结构的最终结果)，总是最后一个事件
+        """
+        try:
+            result = await self._route_intent(
+                messages, provider, api_key, base_url, auth_code, flux_base_url
+            )
+        except Exception:
+            # 任何错误都回退到普通聊天
+            result = None
+
+        if result is not None:
+            yield "result", result
+            return
+
+        content: List[str] = []
+        try:
+            async for delta in self.chat_stream(messages, provider, api_key, base_url):
+                content.append(delta)
+                yield "token", {"content": delta}
+        except LLMStreamError as e:
+            yield "result", {
+                "success": False,
+                "type": "text",
+                "message": str(e) if not content else "".join(content) + f"\n\n（回复中断：{str(e)}）"
+            }
+            return
+
+        yield "result", {
+            "success": True,
+            "type": "text",
+            "message": "".join(content)
+        }
+
+    async def _route_intent(
+        self,
+        messages: List[Dict[str, str]],
+        provider: str,
+        api_key: str,
+        base_url: Optional[str] = None,
+        auth_code: Optional[str] = None,
+        flux_base_url: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        识别意图并交给对应技能处理
+
+        Returns:
+            技能处理结果；应按普通聊天回复时返回 None
+        """
+        # 获取最后一条用户消息
+        last_message = messages[-1] if messages else {}
+        user_message = last_message.get("content", "")
+
+        if not user_message:
+            return None
+
+        # 意图识别时一并提取的参数（None 表示由技能处理函数自行提取）
+        extracted_params = None
+
+        # Step 1: 检测意图
+        # 先检查场景确认关键词（优先级最高，避免误识别）
+        if "确认执行" in user_message or "confirm" in user_message.lower():
+            # 场景确认消息，直接识别为场景意图
+            intent = "daily_high_risk_closure"
+            confidence = 1.0
+        elif self._is_ipblock_direct_intent(messages, user_message):
+            # 明确封禁/查询IP状态，不依赖LLM意图识别
+            intent = "ipblock"
+            confidence = 1.0
+        elif self._is_ipblock_followup_intent(messages, user_message):
+            # 强上下文兜底：设备名追问/代词追问直接走ip封禁
+            intent = "ipblock"
+            confidence = 1.0
+        else:
+            # 本地意图路由：特征明确的消息直接分发，省去一次LLM意图识别
+            local_result = intent_router.route(user_message)
+            if local_result is not None:
+                intent = local_result["intent"]
             else:
-                # 其他情况，使用LLM进行意图识别
+                # 其他情况，由LLM一次调用同时识别意图并提取参数；
+                # 本地分类器在几个技能间难以取舍时，再并发推测提取这些候选的参数
+                candidates = self._speculation_candidates(user_message)
                 try:
-                    intent_result = await self._detect_intent(
-                        user_message, provider, api_key, base_url
-                    )
+                    if candidates:
+                        intent_result = await self._detect_intent_speculatively(
+                            user_message, messages, provider, api_key, base_url, candidates
+                        )
+                    else:
+                        intent_result = await self._detect_intent_with_params(
+                            user_message, messages, provider, api_key, base_url
+                        )
                 except Exception:
                     # 意图检测失败，按普通聊天处理
-                    chat_result = await self.chat(messages, provider, api_key, base_url)
-                    chat_result["type"] = "text"
-                    return chat_result
+                    return None
 
                 intent = intent_result.get("intent", "general_chat")
                 confidence = intent_result.get("confidence", 0.0)
+                extracted_params = intent_result.get("params")
+
+                # LLM 高置信度的判断作为本地路由的训练样本
+                intent_router.learn(user_message, intent, confidence)
 
                 # 置信度太低，按普通聊天处理
                 if confidence < 0.7:
-                    chat_result = await self.chat(messages, provider, api_key, base_url)
-                    chat_result["type"] = "text"
-                    return chat_result
-
-            # 处理不同的意图
-            if intent == "add_asset":
-                return await self._handle_asset_intent(
-                    user_message, messages, provider, api_key, base_url,
-                    auth_code, flux_base_url
-                )
-            elif intent == "ipblock":
-                return await self._handle_ipblock_intent(
-                    user_message, messages, provider, api_key, base_url,
-                    auth_code, flux_base_url
-                )
-            elif intent == "get_incidents":
-                return await self._handle_get_incidents_intent(
-                    user_message, messages, provider, api_key, base_url,
-                    auth_code, flux_base_url
-                )
-            elif intent == "get_incident_proof":
-                return await self._handle_get_incident_proof_intent(
-                    user_message, messages, provider, api_key, base_url,
-                    auth_code, flux_base_url
-                )
-            elif intent == "get_incident_entities":
-                return await self._handle_get_incident_entities_intent(
-                    user_message, messages, provider, api_key, base_url,
-                    auth_code, flux_base_url
-                )
-            elif intent == "update_incident_status":
-                return await self._handle_update_incident_status_intent(
-                    user_message, messages, provider, api_key, base_url,
-                    auth_code, flux_base_url
-                )
-            elif intent == "get_log_count":
-                return await self._handle_get_log_count_intent(
-                    user_message, messages, provider, api_key, base_url,
-                    auth_code, flux_base_url
-                )
-            elif intent == "daily_high_risk_closure":
-                return await self._handle_scenario_intent(
-                    user_message, messages, provider, api_key, base_url,
-                    auth_code, flux_base_url
-                )
-            else:
-                # 普通聊天
-                chat_result = await self.chat(messages, provider, api_key, base_url)
-                chat_result["type"] = "text"
-                return chat_result
+                    return None
 
-        except Exception as e:
-            # 任何错误都回退到普通聊天
+        # 处理不同的意图
+        if intent == "add_asset":
+            return await self._handle_asset_intent(
+                user_message, messages, provider, api_key, base_url,
+                auth_code, flux_base_url, extracted_params
+            )
+        elif intent == "ipblock":
+            return await self._handle_ipblock_intent(
+                user_message, messages, provider, api_key, base_url,
+                auth_code, flux_base_url, extracted_params
+            )
+        elif intent == "get_incidents":
+            return await self._handle_get_incidents_intent(
+                user_message, messages, provider, api_key, base_url,
+                auth_code, flux_base_url, extracted_params
+            )
+        elif intent == "get_incident_proof":
+            return await self._handle_get_incident_proof_intent(
+                user_message, messages, provider, api_key, base_url,
+                auth_code, flux_base_url, extracted_params
+            )
+        elif intent == "get_incident_entities":
+            return await self._handle_get_incident_entities_intent(
+                user_message, messages, provider, api_key, base_url,
+                auth_code, flux_base_url, extracted_params
+            )
+        elif intent == "update_incident_status":
+            return await self._handle_update_incident_status_intent(
+                user_message, messages, provider, api_key, base_url,
+                auth_code, flux_base_url, extracted_params
+            )
+        elif intent == "get_log_count":
+            return await self._handle_get_log_count_intent(
+                user_message, messages, provider, api_key, base_url,
+                auth_code, flux_base_url, extracted_params
+            )
+        elif intent == "daily_high_risk_closure":
+            return await self._handle_scenario_intent(
+                user_message, messages, provider, api_key, base_url,
+                auth_code, flux_base_url
+            )
+        else:
+            # 普通聊天
+            return None
+
+    def _speculation_candidates(self, user_message: str) -> List[str]:
+        """
+        Close-scoring skill intents worth extracting speculatively, best first
+
+        Speculation only pays off when the local classifier has a real signal
+        but cannot pick between skills: the best score must reach
+        INTENT_SPECULATION_MIN_SCORE, at least two extractable skills must be
+        within ROUTER_MIN_MARGIN of it, and general chat must be neither in
+        the top-K nor that close. Otherwise the fused call alone is used.
+        """
+        if not INTENT_SPECULATION_ENABLED or INTENT_SPECULATION_TOP_K <= 0:
+            return []
+
+        scores = intent_router.classify(user_message)
+        if not scores or scores[0][1] < INTENT_SPECULATION_MIN_SCORE:
+            return []
+
+        best = scores[0][1]
+        close = [intent for intent, score in scores if best - score < ROUTER_MIN_MARGIN]
+        top_k = [intent for intent, _ in scores[:INTENT_SPECULATION_TOP_K]]
+        if GENERAL_CHAT_INTENT in close or GENERAL_CHAT_INTENT in top_k:
+            return []
+
+        extractors = self._param_extractors()
+        candidates = [intent for intent in close if intent in extractors][:INTENT_SPECULATION_TOP_K]
+        return candidates if len(candidates) >= 2 else []
+
+    def _param_extractors(self) -> Dict[str, Any]:
+        """Intent -> parameter extractor (same signature for every skill)"""
+        return {
+            "add_asset": self._extract_asset_params,
+            "ipblock": self._extract_ipblock_params,
+            "get_incidents": self._extract_incidents_params,
+            "get_incident_proof": self._extract_incident_proof_params,
+            "get_incident_entities": self._extract_incident_entities_params,
+            "update_incident_status": self._extract_update_status_params,
+            "get_log_count": self._extract_log_count_params,
+        }
+
+    async def _detect_intent_speculatively(
+        self,
+        user_message: str,
+        messages: List[Dict[str, str]],
+        provider: str,
+        api_key: str,
+        base_url: Optional[str],
+        candidates: List[str]
+    ) -> Dict[str, Any]:
+        """
+        并发执行意图识别（同时提取参数）和候选意图的专用参数提取
+
+        识别出的意图在候选中时沿用其专用提取结果，其余提取任务取消；
+        未命中（或专用提取失败）时使用意图识别一并提取的参数，
+        因此推测落空也不会比单次调用多出串行的LLM往返。
+
+        Returns:
+            {"intent", "confidence", "params"}
+        """
+        extractors = self._param_extractors()
+        speculative = {
+            intent: asyncio.create_task(
+                extractors[intent](user_message, messages, provider, api_key, base_url)
+            )
+            for intent in candidates
+        }
+
+        try:
+            intent_result = await self._detect_intent_with_params(
+                user_message, messages, provider, api_key, base_url
+            )
+        except BaseException:
+            for task in speculative.values():
+                task.cancel()
+            raise
+
+        intent = intent_result.get("intent", "general_chat")
+        # 置信度太低时按普通聊天处理，不需要任何提取结果
+        kept = speculative.pop(intent, None) if intent_result.get("confidence", 0.0) >= 0.7 else None
+        for task in speculative.values():
+            task.cancel()
+
+        params = intent_result.get("params")
+        if kept is not None:
             try:
-                chat_result = await self.chat(messages, provider, api_key, base_url)
-                chat_result["type"] = "text"
-                return chat_result
-            except Exception as chat_error:
-                # 如果聊天也失败了，返回错误信息
-                return {
-                    "success": False,
-                    "type": "text",
-                    "message": f"抱歉，我现在无法回复：{str(e)}"
-                }
+                params = await kept
+            except Exception:
+                # 推测提取失败，沿用意图识别一并提取的参数
+                params = intent_result.get("params")
 
-    async def _detect_intent(
+        speculation_stats.record(launched=len(candidates), hit=kept is not None, cancelled=len(speculative))
+        return {
+            "intent": intent,
+            "confidence": intent_result.get("confidence", 0.0),
+            "params": params
+        }
+
+    async def _detect_intent_with_params(
         self,
         user_message: str,
+        messages: List[Dict[str, str]],
         provider: str,
         api_key: str,
         base_url: Optional[str] = None
     ) -> Dict[str, Any]:
-        """检测用户意图"""
-        from .skills_registry import get_intent_catalog
+        """
+        一次LLM调用同时识别意图并提取该意图的参数
+
+        参数说明由技能注册表生成，提取结果经与各 _extract_*_params 相同的
+        规范化处理，可直接交给对应的 _handle_*_intent。
+
+        Returns:
+            {"intent", "confidence", "params"}；params 为 None 表示未能提取，
+            由技能处理函数自行提取
+        """
+        from datetime import datetime
+        from .skills_registry import get_intent_schema
+
+        current_time = datetime.now()
+        current_timestamp = int(current_time.timestamp())
+
+        history_text = "\n".join([
+            f"{msg.get('role', 'user')}: {msg.get('content', '')}"
+            for msg in messages[-10:]
+        ])
 
-        intent_catalog = get_intent_catalog()
         intent_lines = []
         allowed_intents = []
-
-        for idx, intent_def in enumerate(intent_catalog, start=1):
+        for idx, intent_def in enumerate(get_intent_schema(), start=1):
             intent_name = intent_def["intent"]
-            intent_desc = intent_def["description"]
-            intent_lines.append(f"{idx}. {intent_desc} ({intent_name})")
+            intent_lines.append(f"{idx}. {intent_def['description']} ({intent_name})")
+            for param in intent_def["parameters"]:
+                intent_lines.append(f"   - {param['name']} ({param['type']}): {param['description']}")
             allowed_intents.append(f"\"{intent_name}\"")
 
         # Keep general_chat as explicit fallback
-        intent_lines.append(f"{len(intent_lines) + 1}. 普通聊天 (general_chat) - 其他对话")
+        intent_lines.append(f"{len(allowed_intents) + 1}. 普通聊天 (general_chat) - 其他对话，无参数")
         allowed_intents.append("\"general_chat\"")
 
-        intent_prompt = f"""你是一个意图识别助手。判断用户消息的意图类型。
+        intent_prompt = f"""你是一个意图识别与参数提取助手。判断用户消息的意图类型，并提取该意图的参数。
+
+当前时间：{current_time.strftime('%Y-%m-%d %H:%M:%S')}
+当前时间戳：{current_timestamp}
 
 用户消息: {user_message}
+对话历史: {history_text}
 
-分析用户是否想要：
+可选意图及其参数：
 {chr(10).join(intent_lines)}
 
 返回 JSON 格式（只返回 JSON，不要其他内容）:
 {{
   "intent": {" | ".join(allowed_intents)},
   "confidence": 0.0-1.0,
-  "reasoning": "判断理由"
+  "params": {{只包含所选意图的参数，用户未提及的参数返回 null；普通聊天返回 {{}}}}
 }}"""
 
         try:
@@ -722,22 +1048,60 @@ class LLMService:
             )
 
             if response.get("success"):
-                # 解析 LLM 返回的 JSON
-                response_text = response.get("message", "")
-
-                # 尝试提取 JSON
-                json_match = re.search(r'\{[^}]+\}', response_text, re.DOTALL)
-                if json_match:
-                    try:
-                        intent_result = json.loads(json_match.group())
-                        return intent_result
-                    except json.JSONDecodeError:
-                        pass
+                intent_result = self._parse_json_object(response.get("message", ""))
+                if intent_result:
+                    intent = intent_result.get("intent", "general_chat")
+                    params = intent_result.get("params")
+                    return {
+                        "intent": intent,
+                        "confidence": intent_result.get("confidence", 0.0),
+                        "params": self._normalize_extracted_params(intent, params, user_message)
+                        if isinstance(params, dict) else None
+                    }
 
-            return {"intent": "general_chat", "confidence": 0.0}
+            return {"intent": "general_chat", "confidence": 0.0, "params": None}
 
         except Exception:
-            return {"intent": "general_chat", "confidence": 0.0}
+            return {"intent": "general_chat", "confidence": 0.0, "params": None}
+
+    def _normalize_extracted_params(
+        self,
+        intent: str,
+        params: Dict[str, Any],
+        user_message: str
+    ) -> Dict[str, Any]:
+        """Apply the same normalization as the intent's _extract_*_params"""
+        if intent == "get_incidents":
+            return self._normalize_incidents_params(params)
+        if intent in ("get_incident_proof", "get_incident_entities"):
+            return self._normalize_incident_ref_params(params)
+        if intent == "update_incident_status":
+            return self._normalize_update_status_params(params)
+        if intent == "get_log_count":
+            return self._normalize_log_count_params(params, user_message)
+        return params
+
+    @staticmethod
+    def _parse_json_object(text: str) -> Optional[Dict[str, Any]]:
+        """Parse the first (possibly nested) JSON object in an LLM reply"""
+        start_idx = text.find('{')
+        if start_idx == -1:
+            return None
+
+        # Find matching closing brace by counting
+        count = 0
+        for idx in range(start_idx, len(text)):
+            if text[idx] == '{':
+                count += 1
+            elif text[idx] == '}':
+                count -= 1
+                if count == 0:
+                    try:
+                        parsed = json.loads(text[start_idx:idx + 1])
+                    except json.JSONDecodeError:
+                        return None
+                    return parsed if isinstance(parsed, dict) else None
+        return None
 
     async def _extract_asset_params(
         self,
@@ -874,14 +1238,16 @@ class LLMService:
         api_key: str,
         base_url: Optional[str] = None,
         auth_code: Optional[str] = None,
-        flux_base_url: Optional[str] = None
+        flux_base_url: Optional[str] = None,
+        extracted_params: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """处理添加资产意图"""
         try:
             # 提取资产参数
-            extracted_params = await self._extract_asset_params(
-                user_message, messages, provider, api_key, base_url
-            )
+            if extracted_params is None:
+                extracted_params = await self._extract_asset_params(
+                    user_message, messages, provider, api_key, base_url
+                )
         except Exception:
             # 参数提取失败，按普通聊天处理
             chat_result = await self.chat(messages, provider, api_key, base_url)
@@ -939,14 +1305,16 @@ class LLMService:
         api_key: str,
         base_url: Optional[str] = None,
         auth_code: Optional[str] = None,
-        flux_base_url: Optional[str] = None
+        flux_base_url: Optional[str] = None,
+        extracted_params: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """处理IP封禁意图"""
         try:
             # 提取IP封禁参数
-            extracted_params = await self._extract_ipblock_params(
-                user_message, messages, provider, api_key, base_url
-            )
+            if extracted_params is None:
+                extracted_params = await self._extract_ipblock_params(
+                    user_message, messages, provider, api_key, base_url
+                )
         except Exception as e:
             # 参数提取失败，按普通聊天处理
             chat_result = await self.chat(messages, provider, api_key, base_url)
@@ -1039,7 +1407,7 @@ class LLMService:
         # 封禁意图但未提供设备名：先引导用户选择联动防火墙
         if action in ["block", "check_and_block"] and not extracted_params.get("device_name"):
             device_type = extracted_params.get("device_type", "AF")
-            devices_result = ipblock_service.get_available_devices(device_type=device_type)
+            devices_result = await ipblock_service.get_available_devices(device_type=device_type)
 
             if devices_result.get("success"):
                 devices = devices_result.get("devices", [])
@@ -1079,7 +1447,7 @@ class LLMService:
             device_type = extracted_params.get("device_type", "AF")
 
             # 调用 check_and_block 方法
-            result = ipblock_service.check_and_block(
+            result = await ipblock_service.check_and_block(
                 ip_address=ip_address,
                 device_name=device_name,
                 device_type=device_type
@@ -1099,7 +1467,7 @@ class LLMService:
 
                 if auto_execute:
                     # 用户已明确设备，直接执行封禁
-                    block_result = ipblock_service.block_ip(
+                    block_result = await ipblock_service.block_ip(
                         ip_address=block_params["ip"],
                         device_id=block_params["device_id"],
                         device_name=block_params["device_name"],
@@ -1156,7 +1524,7 @@ class LLMService:
                 }
         else:
             # 没有设备名称，只查询状态
-            result = ipblock_service.check_ip_blocked(ip_address)
+            result = await ipblock_service.check_ip_blocked(ip_address)
 
             if result["success"]:
                 if result["blocked"]:
@@ -1277,14 +1645,16 @@ class LLMService:
         api_key: str,
         base_url: Optional[str] = None,
         auth_code: Optional[str] = None,
-        flux_base_url: Optional[str] = None
+        flux_base_url: Optional[str] = None,
+        extracted_params: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """处理查询安全事件意图"""
         try:
             # 提取查询参数
-            extracted_params = await self._extract_incidents_params(
-                user_message, messages, provider, api_key, base_url
-            )
+            if extracted_params is None:
+                extracted_params = await self._extract_incidents_params(
+                    user_message, messages, provider, api_key, base_url
+                )
         except Exception as e:
             # 参数提取失败，按普通聊天处理
             chat_result = await self.chat(messages, provider, api_key, base_url)
@@ -1367,7 +1737,8 @@ class LLMService:
         api_key: str,
         base_url: Optional[str] = None,
         auth_code: Optional[str] = None,
-        flux_base_url: Optional[str] = None
+        flux_base_url: Optional[str] = None,
+        extracted_params: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """处理查看事件举证意图"""
         # 优先使用正则直接提取，避免上下文序号场景完全依赖 LLM
@@ -1377,9 +1748,10 @@ class LLMService:
         if not uuid:
             try:
                 # 提取事件ID
-                extracted_params = await self._extract_incident_proof_params(
-                    user_message, messages, provider, api_key, base_url
-                )
+                if extracted_params is None:
+                    extracted_params = await self._extract_incident_proof_params(
+                        user_message, messages, provider, api_key, base_url
+                    )
             except Exception as e:
                 # 参数提取失败，按普通聊天处理
                 chat_result = await self.chat(messages, provider, api_key, base_url)
@@ -1463,7 +1835,8 @@ class LLMService:
         api_key: str,
         base_url: Optional[str] = None,
         auth_code: Optional[str] = None,
-        flux_base_url: Optional[str] = None
+        flux_base_url: Optional[str] = None,
+        extracted_params: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """处理查看事件外网IP实体意图"""
         # 优先使用正则直接提取，避免上下文序号场景完全依赖 LLM
@@ -1473,9 +1846,10 @@ class LLMService:
         if not uuid:
             try:
                 # 提取事件ID
-                extracted_params = await self._extract_incident_entities_params(
-                    user_message, messages, provider, api_key, base_url
-                )
+                if extracted_params is None:
+                    extracted_params = await self._extract_incident_entities_params(
+                        user_message, messages, provider, api_key, base_url
+                    )
             except Exception as e:
                 # 参数提取失败，按普通聊天处理
                 chat_result = await self.chat(messages, provider, api_key, base_url)
@@ -1567,16 +1941,18 @@ class LLMService:
         api_key: str,
         base_url: Optional[str] = None,
         auth_code: Optional[str] = None,
-        flux_base_url: Optional[str] = None
+        flux_base_url: Optional[str] = None,
+        extracted_params: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """处理更新事件状态意图"""
         direct_uuids = self._extract_incident_uuids_from_text(user_message)
 
         try:
             # 提取更新参数
-            extracted_params = await self._extract_update_status_params(
-                user_message, messages, provider, api_key, base_url
-            )
+            if extracted_params is None:
+                extracted_params = await self._extract_update_status_params(
+                    user_message, messages, provider, api_key, base_url
+                )
         except Exception as e:
             # 参数提取失败，按普通聊天处理
             chat_result = await self.chat(messages, provider, api_key, base_url)
@@ -1795,33 +2171,7 @@ class LLMService:
                 if json_text:
                     try:
                         params = json.loads(json_text)
-
-                        # Map camelCase parameter names to snake_case for function signature
-                        param_mapping = {
-                            "startTimestamp": "start_timestamp",
-                            "endTimestamp": "end_timestamp",
-                            "timeField": "time_field",
-                            "pageSize": "page_size",
-                            "dealStatus": "deal_status",
-                            "severities": "severities",
-                            "name": "name",
-                            "page": "page",
-                            "sort": "sort"
-                        }
-
-                        mapped_params = {}
-                        for key, value in params.items():
-                            # Skip null values
-                            if value is None:
-                                continue
-                            # Skip empty arrays (but keep empty strings if needed)
-                            if isinstance(value, list) and len(value) == 0:
-                                continue
-
-                            mapped_key = param_mapping.get(key, key)
-                            mapped_params[mapped_key] = value
-
-                        return mapped_params
+                        return self._normalize_incidents_params(params)
                     except json.JSONDecodeError:
                         pass
 
@@ -1830,6 +2180,38 @@ class LLMService:
         except Exception:
             return {}
 
+    @staticmethod
+    def _normalize_incidents_params(params: Dict[str, Any]) -> Dict[str, Any]:
+        """Map extracted incident query params to get_incidents arguments"""
+        # Map camelCase parameter names to snake_case for function signature
+        param_mapping = {
+            "startTimestamp": "start_timestamp",
+            "endTimestamp": "end_timestamp",
+            "timeField": "time_field",
+            "pageSize": "page_size",
+            "dealStatus": "deal_status",
+            "severities": "severities",
+            "name": "name",
+            "page": "page",
+            "sort": "sort"
+        }
+
+        mapped_params = {}
+        for key, value in params.items():
+            # Skip params get_incidents does not accept
+            if key not in param_mapping:
+                continue
+            # Skip null values
+            if value is None:
+                continue
+            # Skip empty arrays (but keep empty strings if needed)
+            if isinstance(value, list) and len(value) == 0:
+                continue
+
+            mapped_params[param_mapping[key]] = value
+
+        return mapped_params
+
     async def _extract_incident_proof_params(
         self,
         user_message: str,
@@ -1886,10 +2268,7 @@ class LLMService:
                 if json_match:
                     try:
                         params = json.loads(json_match.group())
-                        return {
-                            "uuid": params.get("uuid"),
-                            "name": params.get("name")
-                        }
+                        return self._normalize_incident_ref_params(params)
                     except json.JSONDecodeError:
                         pass
 
@@ -1955,10 +2334,7 @@ class LLMService:
                 if json_match:
                     try:
                         params = json.loads(json_match.group())
-                        return {
-                            "uuid": params.get("uuid"),
-                            "name": params.get("name")
-                        }
+                        return self._normalize_incident_ref_params(params)
                     except json.JSONDecodeError:
                         pass
 
@@ -1967,6 +2343,14 @@ class LLMService:
         except Exception:
             return {"uuid": None, "name": None}
 
+    @staticmethod
+    def _normalize_incident_ref_params(params: Dict[str, Any]) -> Dict[str, Any]:
+        """Keep the incident reference (UUID or name) from extracted params"""
+        return {
+            "uuid": params.get("uuid"),
+            "name": params.get("name")
+        }
+
     async def _search_incident_by_name(
         self,
         name: str,
@@ -2087,12 +2471,7 @@ class LLMService:
                 if json_match:
                     try:
                         params = json.loads(json_match.group())
-                        return {
-                            "uuids": params.get("uuids", []),
-                            "name": params.get("name"),
-                            "deal_status": params.get("deal_status"),
-                            "deal_comment": params.get("deal_comment")
-                        }
+                        return self._normalize_update_status_params(params)
                     except json.JSONDecodeError:
                         pass
 
@@ -2101,6 +2480,16 @@ class LLMService:
         except Exception:
             return {}
 
+    @staticmethod
+    def _normalize_update_status_params(params: Dict[str, Any]) -> Dict[str, Any]:
+        """Keep the status update fields from extracted params"""
+        return {
+            "uuids": params.get("uuids") or [],
+            "name": params.get("name"),
+            "deal_status": params.get("deal_status"),
+            "deal_comment": params.get("deal_comment")
+        }
+
     async def _extract_log_count_params(
         self,
         user_message: str,
@@ -2123,20 +2512,7 @@ class LLMService:
         ])
 
         # Determine if user wants analysis (趋势、分布、异常)
-        user_message_lower = user_message.lower()
-        include_comparison = False
-        include_distribution = False
-        include_trend = False
-
-        if any(keyword in user_message_lower for keyword in ["趋势", "对比", "trend", "compare", "增长", "下降", "变化"]):
-            include_comparison = True
-            include_trend = True
-        elif any(keyword in user_message_lower for keyword in ["分布", "占比", "比例"]):
-            include_distribution = True
-        elif any(keyword in user_message_lower for keyword in ["异常", "突增", "骤降", "anomaly"]):
-            include_comparison = True
-            include_distribution = True
-            include_trend = True
+        include_comparison, include_distribution, include_trend = self._log_count_analysis_flags(user_message)
 
         extraction_prompt = f"""你是一个日志统计参数提取助手。从用户消息中提取日志统计参数。
 
@@ -2178,34 +2554,7 @@ class LLMService:
                 if json_match:
                     try:
                         params = json.loads(json_match.group())
-                        
-                        # Map camelCase to snake_case
-                        param_mapping = {
-                            "startTimestamp": "start_timestamp",
-                            "endTimestamp": "end_timestamp",
-                            "productTypes": "product_types",
-                            "accessDirections": "access_directions",
-                            "threatClasses": "threat_classes",
-                            "srcIps": "src_ips",
-                            "dstIps": "dst_ips",
-                            "attackStates": "attack_states",
-                            "severities": "severities",
-                            "includeComparison": "include_comparison",
-                            "includeDistribution": "include_distribution",
-                            "includeTrend": "include_trend"
-                        }
-                        
-                        mapped_params = {}
-                        for key, value in params.items():
-                            mapped_key = param_mapping.get(key, key)
-                            mapped_params[mapped_key] = value
-
-                        # 添加分析标志位（不依赖LLM返回，使用关键词检测结果）
-                        mapped_params["include_comparison"] = include_comparison
-                        mapped_params["include_distribution"] = include_distribution
-                        mapped_params["include_trend"] = include_trend
-
-                        return mapped_params
+                        return self._normalize_log_count_params(params, user_message)
                     except json.JSONDecodeError:
                         pass
             
@@ -2214,6 +2563,60 @@ class LLMService:
         except Exception:
             return {}
 
+    @classmethod
+    def _normalize_log_count_params(cls, params: Dict[str, Any], user_message: str) -> Dict[str, Any]:
+        """Map extracted log count params to get_log_count arguments"""
+        # Map camelCase to snake_case
+        param_mapping = {
+            "startTimestamp": "start_timestamp",
+            "endTimestamp": "end_timestamp",
+            "productTypes": "product_types",
+            "accessDirections": "access_directions",
+            "threatClasses": "threat_classes",
+            "srcIps": "src_ips",
+            "dstIps": "dst_ips",
+            "attackStates": "attack_states",
+            "severities": "severities",
+            "includeComparison": "include_comparison",
+            "includeDistribution": "include_distribution",
+            "includeTrend": "include_trend"
+        }
+
+        mapped_params = {}
+        for key, value in params.items():
+            # Skip params get_log_count does not accept
+            if key not in param_mapping:
+                continue
+            mapped_params[param_mapping[key]] = value
+
+        # 添加分析标志位（不依赖LLM返回，使用关键词检测结果）
+        include_comparison, include_distribution, include_trend = cls._log_count_analysis_flags(user_message)
+        mapped_params["include_comparison"] = include_comparison
+        mapped_params["include_distribution"] = include_distribution
+        mapped_params["include_trend"] = include_trend
+
+        return mapped_params
+
+    @staticmethod
+    def _log_count_analysis_flags(user_message: str) -> Tuple[bool, bool, bool]:
+        """(include_comparison, include_distribution, include_trend) from analysis keywords"""
+        user_message_lower = user_message.lower()
+        include_comparison = False
+        include_distribution = False
+        include_trend = False
+
+        if any(keyword in user_message_lower for keyword in ["趋势", "对比", "trend", "compare", "增长", "下降", "变化"]):
+            include_comparison = True
+            include_trend = True
+        elif any(keyword in user_message_lower for keyword in ["分布", "占比", "比例"]):
+            include_distribution = True
+        elif any(keyword in user_message_lower for keyword in ["异常", "突增", "骤降", "anomaly"]):
+            include_comparison = True
+            include_distribution = True
+            include_trend = True
+
+        return include_comparison, include_distribution, include_trend
+
     async def _handle_get_log_count_intent(
         self,
         user_message: str,
@@ -2222,14 +2625,16 @@ class LLMService:
         api_key: str,
         base_url: Optional[str] = None,
         auth_code: Optional[str] = None,
-        flux_base_url: Optional[str] = None
+        flux_base_url: Optional[str] = None,
+        extracted_params: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """处理日志统计意图"""
         try:
             # Extract parameters
-            extracted_params = await self._extract_log_count_params(
-                user_message, messages, provider, api_key, base_url
-            )
+            if extracted_params is None:
+                extracted_params = await self._extract_log_count_params(
+                    user_message, messages, provider, api_key, base_url
+                )
         except Exception:
             # Fallback to normal chat
             chat_result = await self.chat(messages, provider, api_key, base_url)
@@ -2287,6 +2692,9 @@ class LLMService:
                     if "last_month" in data["comparisons"]:
                         lm = data["comparisons"]["last_month"]
                         msg += f"  环比上月: {lm['change_percent']:+.1f}%\n"
+
+                if data.get("anomalies"):
+                    msg += "\n异常检测：\n  • " + "\n  • ".join(a["message"] for a in data["anomalies"]) + "\n"
             else:
                 msg = f"查询成功！符合条件的日志总数：{total:,} 条"
                 if filter_desc:
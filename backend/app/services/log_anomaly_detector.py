@@ -0,0 +1,215 @@
+"""
+Log Anomaly Detector
+Incremental per-filter baselines of daily log counts with weekday seasonality and robust scoring
+"""
+
+import threading
+from array import array
+from collections import OrderedDict, deque
+from datetime import date
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from ..utils.signature_cache import fingerprint_auth_code
+from .log_count_cache import fingerprint_filters
+
+
+# Model settings
+ANOMALY_LEVEL_ALPHA = 0.3  # EWMA weight of the newest deseasonalized day
+ANOMALY_SEASON_GAMMA = 0.2  # EWMA weight for the weekday factor
+ANOMALY_RESIDUAL_WINDOW = 28  # residuals kept for median/MAD
+ANOMALY_WARMUP_DAYS = 14  # days ingested before anything is flagged
+ANOMALY_SCORE_THRESHOLD = 3.5  # robust z-score that counts as anomalous
+ANOMALY_HISTORY_DAYS = 90  # scored days kept for reporting
+
+# Registry bounds
+ANOMALY_MAX_SERIES = 512
+
+# Days of history loaded when a series is first seen
+ANOMALY_LOOKBACK_DAYS = 28
+
+# (day ordinal, count, expected, score)
+ScoredDay = Tuple[int, int, float, float]
+
+
+def _median(values: List[float]) -> float:
+    ordered = sorted(values)
+    middle = len(ordered) // 2
+    if len(ordered) % 2:
+        return ordered[middle]
+    return (ordered[middle - 1] + ordered[middle]) / 2
+
+
+class LogCountSeries:
+    """
+    Baseline of one daily count series
+
+    Each closed day is ingested once, in order, in O(1): the expected value is
+    level x weekday factor, the residual is scored against the median/MAD of
+    recent residuals, then level, weekday factor and residual window are updated
+    (anomalous days are clipped first so they don't poison the baseline).
+    """
+
+    def __init__(self):
+        self.level: Optional[float] = None
+        self.season = array('d', [1.0] * 7)
+        self.weekday_samples = array('l', [0] * 7)
+        self.residuals = array('d', [0.0] * ANOMALY_RESIDUAL_WINDOW)
+        self.samples = 0
+        self.last_day: Optional[int] = None  # ordinal of the last ingested day
+        self.history: Deque[ScoredDay] = deque(maxlen=ANOMALY_HISTORY_DAYS)
+
+    def expected(self, day: int) -> Optional[float]:
+        """Expected full-day count for a day ordinal (None before the first sample)"""
+        if self.level is None:
+            return None
+        return self.level * self.season[date.fromordinal(day).weekday()]
+
+    def score(self, day: int, count: float) -> Tuple[Optional[float], float]:
+        """
+        Score a closed day's count without ingesting it
+
+        Args:
+            day: Day ordinal
+            count: Observed full-day count
+
+        Returns:
+            (expected count, robust z-score or 0 during warmup)
+        """
+        expected, center, scale = self._residual_model(day)
+        if expected is None or scale is None:
+            return expected, 0.0
+        return expected, (count - expected - center) / scale
+
+    def _residual_model(self, day: int) -> Tuple[Optional[float], float, Optional[float]]:
+        """(expected, residual median, residual scale); scale is None during warmup"""
+        expected = self.expected(day)
+        if expected is None:
+            return None, 0.0, None
+
+        window = min(self.samples, ANOMALY_RESIDUAL_WINDOW)
+        if self.samples < ANOMALY_WARMUP_DAYS or not window:
+            return expected, 0.0, None
+
+        recent = list(self.residuals[:window])
+        center = _median(recent)
+        mad = _median([abs(value - center) for value in recent])
+        # Poisson noise floor keeps flat series from flagging every small wobble
+        scale = max(1.4826 * mad, expected ** 0.5, 1.0)
+        return expected, center, scale
+
+    def ingest(self, day: int, count: int) -> Optional[ScoredDay]:
+        """
+        Add the count of a closed day
+
+        Days at or before the last ingested day are ignored, so concurrent
+        callers replaying the same range are harmless.
+
+        Returns:
+            The scored day, or None if it was already ingested
+        """
+        if self.last_day is not None and day <= self.last_day:
+            return None
+
+        weekday = date.fromordinal(day).weekday()
+        expected, center, scale = self._residual_model(day)
+        if expected is None:
+            self.level = float(count)
+            expected = float(count)
+
+        score = 0.0
+        value = float(count)
+        if scale is not None:
+            score = (count - expected - center) / scale
+            # Clip anomalous days before they update the baseline
+            if abs(score) >= ANOMALY_SCORE_THRESHOLD:
+                limit = ANOMALY_SCORE_THRESHOLD * scale
+                value = max(expected + center + (limit if score > 0 else -limit), 0.0)
+
+        self.residuals[self.samples % ANOMALY_RESIDUAL_WINDOW] = value - expected
+        self.samples += 1
+
+        # Running averages until there is enough history, EWMA afterwards
+        alpha = max(ANOMALY_LEVEL_ALPHA, 1.0 / self.samples)
+        self.weekday_samples[weekday] += 1
+        gamma = max(ANOMALY_SEASON_GAMMA, 1.0 / self.weekday_samples[weekday])
+
+        factor = self.season[weekday]
+        self.level = alpha * (value / factor) + (1 - alpha) * self.level
+        if self.level > 0:
+            self.season[weekday] = gamma * (value / self.level) + (1 - gamma) * factor
+            mean_factor = sum(self.season) / 7
+            if mean_factor > 0:
+                for index in range(7):
+                    self.season[index] /= mean_factor
+
+        self.last_day = day
+        scored = (day, count, expected, score)
+        self.history.append(scored)
+        return scored
+
+    def anomalies(self, since_day: int) -> List[ScoredDay]:
+        """Scored days since a day ordinal whose score crossed the threshold"""
+        return [
+            scored for scored in self.history
+            if scored[0] >= since_day and abs(scored[3]) >= ANOMALY_SCORE_THRESHOLD
+        ]
+
+    def baseline(self) -> Dict[str, Any]:
+        """Summary of the learned baseline"""
+        return {
+            "level": round(self.level, 2) if self.level is not None else None,
+            "weekday_factors": [round(factor, 3) for factor in self.season],
+            "samples": self.samples,
+            "last_day": date.fromordinal(self.last_day).isoformat() if self.last_day else None
+        }
+
+
+class LogAnomalyDetector:
+    """Registry of count series per (appliance, credential, filter set), LRU-bounded"""
+
+    def __init__(self, max_series: int = ANOMALY_MAX_SERIES):
+        self.max_series = max_series
+        self._series: "OrderedDict[Tuple[str, str, str], LogCountSeries]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def series(self, base_url: str, auth_code: str, params: dict) -> LogCountSeries:
+        """Return the series for a filter set, creating it on first use"""
+        key = (base_url.rstrip('/').lower(), fingerprint_auth_code(auth_code), fingerprint_filters(params))
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = LogCountSeries()
+                self._series[key] = series
+                while len(self._series) > self.max_series:
+                    self._series.popitem(last=False)
+            else:
+                self._series.move_to_end(key)
+            return series
+
+    def clear(self):
+        """Drop every series"""
+        with self._lock:
+            self._series.clear()
+
+
+def describe_anomaly(scored: ScoredDay) -> Dict[str, Any]:
+    """Format a scored day as an anomaly alert"""
+    day, count, expected, score = scored
+    change = ((count - expected) / expected * 100) if expected else 0.0
+    label = date.fromordinal(day).isoformat()
+    if score > 0:
+        anomaly_type, message = 'warning', f'{label} 日志量突增 (实际 {count}, 预期约 {expected:.0f}, {change:+.1f}%)'
+    else:
+        anomaly_type, message = 'info', f'{label} 日志量骤降 (实际 {count}, 预期约 {expected:.0f}, {change:+.1f}%)'
+    return {
+        'type': anomaly_type,
+        'message': message,
+        'date': date.fromordinal(day).isoformat(),
+        'count': count,
+        'expected': round(expected, 2),
+        'score': round(score, 2)
+    }
+
+
+# 全局日志异常检测实例
+log_anomaly_detector = LogAnomalyDetector()
@@ -0,0 +1,145 @@
+"""
+Log Count Cache
+Remembers counts of closed time windows per appliance and filter set, so only still-open windows are refetched
+"""
+
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from ..utils.signature_cache import fingerprint_auth_code
+
+
+# Cache bounds (closed windows never change, so entries only leave by LRU eviction)
+LOG_COUNT_CACHE_MAX_SIZE = 20000
+
+# A window counts as closed once it ended this long ago (ingestion delay for late-arriving logs)
+LOG_COUNT_SETTLE_SECONDS = 600
+
+# Parameters that define the window rather than the filter set
+WINDOW_FIELDS = ('startTimestamp', 'endTimestamp')
+
+CountKey = Tuple[str, str, str, int, int]
+
+
+def fingerprint_filters(params: dict) -> str:
+    """Hash the non-time filters of a count query"""
+    filters = {key: value for key, value in params.items() if key not in WINDOW_FIELDS}
+    payload = json.dumps(filters, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LogCountCache:
+    """
+    Thread-safe LRU cache of counts for closed windows, keyed by
+    (appliance, credential, filter fingerprint, window start, window end)
+
+    Counts of windows that are still open (end not yet settled) are never
+    stored, so the current partial day is always refetched. A closed window
+    is immutable once settled, so its count is kept until evicted by size.
+
+    Concurrent fan-outs that miss on the same window share one fetch: the
+    first caller claims it and the others await its result.
+    """
+
+    def __init__(
+        self,
+        max_size: int = LOG_COUNT_CACHE_MAX_SIZE,
+        settle_seconds: int = LOG_COUNT_SETTLE_SECONDS
+    ):
+        self.max_size = max_size
+        self.settle_seconds = settle_seconds
+        self._entries: "OrderedDict[CountKey, int]" = OrderedDict()
+        self._pending: Dict[CountKey, asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def key(self, base_url: str, auth_code: str, params: dict) -> Optional[CountKey]:
+        """
+        Build the cache key of a count query
+
+        Returns:
+            The key, or None if the query window is open-ended or not closed yet
+        """
+        start_ts = params.get('startTimestamp')
+        end_ts = params.get('endTimestamp')
+        if not start_ts or not end_ts or end_ts > time.time() - self.settle_seconds:
+            return None
+        return (
+            base_url.rstrip('/').lower(),
+            fingerprint_auth_code(auth_code),
+            fingerprint_filters(params),
+            int(start_ts),
+            int(end_ts)
+        )
+
+    def get(self, key: Optional[CountKey]) -> Optional[int]:
+        """Return a cached count, or None on a miss"""
+        if key is None:
+            return None
+
+        with self._lock:
+            count = self._entries.get(key)
+            if count is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return count
+            self.misses += 1
+        return None
+
+    def put(self, key: Optional[CountKey], count: Optional[int]):
+        """Store the count of a closed window (open windows and failures are ignored)"""
+        if key is None or count is None:
+            return
+
+        with self._lock:
+            self._entries[key] = count
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def claim(self, key: Optional[CountKey]) -> Optional[asyncio.Future]:
+        """
+        Register the caller as the fetcher of a missing window
+
+        Returns:
+            None if the caller should fetch it (and then call release), or the
+            future of the fetch already in flight for the same window
+        """
+        if key is None:
+            return None
+
+        with self._lock:
+            pending = self._pending.get(key)
+            if pending is not None:
+                return pending
+            self._pending[key] = asyncio.get_running_loop().create_future()
+        return None
+
+    def release(self, key: Optional[CountKey], count: Optional[int]):
+        """Store a claimed window's count (None on failure) and wake the callers awaiting it"""
+        self.put(key, count)
+        if key is None:
+            return
+
+        with self._lock:
+            pending = self._pending.pop(key, None)
+        if pending is not None and not pending.done():
+            pending.set_result(count)
+
+    def clear(self):
+        """Drop every cached count"""
+        with self._lock:
+            self._entries.clear()
+
+
+# 全局日志计数缓存实例
+log_count_cache = LogCountCache()
@@ -1,18 +1,53 @@
 import time
 import json
+import asyncio
+import itertools
 import requests
-from datetime import datetime, timedelta
-from typing import List, Optional, Dict
+from datetime import date, datetime, timedelta
+from typing import Any, List, Optional, Dict, Tuple
 from ..utils.sdk.aksk_py3 import Signature
+from ..utils.signature_cache import get_signature
+from ..utils.xdr_client import send_xdr_request
+from .log_count_cache import CountKey, log_count_cache
+from .log_anomaly_detector import (
+    ANOMALY_HISTORY_DAYS,
+    ANOMALY_LOOKBACK_DAYS,
+    LogCountSeries,
+    describe_anomaly,
+    log_anomaly_detector
+)
+
+
+# Maximum concurrent count queries issued by one fan-out
+COUNT_FANOUT_CONCURRENCY = 16  # covers all 13 distribution slices in one wave; still below the per-appliance cap
+
+# Display names of the breakdown dimensions
+SEVERITY_NAMES = {0: '信息', 1: '低危', 2: '中危', 3: '高危', 4: '严重'}
+ACCESS_DIRECTION_NAMES = {1: '外对内', 2: '内对外', 3: '内对内'}
+PRODUCT_TYPE_NAMES = {
+    "STA": "WAF",
+    "EDR": "EDR",
+    "AC": "防火墙",
+    "CWPP": "云安全",
+    "NTA": "流量分析"
+}
+PRODUCT_TYPES = ["STA", "EDR", "AC", "CWPP", "SSL VPN", "NTA", "SIP SecLog", "Logger"]
+
+# Pivot dimension -> (filter field, full value domain)
+PIVOT_DIMENSIONS = {
+    'severity': ('severities', list(SEVERITY_NAMES)),
+    'access_direction': ('accessDirections', list(ACCESS_DIRECTION_NAMES)),
+    'product_type': ('productTypes', PRODUCT_TYPES),
+    'day': (None, None)  # buckets derived from the time range
+}
+
+# Upper bound on leaf cells (= count queries) of one pivot
+PIVOT_MAX_CELLS = 1000
 
 
 class NetworkLogsService:
     """Service for querying network security logs via Flux XDR API"""
 
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.verify = False  # Ignore SSL certificate warnings
-
     async def get_log_count(
         self,
         auth_code: str,
@@ -75,31 +110,16 @@ class NetworkLogsService:
                 end_timestamp = int(datetime.now().timestamp())
 
             # Build request parameters
-            params = {}
-            if start_timestamp:
-                params['startTimestamp'] = start_timestamp
-            if end_timestamp:
-                params['endTimestamp'] = end_timestamp
-            if product_types:
-                params['productTypes'] = product_types
-            if access_directions:
-                params['accessDirections'] = access_directions
-            if threat_classes:
-                params['threatClasses'] = threat_classes
-            if src_ips:
-                params['srcIps'] = src_ips
-            if dst_ips:
-                params['dstIps'] = dst_ips
-            if attack_states:
-                params['attackStates'] = attack_states
-            if severities:
-                params['severities'] = severities
+            params = self._build_params(
+                start_timestamp, end_timestamp, product_types, access_directions,
+                threat_classes, src_ips, dst_ips, attack_states, severities
+            )
 
             # Call Flux API
             api_endpoint = f"{base_url.rstrip('/')}/api/xdr/v1/analysislog/networksecurity/count"
 
             # Create signature
-            signature = Signature(auth_code=auth_code)
+            signature = get_signature(auth_code)
             headers = {"content-type": "application/json"}
             req = requests.Request(
                 "POST",
@@ -109,69 +129,86 @@ class NetworkLogsService:
             )
             signature.signature(req)
 
-            # Send request
-            start_time = time.time()
-            response = self.session.send(req.prepare())
-            end_time = time.time()
-            latency_ms = round((end_time - start_time) * 1000, 2)
-
-            # Check response
-            if response.status_code != 200:
-                return {
-                    "success": False,
-                    "message": f"API请求失败: HTTP {response.status_code}",
-                    "error_type": "api_error"
-                }
-
-            data = response.json()
-
-            if data.get("code") != "Success":
-                return {
-                    "success": False,
-                    "message": data.get("message", "未知错误"),
-                    "error_type": "api_error"
-                }
-
-            # Extract total count
-            total = data.get("data", {}).get("total", 0)
-
-            # Build result
-            result = {
-                "success": True,
-                "message": "查询成功",
-                "data": {
-                    "total": total,
-                    "start_time": start_timestamp,
-                    "end_time": end_timestamp,
-                    "filters": params,
-                    "latency_ms": latency_ms
-                }
-            }
-
-            # Optional: Get comparison data
+            # Optional sections run concurrently with the main count; comparison
+            # percentages are filled in once the current total is known
+            sections = {}
             if include_comparison:
-                result["data"]["comparisons"] = await self._get_comparison(
+                sections["comparisons"] = self._get_comparison(
                     auth_code, base_url, start_timestamp, end_timestamp, params
                 )
-
-            # Optional: Get distribution data
             if include_distribution:
-                result["data"]["distributions"] = await self._get_distribution(
+                sections["distributions"] = self._get_distribution(
                     auth_code, base_url, params
                 )
-
-            # Optional: Get trend data
             if include_trend:
-                result["data"]["trend"] = await self._get_trend(
+                sections["trend"] = self._get_trend(
+                    auth_code, base_url, start_timestamp, end_timestamp, params
+                )
+                sections["series_anomalies"] = self._get_series_anomalies(
                     auth_code, base_url, start_timestamp, end_timestamp, params
                 )
+            section_tasks = {name: asyncio.ensure_future(coro) for name, coro in sections.items()}
+
+            try:
+                # Send request
+                start_time = time.time()
+                response = await send_xdr_request(req)
+                end_time = time.time()
+                latency_ms = round((end_time - start_time) * 1000, 2)
+
+                # Check response
+                if response.status_code != 200:
+                    return {
+                        "success": False,
+                        "message": f"API请求失败: HTTP {response.status_code}",
+                        "error_type": "api_error"
+                    }
+
+                data = response.json()
+
+                if data.get("code") != "Success":
+                    return {
+                        "success": False,
+                        "message": data.get("message", "未知错误"),
+                        "error_type": "api_error"
+                    }
+
+                # Extract total count
+                total = data.get("data", {}).get("total", 0)
+
+                # Build result
+                result = {
+                    "success": True,
+                    "message": "查询成功",
+                    "data": {
+                        "total": total,
+                        "start_time": start_timestamp,
+                        "end_time": end_timestamp,
+                        "filters": params,
+                        "latency_ms": latency_ms
+                    }
+                }
+
+                # Optional: Collect comparison, distribution and trend data
+                for name, task in section_tasks.items():
+                    result["data"][name] = await task
+                series_anomalies = result["data"].pop("series_anomalies", [])
+
+                if include_comparison:
+                    result["data"]["comparisons"] = self._build_comparisons(
+                        total, result["data"]["comparisons"]
+                    )
+            finally:
+                # Stop section queries still running when the main count failed
+                for task in section_tasks.values():
+                    task.cancel()
 
             # Optional: Detect anomalies
             if include_comparison or include_trend:
                 anomalies = self._detect_anomalies(
                     total,
                     result["data"].get("comparisons", {}),
-                    result["data"].get("trend", [])
+                    series_anomalies
                 )
                 if anomalies:
                     result["data"]["anomalies"] = anomalies
@@ -179,33 +216,363 @@ class NetworkLogsService:
             return result
 
         except Exception as e:
-            error_msg = str(e)
-            # Check for specific error types
-            if "auth code" in error_msg.lower() or "联动码" in error_msg:
+            return self._error_result(e)
+
+    async def detect_anomalies(
+        self,
+        auth_code: str,
+        base_url: str,
+        lookback_days: int = ANOMALY_LOOKBACK_DAYS,
+        product_types: List[str] = None,
+        access_directions: List[int] = None,
+        threat_classes: List[str] = None,
+        src_ips: List[str] = None,
+        dst_ips: List[str] = None,
+        attack_states: List[int] = None,
+        severities: List[int] = None
+    ) -> dict:
+        """
+        Detect anomalous days in the daily log count series of a filter set
+
+        The series baseline is kept in memory between calls: only days closed
+        since the last call are fetched. Today is not scored, since log volume
+        is not spread evenly over the hours of a day.
+
+        Args:
+            auth_code: Flux authentication code
+            base_url: Flux API base URL
+            lookback_days: Days to report on (and to load when the series is new)
+            product_types ... severities: Same filters as get_log_count
+
+        Returns:
+            Dictionary with query results:
+            {
+                "success": True/False,
+                "message": str,
+                "data": {
+                    "anomalies": [{"type", "message", "date", "count", "expected", "score"}],
+                    "baseline": {"level", "weekday_factors", "samples", "last_day"},
+                    "lookback_days": int,
+                    "filters": dict
+                },
+                "error_type": str (optional)
+            }
+        """
+        try:
+            lookback_days = max(1, min(lookback_days, ANOMALY_HISTORY_DAYS))
+            params = self._build_params(
+                product_types=product_types, access_directions=access_directions,
+                threat_classes=threat_classes, src_ips=src_ips, dst_ips=dst_ips,
+                attack_states=attack_states, severities=severities
+            )
+
+            # Resolve the signer up front so a bad auth code surfaces as auth_error
+            get_signature(auth_code)
+
+            series = log_anomaly_detector.series(base_url, auth_code, params)
+            await self._update_series(
+                series, auth_code, base_url, params, max(lookback_days, ANOMALY_LOOKBACK_DAYS)
+            )
+
+            since_day = date.today().toordinal() - lookback_days
+            anomalies = [describe_anomaly(scored) for scored in series.anomalies(since_day)]
+
+            data = {
+                "anomalies": anomalies,
+                "baseline": series.baseline(),
+                "lookback_days": lookback_days,
+                "filters": params
+            }
+
+            return {
+                "success": True,
+                "message": f"检测到 {len(anomalies)} 个异常" if anomalies else "未检测到异常",
+                "data": data
+            }
+
+        except Exception as e:
+            return self._error_result(e)
+
+    async def get_log_pivot(
+        self,
+        auth_code: str,
+        base_url: str,
+        dimensions: List[str],
+        start_timestamp: int = None,
+        end_timestamp: int = None,
+        product_types: List[str] = None,
+        access_directions: List[int] = None,
+        threat_classes: List[str] = None,
+        src_ips: List[str] = None,
+        dst_ips: List[str] = None,
+        attack_states: List[int] = None,
+        severities: List[int] = None
+    ) -> dict:
+        """
+        Query a multi-dimension cube of network security log counts
+
+        Only the leaf cells are queried (one count per combination of dimension
+        values, all issued concurrently); totals per dimension value and the grand
+        total are derived by summing the leaves. A filter on a pivoted dimension
+        narrows that dimension's values instead of multiplying queries.
+
+        Args:
+            auth_code: Flux authentication code
+            base_url: Flux API base URL
+            dimensions: Cube axes, any of "severity", "access_direction",
+                "product_type", "day"
+            start_timestamp ... severities: Same filters as get_log_count
+
+        Returns:
+            Dictionary with query results:
+            {
+                "success": True/False,
+                "message": str,
+                "data": {
+                    "dimensions": [{"name": str, "values": list, "labels": list}],
+                    "cells": nested list (one level per dimension, None = query failed),
+                    "marginals": {dimension: [total per value]},
+                    "total": int,
+                    "start_time": int,
+                    "end_time": int,
+                    "filters": dict,
+                    "query_count": int,
+                    "failed_count": int,
+                    "latency_ms": float
+                },
+                "error_type": str (optional)
+            }
+        """
+        try:
+            if not dimensions:
                 return {
                     "success": False,
-                    "message": "认证码错误，请检查联动码是否正确",
-                    "error_type": "auth_error"
+                    "message": "至少需要指定一个维度",
+                    "error_type": "invalid_params"
                 }
-            elif "connection" in error_msg.lower():
+            unknown = [name for name in dimensions if name not in PIVOT_DIMENSIONS]
+            if unknown or len(set(dimensions)) != len(dimensions):
                 return {
                     "success": False,
-                    "message": f"连接失败: {error_msg}",
-                    "error_type": "connection_error"
+                    "message": f"维度无效或重复: {', '.join(unknown or dimensions)}",
+                    "error_type": "invalid_params"
                 }
-            elif "timeout" in error_msg.lower():
+
+            if not start_timestamp:
+                start_timestamp = int((datetime.now() - timedelta(days=7)).timestamp())
+            if not end_timestamp:
+                end_timestamp = int(datetime.now().timestamp())
+
+            params = self._build_params(
+                start_timestamp, end_timestamp, product_types, access_directions,
+                threat_classes, src_ips, dst_ips, attack_states, severities
+            )
+
+            axes = [self._pivot_axis(name, params) for name in dimensions]
+            cell_count = 1
+            for axis in axes:
+                cell_count *= len(axis["values"])
+            if cell_count > PIVOT_MAX_CELLS:
                 return {
                     "success": False,
-                    "message": "请求超时，请稍后重试",
-                    "error_type": "timeout_error"
+                    "message": f"查询维度组合过多 ({cell_count} > {PIVOT_MAX_CELLS})，请缩小时间范围或减少维度",
+                    "error_type": "invalid_params"
                 }
-            else:
+
+            # Resolve the signer up front so a bad auth code surfaces as auth_error
+            get_signature(auth_code)
+
+            # Plan: one count per leaf cell, filters narrowed to that cell
+            coordinates = list(itertools.product(*[range(len(axis["values"])) for axis in axes]))
+            plan = []
+            for coordinate in coordinates:
+                cell_params = params.copy()
+                for axis, position in zip(axes, coordinate):
+                    cell_params.update(axis["filters"][position])
+                plan.append(cell_params)
+
+            start_time = time.time()
+            counts = await self._fetch_counts(auth_code, base_url, plan)
+            latency_ms = round((time.time() - start_time) * 1000, 2)
+
+            failed_count = sum(1 for count in counts if count is None)
+            if plan and failed_count == len(plan):
                 return {
                     "success": False,
-                    "message": f"查询失败: {error_msg}",
-                    "error_type": "unknown_error"
+                    "message": "日志统计查询失败，请检查网络连接或稍后重试",
+                    "error_type": "api_error"
                 }
 
+            # Marginals by summation over the leaves
+            marginals = {axis["name"]: [0] * len(axis["values"]) for axis in axes}
+            total = 0
+            for coordinate, count in zip(coordinates, counts):
+                if count is None:
+                    continue
+                total += count
+                for axis, position in zip(axes, coordinate):
+                    marginals[axis["name"]][position] += count
+
+            return {
+                "success": True,
+                "message": "查询成功" if not failed_count else f"部分查询失败 ({failed_count}/{len(plan)})",
+                "data": {
+                    "dimensions": [
+                        {"name": axis["name"], "values": axis["values"], "labels": axis["labels"]}
+                        for axis in axes
+                    ],
+                    "cells": self._dense_cells(counts, [len(axis["values"]) for axis in axes]),
+                    "marginals": marginals,
+                    "total": total,
+                    "start_time": start_timestamp,
+                    "end_time": end_timestamp,
+                    "filters": params,
+                    "query_count": len(plan),
+                    "failed_count": failed_count,
+                    "latency_ms": latency_ms
+                }
+            }
+
+        except Exception as e:
+            return self._error_result(e)
+
+    def _pivot_axis(self, name: str, params: dict) -> Dict[str, Any]:
+        """
+        Resolve one pivot dimension into its values, labels and per-value filters
+
+        Args:
+            name: Dimension name
+            params: Base query parameters (filters and time range)
+
+        Returns:
+            {"name", "values", "labels", "filters": [params override per value]}
+        """
+        if name == 'day':
+            buckets = self._day_buckets(params['startTimestamp'], params['endTimestamp'])
+            return {
+                "name": name,
+                "values": [label for label, _, _ in buckets],
+                "labels": [label for label, _, _ in buckets],
+                "filters": [
+                    {'startTimestamp': day_start, 'endTimestamp': day_end}
+                    for _, day_start, day_end in buckets
+                ]
+            }
+
+        field, domain = PIVOT_DIMENSIONS[name]
+        selected = params.get(field)
+        values = [value for value in domain if value in selected] if selected else list(domain)
+        names = {
+            'severity': SEVERITY_NAMES,
+            'access_direction': ACCESS_DIRECTION_NAMES,
+            'product_type': PRODUCT_TYPE_NAMES
+        }[name]
+        return {
+            "name": name,
+            "values": values,
+            "labels": [names.get(value, value) for value in values],
+            "filters": [{field: [value]} for value in values]
+        }
+
+    @staticmethod
+    def _day_buckets(start_ts: int, end_ts: int) -> List[Tuple[str, int, int]]:
+        """
+        Split a time range into calendar-day buckets: (date label, start, end)
+
+        Buckets end at local midnight so every full day has the same window on
+        each query and its count can be served from the cache.
+        """
+        buckets = []
+        current = start_ts
+        while current < end_ts:
+            day = datetime.fromtimestamp(current)
+            next_midnight = int((day.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)).timestamp())
+            day_end = min(next_midnight, end_ts)
+            buckets.append((day.strftime('%Y-%m-%d'), current, day_end))
+            current = day_end
+        return buckets
+
+    @staticmethod
+    def _is_whole_day(day_start: int, day_end: int) -> bool:
+        """Whether a day bucket spans a full calendar day (local midnight to midnight)"""
+        midnight = datetime.fromtimestamp(day_start).replace(hour=0, minute=0, second=0, microsecond=0)
+        return (
+            int(midnight.timestamp()) == day_start
+            and int((midnight + timedelta(days=1)).timestamp()) == day_end
+        )
+
+    @staticmethod
+    def _dense_cells(counts: List[Optional[int]], shape: List[int]) -> list:
+        """Reshape row-major leaf counts into nested lists, one level per dimension"""
+        cells: list = list(counts)
+        for size in reversed(shape[1:]):
+            cells = [cells[i:i + size] for i in range(0, len(cells), size)]
+        return cells
+
+    @staticmethod
+    def _build_params(
+        start_timestamp: int = None,
+        end_timestamp: int = None,
+        product_types: List[str] = None,
+        access_directions: List[int] = None,
+        threat_classes: List[str] = None,
+        src_ips: List[str] = None,
+        dst_ips: List[str] = None,
+        attack_states: List[int] = None,
+        severities: List[int] = None
+    ) -> dict:
+        """Build count API parameters, leaving out empty filters"""
+        params = {}
+        if start_timestamp:
+            params['startTimestamp'] = start_timestamp
+        if end_timestamp:
+            params['endTimestamp'] = end_timestamp
+        if product_types:
+            params['productTypes'] = product_types
+        if access_directions:
+            params['accessDirections'] = access_directions
+        if threat_classes:
+            params['threatClasses'] = threat_classes
+        if src_ips:
+            params['srcIps'] = src_ips
+        if dst_ips:
+            params['dstIps'] = dst_ips
+        if attack_states:
+            params['attackStates'] = attack_states
+        if severities:
+            params['severities'] = severities
+        return params
+
+    @staticmethod
+    def _error_result(e: Exception) -> dict:
+        """Map an exception to an error result"""
+        error_msg = str(e)
+        # Check for specific error types
+        if "auth code" in error_msg.lower() or "联动码" in error_msg:
+            return {
+                "success": False,
+                "message": "认证码错误，请检查联动码是否正确",
+                "error_type": "auth_error"
+            }
+        elif "connection" in error_msg.lower():
+            return {
+                "success": False,
+                "message": f"连接失败: {error_msg}",
+                "error_type": "connection_error"
+            }
+        elif "timeout" in error_msg.lower():
+            return {
+                "success": False,
+                "message": "请求超时，请稍后重试",
+                "error_type": "timeout_error"
+            }
+        else:
+            return {
+                "success": False,
+                "message": f"查询失败: {error_msg}",
+                "error_type": "unknown_error"
+            }
+
     async def _get_comparison(
         self,
         auth_code: str,
@@ -215,7 +582,7 @@ class NetworkLogsService:
         params: dict
     ) -> dict:
         """
-        Get comparison data (上周、上月)
+        Get comparison counts (上周、上月) for the same window shifted back
 
         Args:
             auth_code: Authentication code
@@ -225,54 +592,96 @@ class NetworkLogsService:
             params: Original query parameters
 
         Returns:
-            Dictionary with comparison data
+            Dictionary of previous counts: {"last_week": int, "last_month": int}
+            (periods whose query failed are omitted)
         """
-        comparisons = {}
-        current_count = 0  # Will be populated by caller
-
         # Calculate time differences
-        week_diff = 7 * 24 * 60 * 60
-        month_diff = 30 * 24 * 60 * 60
+        shifts = {
+            'last_week': 7 * 24 * 60 * 60,
+            'last_month': 30 * 24 * 60 * 60
+        }
 
-        # Get last week data
-        last_week_params = params.copy()
-        last_week_params['startTimestamp'] = start_ts - week_diff
-        last_week_params['endTimestamp'] = end_ts - week_diff
+        periods = list(shifts)
+        counts = await asyncio.gather(*[
+            self._fetch_window_count(auth_code, base_url, start_ts - shifts[period], end_ts - shifts[period], params)
+            for period in periods
+        ])
 
-        last_week_count = await self._fetch_count(
-            auth_code, base_url, last_week_params
-        )
+        return {period: count for period, count in zip(periods, counts) if count is not None}
+
+    @staticmethod
+    def _build_comparisons(current_count: int, previous_counts: dict) -> dict:
+        """
+        Compute change percentages of the current total against previous periods
 
-        if last_week_count is not None:
-            week_change = 0
-            if last_week_count > 0 and current_count > 0:
-                week_change = ((current_count - last_week_count) / last_week_count) * 100
+        Args:
+            current_count: Total of the current window
+            previous_counts: Counts from _get_comparison
 
-            comparisons['last_week'] = {
-                'count': last_week_count,
-                'change_percent': week_change
+        Returns:
+            Dictionary with comparison data: {period: {"count", "change_percent"}}
+        """
+        comparisons = {}
+        for period, previous_count in previous_counts.items():
+            change = 0
+            if previous_count > 0:
+                change = ((current_count - previous_count) / previous_count) * 100
+
+            comparisons[period] = {
+                'count': previous_count,
+                'change_percent': change
             }
 
-        # Get last month data
-        last_month_params = params.copy()
-        last_month_params['startTimestamp'] = start_ts - month_diff
-        last_month_params['endTimestamp'] = end_ts - month_diff
+        return comparisons
 
-        last_month_count = await self._fetch_count(
-            auth_code, base_url, last_month_params
-        )
+    async def _fetch_window_count(
+        self,
+        auth_code: str,
+        base_url: str,
+        start_ts: int,
+        end_ts: int,
+        params: dict
+    ) -> Optional[int]:
+        """
+        Count one time window as the sum of its day buckets
 
-        if last_month_count is not None:
-            month_change = 0
-            if last_month_count > 0 and current_count > 0:
-                month_change = ((current_count - last_month_count) / last_month_count) * 100
+        Whole calendar days are served from (and stored in) the shared day cache,
+        the same buckets _get_trend uses. The partial first/last day of a window
+        that does not start or end at midnight is a one-off window: it is queried
+        live and never cached, so it cannot push useful days out of the LRU.
 
-            comparisons['last_month'] = {
-                'count': last_month_count,
-                'change_percent': month_change
-            }
+        Args:
+            auth_code: Authentication code
+            base_url: API base URL
+            start_ts: Window start timestamp
+            end_ts: Window end timestamp
+            params: Query parameters (time range is replaced)
 
-        return comparisons
+        Returns:
+            Count value or None if any part failed
+        """
+        full_days = []
+        fragments = []
+        for _, day_start, day_end in self._day_buckets(start_ts, end_ts):
+            day_params = params.copy()
+            day_params['startTimestamp'] = day_start
+            day_params['endTimestamp'] = day_end
+            if self._is_whole_day(day_start, day_end):
+                full_days.append(day_params)
+            else:
+                fragments.append(day_params)
+
+        if not full_days and not fragments:
+            return None
+
+        day_counts, fragment_counts = await asyncio.gather(
+            self._fetch_counts(auth_code, base_url, full_days),
+            asyncio.gather(*[self._fetch_count(auth_code, base_url, fragment) for fragment in fragments])
+        )
+        counts = list(day_counts) + list(fragment_counts)
+        if any(count is None for count in counts):
+            return None
+        return sum(counts)
 
     async def _get_distribution(
         self,
@@ -291,55 +700,29 @@ class NetworkLogsService:
         Returns:
             Dictionary with distribution data
         """
-        distributions = {}
-
-        # Distribution by severity
-        severity_dist = {}
-        severity_names = {0: '信息', 1: '低危', 2: '中危', 3: '高危', 4: '严重'}
-
-        for severity in [0, 1, 2, 3, 4]:
-            severity_params = params.copy()
-            severity_params['severities'] = [severity]
-            count = await self._fetch_count(auth_code, base_url, severity_params)
-            if count is not None:
-                severity_dist[severity_names[severity]] = count
-
-        if severity_dist:
-            distributions['severity'] = severity_dist
-
-        # Distribution by access direction
-        direction_dist = {}
-        direction_names = {1: '外对内', 2: '内对外', 3: '内对内'}
-
-        for direction in [1, 2, 3]:
-            direction_params = params.copy()
-            direction_params['accessDirections'] = [direction]
-            count = await self._fetch_count(auth_code, base_url, direction_params)
-            if count is not None:
-                direction_dist[direction_names[direction]] = count
-
-        if direction_dist:
-            distributions['access_direction'] = direction_dist
-
-        # Distribution by product type
-        product_dist = {}
-        product_names = {
-            "STA": "WAF",
-            "EDR": "EDR",
-            "AC": "防火墙",
-            "CWPP": "云安全",
-            "NTA": "流量分析"
-        }
+        # (distribution key, filter field, value -> display name)
+        dimensions = [
+            ('severity', 'severities', SEVERITY_NAMES),
+            ('access_direction', 'accessDirections', ACCESS_DIRECTION_NAMES),
+            ('product_type', 'productTypes', PRODUCT_TYPE_NAMES)
+        ]
+
+        slices = []
+        for dist_key, field, names in dimensions:
+            for value, name in names.items():
+                slice_params = params.copy()
+                slice_params[field] = [value]
+                slices.append((dist_key, name, slice_params))
+
+        # All 13 slices are queried concurrently with one shared signer
+        counts = await self._fetch_counts(
+            auth_code, base_url, [slice_params for _, _, slice_params in slices]
+        )
 
-        for product in ["STA", "EDR", "AC", "CWPP", "NTA"]:
-            product_params = params.copy()
-            product_params['productTypes'] = [product]
-            count = await self._fetch_count(auth_code, base_url, product_params)
+        distributions = {}
+        for (dist_key, name, _), count in zip(slices, counts):
             if count is not None:
-                product_dist[product_names[product]] = count
-
-        if product_dist:
-            distributions['product_type'] = product_dist
+                distributions.setdefault(dist_key, {})[name] = count
 
         return distributions
 
@@ -364,32 +747,117 @@ class NetworkLogsService:
         Returns:
             List of daily data points
         """
-        trend = []
-        current = start_ts
-        day_seconds = 24 * 60 * 60
-
-        while current < end_ts:
-            day_end = min(current + day_seconds, end_ts)
+        buckets = self._day_buckets(start_ts, end_ts)
+        day_params_list = []
+        for _, day_start, day_end in buckets:
             day_params = params.copy()
-            day_params['startTimestamp'] = current
+            day_params['startTimestamp'] = day_start
             day_params['endTimestamp'] = day_end
+            day_params_list.append(day_params)
 
-            count = await self._fetch_count(auth_code, base_url, day_params)
+        # Closed days come from the cache; only missing and open days are queried
+        counts = await self._fetch_counts(auth_code, base_url, day_params_list)
+
+        trend = []
+        for (day_label, _, _), count in zip(buckets, counts):
             if count is not None:
                 trend.append({
-                    'date': datetime.fromtimestamp(current).strftime('%Y-%m-%d'),
+                    'date': day_label,
                     'count': count
                 })
 
-            current = day_end
-
         return trend
 
+    async def _update_series(
+        self,
+        series: LogCountSeries,
+        auth_code: str,
+        base_url: str,
+        params: dict,
+        lookback_days: int
+    ):
+        """
+        Feed the days closed since the series' last update
+
+        Args:
+            series: Series to update
+            auth_code: Authentication code
+            base_url: API base URL
+            params: Filters of the series (no time range)
+            lookback_days: History to load when the series is new
+        """
+        now = datetime.now()
+        today = now.date().toordinal()
+
+        def day_window(day: int) -> Tuple[int, int]:
+            day_start = datetime.fromordinal(day)
+            return int(day_start.timestamp()), int((day_start + timedelta(days=1)).timestamp())
+
+        # Yesterday only counts as closed once late logs have settled
+        today_start = int(datetime.fromordinal(today).timestamp())
+        last_closed = today - 1 if now.timestamp() - today_start >= log_count_cache.settle_seconds else today - 2
+
+        if series.last_day is None:
+            first_day = today - lookback_days
+        else:
+            first_day = max(series.last_day + 1, today - ANOMALY_HISTORY_DAYS)
+        days = list(range(first_day, last_closed + 1))
+
+        params_list = []
+        for day in days:
+            day_start, day_end = day_window(day)
+            day_params = params.copy()
+            day_params['startTimestamp'] = day_start
+            day_params['endTimestamp'] = day_end
+            params_list.append(day_params)
+
+        # Closed days mostly come from the log count cache
+        counts = await self._fetch_counts(auth_code, base_url, params_list)
+
+        for day, count in zip(days, counts):
+            if count is None:
+                break  # keep days in order; the rest is retried on the next call
+            series.ingest(day, count)
+
+    async def _get_series_anomalies(
+        self,
+        auth_code: str,
+        base_url: str,
+        start_ts: int,
+        end_ts: int,
+        params: dict
+    ) -> list:
+        """
+        Get anomalous days within a time range from the streaming detector
+
+        Args:
+            auth_code: Authentication code
+            base_url: API base URL
+            start_ts: Start timestamp
+            end_ts: End timestamp
+            params: Original query parameters
+
+        Returns:
+            List of anomaly alerts
+        """
+        filters = {key: value for key, value in params.items() if key not in ('startTimestamp', 'endTimestamp')}
+        first_day = date.fromtimestamp(start_ts).toordinal()
+        last_day = date.fromtimestamp(end_ts).toordinal()
+        lookback_days = min(max(ANOMALY_LOOKBACK_DAYS, date.today().toordinal() - first_day), ANOMALY_HISTORY_DAYS)
+
+        series = log_anomaly_detector.series(base_url, auth_code, filters)
+        await self._update_series(series, auth_code, base_url, filters, lookback_days)
+
+        return [
+            describe_anomaly(scored) for scored in series.anomalies(first_day)
+            if scored[0] <= last_day
+        ]
+
     def _detect_anomalies(
         self,
         current_count: int,
         comparisons: dict,
-        trend: list
+        series_anomalies: list
     ) -> list:
         """
         Detect anomalies in log data
@@ -397,7 +865,7 @@ class NetworkLogsService:
         Args:
             current_count: Current log count
             comparisons: Comparison data
-            trend: Trend data
+            series_anomalies: Anomalous days from the streaming detector
 
         Returns:
             List of anomaly alerts
@@ -415,24 +883,71 @@ class NetworkLogsService:
                     'message': f'日志量环比{direction} {abs(week_change):.1f}%'
                 })
 
-        # Check for daily spikes
-        if len(trend) > 1:
-            avg_count = sum(day['count'] for day in trend) / len(trend)
-            for day in trend:
-                if day['count'] > avg_count * 1.5:
-                    increase_percent = ((day['count'] - avg_count) / avg_count) * 100
-                    anomalies.append({
-                        'type': 'warning',
-                        'message': f'{day["date"]} 日志量突增 (+{increase_percent:.1f}%)'
-                    })
+        # Daily spikes/drops against the learned baseline (weekday-aware)
+        anomalies.extend(series_anomalies)
 
         return anomalies
 
+    async def _fetch_counts(
+        self,
+        auth_code: str,
+        base_url: str,
+        params_list: List[dict],
+        concurrency: int = COUNT_FANOUT_CONCURRENCY
+    ) -> List[Optional[int]]:
+        """
+        Fetch many counts concurrently
+
+        Counts of closed windows are served from / stored in the log count cache;
+        a closed window another fan-out is already fetching is awaited, not refetched.
+
+        Args:
+            auth_code: Authentication code
+            base_url: API base URL
+            params_list: Query parameters for each count
+            concurrency: Maximum in-flight count queries for this fan-out
+
+        Returns:
+            Count values (None where a query failed), in the order of params_list
+        """
+        keys = [log_count_cache.key(base_url, auth_code, params) for params in params_list]
+        counts: List[Optional[int]] = [log_count_cache.get(key) for key in keys]
+        missing = [index for index, count in enumerate(counts) if count is None]
+        if not missing:
+            return counts
+
+        try:
+            signature = get_signature(auth_code)
+        except Exception:
+            return counts
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch(key: Optional[CountKey], params: dict) -> Optional[int]:
+            pending = log_count_cache.claim(key)
+            if pending is not None:
+                return await asyncio.shield(pending)
+
+            count = None
+            try:
+                async with semaphore:
+                    count = await self._fetch_count(auth_code, base_url, params, signature=signature)
+            finally:
+                log_count_cache.release(key, count)
+            return count
+
+        fetched = await asyncio.gather(*[fetch(keys[index], params_list[index]) for index in missing])
+        for index, count in zip(missing, fetched):
+            counts[index] = count
+
+        return counts
+
     async def _fetch_count(
         self,
         auth_code: str,
         base_url: str,
-        params: dict
+        params: dict,
+        signature: Optional[Signature] = None
     ) -> Optional[int]:
         """
         Helper method to fetch a single count
@@ -441,6 +956,7 @@ class NetworkLogsService:
             auth_code: Authentication code
             base_url: API base URL
             params: Query parameters
+            signature: Pre-resolved signer (looked up from auth_code if omitted)
 
         Returns:
             Count value or None if failed
@@ -448,7 +964,8 @@ class NetworkLogsService:
         try:
             api_endpoint = f"{base_url.rstrip('/')}/api/xdr/v1/analysislog/networksecurity/count"
 
-            signature = Signature(auth_code=auth_code)
+            if signature is None:
+                signature = get_signature(auth_code)
             headers = {"content-type": "application/json"}
             req = requests.Request(
                 "POST",
@@ -458,7 +975,7 @@ class NetworkLogsService:
             )
             signature.signature(req)
 
-            response = self.session.send(req.prepare())
+            response = await send_xdr_request(req)
 
             if response.status_code == 200:
                 data = response.json()
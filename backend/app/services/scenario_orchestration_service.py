@@ -157,14 +157,11 @@ class ScenarioOrchestrationService:
 
         # 如果没有IP需要封禁，只更新事件状态
         if not ips_to_block:
-            update_results = []
-            for incident_id in incident_ids:
-                result = await self._update_incident_status(
-                    auth_code=auth_code,
-                    base_url=base_url,
-                    incident_id=incident_id
-                )
-                update_results.append(result)
+            update_results = await self._update_incident_statuses(
+                auth_code=auth_code,
+                base_url=base_url,
+                incident_ids=incident_ids
+            )
 
             # 统计事件更新成功/失败
             update_success_count = sum(1 for r in update_results if r.get("success", False))
@@ -191,38 +188,36 @@ class ScenarioOrchestrationService:
                 }
             }
 
-        # 并行执行IP封禁和事件状态更新
-        block_tasks = []
-        for ip in ips_to_block:
-            task = self._block_ip(
-                auth_code=auth_code,
-                base_url=base_url,
-                ip=ip,
-                device_name=device_name,
-                duration_days=block_duration_days
-            )
-            block_tasks.append(task)
+        # 并行执行IP封禁（先统一规划）和事件状态更新
+        block_task = self._block_ips(
+            auth_code=auth_code,
+            base_url=base_url,
+            ips=ips_to_block,
+            device_name=device_name,
+            duration_days=block_duration_days
+        )
 
-        # 为每个事件创建更新任务
-        update_tasks = []
-        for incident_id in incident_ids:
-            task = self._update_incident_status(
-                auth_code=auth_code,
-                base_url=base_url,
-                incident_id=incident_id
-            )
-            update_tasks.append(task)
+        # 所有事件的状态更新合并为批量请求
+        update_task = self._update_incident_statuses(
+            auth_code=auth_code,
+            base_url=base_url,
+            incident_ids=incident_ids
+        )
 
-        # 并行执行所有任务
-        all_results = await asyncio.gather(
-            *block_tasks,
-            *update_tasks,
+        block_results, update_results = await asyncio.gather(
+            block_task,
+            update_task,
             return_exceptions=True
         )
 
         # 解析结果
-        block_results = all_results[:len(ips_to_block)]
-        update_results = all_results[len(ips_to_block):]
+        if isinstance(block_results, Exception):
+            block_results = [block_results] * len(ips_to_block)
+        if isinstance(update_results, Exception):
+            update_results = [
+                self._incident_update_detail(incident_id, False, f"更新失败: {str(update_results)}")
+                for incident_id in incident_ids
+            ]
 
         # 统计成功/失败
         block_success_count = 0
@@ -660,6 +655,24 @@ class ScenarioOrchestrationService:
 
             results = await asyncio.gather(*tasks, return_exceptions=True)
 
+            # 并行评估所有成功事件的危害程度
+            evaluated_indexes = [
+                i for i, result in enumerate(results)
+                if not isinstance(result, Exception) and result.get("success")
+            ]
+            risk_results = await asyncio.gather(*[
+                self._evaluate_incident_risk(
+                    incident=incidents[i],
+                    proof=results[i].get("proof") or {},
+                    entities=results[i].get("entities") or {},
+                    provider=provider,
+                    api_key=api_key,
+                    llm_base_url=llm_base_url
+                )
+                for i in evaluated_indexes
+            ], return_exceptions=True)
+            risk_assessments = dict(zip(evaluated_indexes, risk_results))
+
             # 组合结果
             incident_details = []
             overall_success = True
@@ -683,24 +696,15 @@ class ScenarioOrchestrationService:
                     incident_info["entities"] = result.get("entities")
                     incident_info["success"] = True
 
-                    # 评估危害程度
-                    try:
-                        risk_assessment = await self._evaluate_incident_risk(
-                            incident=incidents[i],
-                            proof=result.get("proof") or {},
-                            entities=result.get("entities") or {},
-                            provider=provider,
-                            api_key=api_key,
-                            llm_base_url=llm_base_url
-                        )
-                        incident_info["risk_assessment"] = risk_assessment
-                    except Exception as e:
+                    risk_assessment = risk_assessments.get(i)
+                    if isinstance(risk_assessment, Exception):
                         # 评估失败，使用默认值
-                        incident_info["risk_assessment"] = {
+                        risk_assessment = {
                             "risk_level": 0,
                             "risk_reasoning": "评估失败",
                             "recommendation": "建议人工审核"
                         }
+                    incident_info["risk_assessment"] = risk_assessment
                 else:
                     incident_info["error"] = result.get("error")
                     error_messages.append(f"事件{incidents[i].get('name', '未知')}失败: {result.get('error', '未知错误')}")
@@ -902,16 +906,64 @@ class ScenarioOrchestrationService:
             "incident_id": incident.get("uuId", "")
         }
 
-    async def _block_ip(
+    async def _block_ips(
         self,
         auth_code: str,
         base_url: str,
-        ip: str,
+        ips: List[str],
         device_name: str,
         duration_days: int = 7
+    ) -> List[Dict[str, Any]]:
+        """
+        批量封禁IP: 一次性解析设备并检查所有IP的封禁状态，只对仍需封禁的IP发起封禁
+
+        Returns:
+            与ips一一对应的封禁结果列表
+        """
+        ipblock_service = IpBlockService(
+            base_url=base_url,
+            auth_code=auth_code
+        )
+
+        # 一次规划: 设备列表和封禁状态各查询一次
+        plan = await ipblock_service.plan_blocks(
+            ip_addresses=ips,
+            device_name=device_name,
+            device_type="AF"
+        )
+
+        # 仍需封禁的IP合并到同一条封禁规则中（同设备/时长/原因）
+        need_block_ips = [ip for ip in dict.fromkeys(ips) if plan[ip]["action"] == "need_block"]
+        block_results = {}
+        if need_block_ips:
+            block_params = plan[need_block_ips[0]]["block_params"]
+            batch_result = await ipblock_service.block_ips(
+                ip_addresses=need_block_ips,
+                device_id=block_params["device_id"],
+                device_name=block_params["device_name"],
+                device_type=block_params["device_type"],
+                device_version=block_params.get("device_version", ""),
+                block_type=block_params["block_type"],
+                time_type="temporary",
+                time_value=duration_days,
+                time_unit="d",
+                reason="AI自动化闭环 - 每日高危事件处置"
+            )
+            block_results = {item["ip"]: item for item in batch_result["results"]}
+
+        return [
+            self._block_ip_result(ip, plan[ip], block_results.get(ip))
+            for ip in ips
+        ]
+
+    @staticmethod
+    def _block_ip_result(
+        ip: str,
+        check_result: Dict[str, Any],
+        block_result: Optional[Dict[str, Any]]
     ) -> Dict[str, Any]:
         """
-        封禁单个IP
+        根据规划结果和批量封禁结果构造单个IP的封禁结果
 
         Returns:
             {
@@ -921,119 +973,81 @@ class ScenarioOrchestrationService:
                 "ip": str
             }
         """
-        try:
-            # 使用IpBlockService
-            ipblock_service = IpBlockService(
-                base_url=base_url,
-                auth_code=auth_code
-            )
-
-            # 调用check_and_block获取封禁参数
-            check_result = ipblock_service.check_and_block(
-                ip_address=ip,
-                device_name=device_name,
-                device_type="AF"
-            )
-
-            if check_result["action"] == "already_blocked":
-                # 已封禁
-                return {
-                    "success": True,
-                    "ip": ip,
-                    "already_blocked": True,
-                    "rule_ids": [],
-                    "message": f"IP {ip} 已被封禁"
-                }
-            elif check_result["action"] == "need_block":
-                # 需要封禁，执行封禁操作
-                block_params = check_result["block_params"]
-
-                # 修改封禁时长为指定天数
-                block_result = ipblock_service.block_ip(
-                    ip_address=ip,
-                    device_id=block_params["device_id"],
-                    device_name=block_params["device_name"],
-                    device_type=block_params["device_type"],
-                    device_version=block_params.get("device_version", ""),
-                    block_type=block_params["block_type"],
-                    time_type="temporary",
-                    time_value=duration_days,
-                    time_unit="d",
-                    reason="AI自动化闭环 - 每日高危事件处置"
-                )
-
-                return {
-                    "success": block_result.get("success", False),
-                    "ip": ip,
-                    "already_blocked": False,
-                    "rule_ids": block_result.get("rule_ids", []),
-                    "message": block_result.get("message", ""),
-                    "error_info": block_result.get("error_info")
-                }
-            else:
-                # 错误
-                error_info = check_result.get("error_info", {})
-                return {
-                    "success": False,
-                    "ip": ip,
-                    "error": error_info.get("friendly_message", "封禁失败"),
-                    "error_info": error_info
-                }
-        except Exception as e:
+        if check_result["action"] == "already_blocked":
+            # 已封禁
+            return {
+                "success": True,
+                "ip": ip,
+                "already_blocked": True,
+                "rule_ids": [],
+                "message": f"IP {ip} 已被封禁"
+            }
+        elif check_result["action"] == "need_block" and block_result is not None:
+            return {
+                "success": block_result.get("success", False),
+                "ip": ip,
+                "already_blocked": False,
+                "rule_ids": block_result.get("rule_ids", []),
+                "message": block_result.get("message", ""),
+                "error_info": block_result.get("error_info")
+            }
+        else:
+            # 错误
+            error_info = check_result.get("error_info") or {}
             return {
                 "success": False,
                 "ip": ip,
-                "error": str(e)
+                "error": error_info.get("friendly_message", "封禁失败"),
+                "error_info": error_info
             }
 
-    async def _update_incident_status(
+    async def _update_incident_statuses(
         self,
         auth_code: str,
         base_url: str,
-        incident_id: str
-    ) -> Dict[str, Any]:
+        incident_ids: List[str]
+    ) -> List[Dict[str, Any]]:
         """
-        更新事件状态为已处置
+        批量更新事件状态为已处置（每200个事件一次请求）
 
         Returns:
-            {
-                "success": bool,
-                "total": int,
-                "succeededNum": int,
-                "message": str
-            }
+            与incident_ids一一对应的更新结果列表
         """
+        if not incident_ids:
+            return []
+
         try:
-            result = await self.incidents_service.update_incident_status(
+            results = await self.incidents_service.batch_update_incident_status(
                 auth_code=auth_code,
                 base_url=base_url,
-                uuids=[incident_id],
-                deal_status=40,  # 已处置
-                deal_comment="AI自动化闭环 - IP已封禁"
+                updates=[
+                    (incident_id, 40, "AI自动化闭环 - IP已封禁")  # 40: 已处置
+                    for incident_id in incident_ids
+                ]
             )
-
-            if result.get("success"):
-                data = result.get("data", {})
-                return {
-                    "success": True,
-                    "total": data.get("total", 1),
-                    "succeededNum": data.get("succeededNum", 0),
-                    "failedNum": data.get("failedNum", 0),
-                    "message": "事件状态更新成功"
-                }
-            else:
-                return {
-                    "success": False,
-                    "total": 0,
-                    "succeededNum": 0,
-                    "failedNum": 1,
-                    "message": result.get("message", "更新失败")
-                }
+            error_message = "更新失败"
         except Exception as e:
-            return {
-                "success": False,
-                "total": 0,
-                "succeededNum": 0,
-                "failedNum": 1,
-                "message": f"更新失败: {str(e)}"
-            }
+            results = {}
+            error_message = f"更新失败: {str(e)}"
+
+        details = []
+        for incident_id in incident_ids:
+            result = results.get(incident_id, {})
+            details.append(self._incident_update_detail(
+                incident_id,
+                result.get("success", False),
+                result.get("message", error_message)
+            ))
+        return details
+
+    @staticmethod
+    def _incident_update_detail(incident_id: str, success: bool, message: str) -> Dict[str, Any]:
+        """构造单个事件的更新结果"""
+        return {
+            "incident_id": incident_id,
+            "success": success,
+            "total": 1,
+            "succeededNum": 1 if success else 0,
+            "failedNum": 0 if success else 1,
+            "message": message
+        }
@@ -1,18 +1,20 @@
 import time
 import json
+import asyncio
 import requests
 from datetime import datetime, timedelta
-from typing import List, Optional, Dict
-from ..utils.sdk.aksk_py3 import Signature
+from typing import List, Optional, Dict, Tuple
+from ..utils.signature_cache import get_signature
+from ..utils.xdr_client import send_xdr_request
+
+
+# Maximum uuIds accepted by a single /incidents/dealstatus call
+DEAL_STATUS_BATCH_SIZE = 200
 
 
 class SecurityIncidentsService:
     """Service for managing security incidents via Flux XDR API"""
 
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.verify = False  # Ignore SSL certificate warnings
-
     async def test_connectivity(
         self,
         auth_code: str,
@@ -37,7 +39,7 @@ class SecurityIncidentsService:
 
         try:
             # Create signature object
-            signature = Signature(auth_code=auth_code)
+            signature = get_signature(auth_code)
 
             # Prepare request parameters
             end_timestamp = int(datetime.now().timestamp())
@@ -66,7 +68,7 @@ class SecurityIncidentsService:
 
             # Send request and measure latency
             start_time = time.time()
-            response = self.session.send(req.prepare())
+            response = await send_xdr_request(req)
             end_time = time.time()
 
             latency_ms = round((end_time - start_time) * 1000, 2)
@@ -158,7 +160,7 @@ class SecurityIncidentsService:
 
         try:
             # Create signature object
-            signature = Signature(auth_code=auth_code)
+            signature = get_signature(auth_code)
 
             # Calculate default timestamps if not provided
             if end_timestamp is None:
@@ -198,7 +200,7 @@ class SecurityIncidentsService:
             signature.signature(req)
 
             # Send request
-            response = self.session.send(req.prepare())
+            response = await send_xdr_request(req)
 
             # Check response
             if response.status_code == 200:
@@ -269,7 +271,7 @@ class SecurityIncidentsService:
 
         try:
             # Create signature object
-            signature = Signature(auth_code=auth_code)
+            signature = get_signature(auth_code)
 
             # Build GET request
             headers = {"content-type": "application/json"}
@@ -283,7 +285,7 @@ class SecurityIncidentsService:
             signature.signature(req)
 
             # Send request
-            response = self.session.send(req.prepare())
+            response = await send_xdr_request(req)
 
             # Check response
             if response.status_code == 200:
@@ -380,7 +382,7 @@ class SecurityIncidentsService:
 
         try:
             # Create signature object
-            signature = Signature(auth_code=auth_code)
+            signature = get_signature(auth_code)
 
             # Build request body
             body = {
@@ -404,7 +406,7 @@ class SecurityIncidentsService:
             signature.signature(req)
 
             # Send request
-            response = self.session.send(req.prepare())
+            response = await send_xdr_request(req)
 
             # Check response
             if response.status_code == 200:
@@ -450,6 +452,76 @@ class SecurityIncidentsService:
                     "error_type": "unknown"
                 }
 
+    async def batch_update_incident_status(
+        self,
+        auth_code: str,
+        base_url: str = None,
+        updates: List[Tuple[str, int, Optional[str]]] = None
+    ) -> Dict[str, dict]:
+        """
+        Coalesce many incident status updates into as few dealstatus calls as possible
+
+        Updates sharing the same (deal_status, deal_comment) are sent together in
+        chunks of DEAL_STATUS_BATCH_SIZE. The API only reports counts per call, so a
+        partially failed chunk is retried per uuId to attribute the failures.
+
+        Args:
+            auth_code: The authentication code
+            base_url: Base URL (default: https://10.5.41.194)
+            updates: List of (uuid, deal_status, deal_comment) tuples
+
+        Returns:
+            Dictionary mapping each uuId to {"success": bool, "message": str}
+        """
+        groups: Dict[Tuple[int, Optional[str]], List[str]] = {}
+        for uuid, deal_status, deal_comment in updates or []:
+            uuids = groups.setdefault((deal_status, deal_comment), [])
+            if uuid not in uuids:
+                uuids.append(uuid)
+
+        chunks = [
+            (uuids[i:i + DEAL_STATUS_BATCH_SIZE], deal_status, deal_comment)
+            for (deal_status, deal_comment), uuids in groups.items()
+            for i in range(0, len(uuids), DEAL_STATUS_BATCH_SIZE)
+        ]
+
+        async def update_chunk(uuids, deal_status, deal_comment) -> Dict[str, dict]:
+            result = await self.update_incident_status(
+                auth_code=auth_code,
+                base_url=base_url,
+                uuids=uuids,
+                deal_status=deal_status,
+                deal_comment=deal_comment
+            )
+            if not result.get("success"):
+                message = result.get("message", "更新失败")
+                return {uuid: {"success": False, "message": message} for uuid in uuids}
+
+            data = result.get("data") or {}
+            succeeded = data.get("succeededNum", len(uuids))
+            if succeeded >= len(uuids) or len(uuids) == 1:
+                success = succeeded >= len(uuids)
+                message = "事件状态更新成功" if success else "更新失败"
+                return {uuid: {"success": success, "message": message} for uuid in uuids}
+
+            # 部分失败: 逐个重试以确定具体失败的事件（处置状态更新是幂等的）
+            retries = await asyncio.gather(*[
+                update_chunk([uuid], deal_status, deal_comment) for uuid in uuids
+            ])
+            merged = {}
+            for retry in retries:
+                merged.update(retry)
+            return merged
+
+        chunk_results = await asyncio.gather(*[
+            update_chunk(*chunk) for chunk in chunks
+        ])
+
+        results = {}
+        for chunk_result in chunk_results:
+            results.update(chunk_result)
+        return results
+
     async def get_incident_entities_ip(
         self,
         auth_code: str,
@@ -484,7 +556,7 @@ class SecurityIncidentsService:
 
         try:
             # Create signature object
-            signature = Signature(auth_code=auth_code)
+            signature = get_signature(auth_code)
 
             # Build GET request
             headers = {"content-type": "application/json"}
@@ -498,7 +570,7 @@ class SecurityIncidentsService:
             signature.signature(req)
 
             # Send request
-            response = self.session.send(req.prepare())
+            response = await send_xdr_request(req)
 
             # Check response
             if response.status_code == 200:
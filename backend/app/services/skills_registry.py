@@ -20,6 +20,15 @@ SKILLS_REGISTRY: List[Dict[str, Any]] = [
             {"title": "智能时间解析", "description": "支持最近7天、今天等表达"},
             {"title": "多维度筛选", "description": "按严重程度、处置状态、威胁类型筛选"},
         ],
+        "parameters": [
+            {"name": "startTimestamp", "type": "integer", "description": "起始时间戳（Unix秒），近X天 = 当前时间戳 - X*86400；未指定返回null（默认近7天）"},
+            {"name": "endTimestamp", "type": "integer", "description": "结束时间戳（Unix秒），通常为当前时间戳"},
+            {"name": "severities", "type": "integer[]", "description": "严重等级（1=低危, 2=中危, 3=高危, 4=严重）"},
+            {"name": "dealStatus", "type": "integer[]", "description": "处置状态（0=未处置, 10=处置中, 30=已遏制, 40=已处置, 50=已挂起, 60=接受风险）"},
+            {"name": "name", "type": "string", "description": "事件名称（用于客户端过滤）"},
+            {"name": "pageSize", "type": "integer", "description": "每页条数（默认20，有name过滤时建议100-200）"},
+            {"name": "page", "type": "integer", "description": "页码（默认1）"},
+        ],
         "examplePrompts": [
             {"chinese": "最近7天的高危事件", "english": "High severity incidents in last 7 days"},
             {"chinese": "今天未处置的事件", "english": "Undisposed incidents today"},
@@ -42,6 +51,10 @@ SKILLS_REGISTRY: List[Dict[str, Any]] = [
             {"title": "地理位置", "description": "IP归属地和运营商信息"},
             {"title": "处置状态", "description": "网侧处置状态可视化"},
         ],
+        "parameters": [
+            {"name": "uuid", "type": "string", "description": "事件ID（incident-xxx）；\"第一个事件\"等引用从对话历史的事件列表中查找"},
+            {"name": "name", "type": "string", "description": "事件名称（没有UUID时使用，通常是引号内的文本）"},
+        ],
         "examplePrompts": [
             {"chinese": "查看事件incident-xxx的外网IP实体", "english": "Show IP entities for incident-xxx"},
             {"chinese": "第一个事件有哪些IP实体", "english": "What IP entities does incident #1 have"},
@@ -62,6 +75,10 @@ SKILLS_REGISTRY: List[Dict[str, Any]] = [
             {"title": "攻击时间线", "description": "按时间顺序展示告警和攻击阶段"},
             {"title": "详细举证", "description": "网络、端点等多维度证据"},
         ],
+        "parameters": [
+            {"name": "uuid", "type": "string", "description": "事件ID（incident-xxx）；\"第一个事件\"等引用从对话历史的事件列表中查找"},
+            {"name": "name", "type": "string", "description": "事件名称（没有UUID时使用，通常是引号内的文本）"},
+        ],
         "examplePrompts": [
             {"chinese": "查看事件incident-xxx的详细举证", "english": "Show detailed proof for incident-xxx"},
             {"chinese": "显示事件的时间线", "english": "Show the incident timeline"},
@@ -82,6 +99,12 @@ SKILLS_REGISTRY: List[Dict[str, Any]] = [
             {"title": "批量更新", "description": "一次更新多个事件状态"},
             {"title": "状态映射", "description": "自然语言状态到系统值映射"},
         ],
+        "parameters": [
+            {"name": "uuids", "type": "string[]", "description": "事件ID列表；\"第一个事件\"等引用从对话历史的事件列表中查找"},
+            {"name": "name", "type": "string", "description": "单个事件名称（没有UUID时使用）"},
+            {"name": "deal_status", "type": "integer", "description": "处置状态（已处置=40, 处置中=10, 已挂起=50, 接受风险=60, 已遏制=30, 待处置=0）"},
+            {"name": "deal_comment", "type": "string", "description": "操作备注"},
+        ],
         "examplePrompts": [
             {"chinese": "把这些事件标记为已处置", "english": "Mark these incidents as disposed"},
             {"chinese": "前5个事件标记为处置中", "english": "Mark first 5 incidents as in progress"},
@@ -103,6 +126,17 @@ SKILLS_REGISTRY: List[Dict[str, Any]] = [
             {"title": "智能封禁", "description": "先检查后封禁，避免重复操作"},
             {"title": "灵活配置", "description": "支持永久/临时、不同封禁类型"},
         ],
+        "parameters": [
+            {"name": "ip_address", "type": "string", "description": "IP地址；\"这个IP\"等指代从对话历史中取最近提及的IP"},
+            {"name": "device_name", "type": "string", "description": "设备名称（如 物联网安全网关）"},
+            {"name": "device_type", "type": "string", "description": "设备类型（AF=网侧设备, EDR=端侧设备，默认AF）"},
+            {"name": "action", "type": "string", "description": "check=仅查询状态, block=直接封禁, check_and_block=未封禁则封禁"},
+            {"name": "block_type", "type": "string", "description": "封禁类型（SRC_IP/DST_IP/URL/DNS，默认SRC_IP）"},
+            {"name": "time_type", "type": "string", "description": "forever=永久, temporary=临时（默认forever）"},
+            {"name": "time_value", "type": "integer", "description": "封禁时长数值（temporary时必填）"},
+            {"name": "time_unit", "type": "string", "description": "时间单位（d=天, h=小时, m=分钟）"},
+            {"name": "reason", "type": "string", "description": "封禁原因"},
+        ],
         "examplePrompts": [
             {"chinese": "查询100.200.1.200是否被封禁", "english": "Check if 100.200.1.200 is blocked"},
             {"chinese": "封禁1.2.3.4，封禁7天", "english": "Block 1.2.3.4 for 7 days"},
@@ -123,6 +157,18 @@ SKILLS_REGISTRY: List[Dict[str, Any]] = [
             {"title": "智能推断", "description": "从描述中推断资产类型和系统"},
             {"title": "参数验证", "description": "自动验证必填字段和格式"},
         ],
+        "parameters": [
+            {"name": "ip", "type": "string", "description": "IP地址（必填）"},
+            {"name": "assetName", "type": "string", "description": "资产名称"},
+            {"name": "type", "type": "string", "description": "操作系统（Linux/Windows/OS X/iOS/Android/Unknown）"},
+            {"name": "classify1Id", "type": "integer", "description": "一级分类（0=未知, 1=服务器, 2=终端, 5=网络设备, 6=IoT, 7=移动设备, 8=安全设备）"},
+            {"name": "classifyId", "type": "integer", "description": "详细分类（如 100012=Web服务器, 100010=数据库）"},
+            {"name": "magnitude", "type": "string", "description": "重要级别（normal/core）"},
+            {"name": "mac", "type": "string", "description": "MAC地址"},
+            {"name": "hostName", "type": "string", "description": "主机名"},
+            {"name": "tags", "type": "string[]", "description": "标签"},
+            {"name": "comment", "type": "string", "description": "备注"},
+        ],
         "examplePrompts": [
             {"chinese": "添加一个Linux服务器，IP是192.168.1.100", "english": "Add a Linux server, IP 192.168.1.100"},
             {"chinese": "注册一台Windows终端，IP 172.16.0.100", "english": "Register a Windows endpoint, IP 172.16.0.100"},
@@ -144,6 +190,17 @@ SKILLS_REGISTRY: List[Dict[str, Any]] = [
             {"title": "趋势对比", "description": "支持环比上周、上月"},
             {"title": "分布分析", "description": "按严重度、访问方向、产品类型分布"},
         ],
+        "parameters": [
+            {"name": "startTimestamp", "type": "integer", "description": "起始时间戳（Unix秒），近X天 = 当前时间戳 - X*86400"},
+            {"name": "endTimestamp", "type": "integer", "description": "结束时间戳（通常为当前时间戳）"},
+            {"name": "productTypes", "type": "string[]", "description": "产品类型（EDR/AC/NTA/STA/CWPP/SSL VPN/Logger）"},
+            {"name": "accessDirections", "type": "integer[]", "description": "访问方向（1=外对内, 2=内对外, 3=内对内）"},
+            {"name": "threatClasses", "type": "string[]", "description": "威胁一级分类（\"94\"=Web攻击, \"214\"=暴力破解, \"500\"=病毒, \"400\"=扫描, \"300\"=DDoS）"},
+            {"name": "srcIps", "type": "string[]", "description": "源IP"},
+            {"name": "dstIps", "type": "string[]", "description": "目的IP"},
+            {"name": "attackStates", "type": "integer[]", "description": "攻击状态（0=尝试, 1=失败, 2=成功, 3=失陷）"},
+            {"name": "severities", "type": "integer[]", "description": "严重等级（0=信息, 1=低危, 2=中危, 3=高危, 4=严重）"},
+        ],
         "examplePrompts": [
             {"chinese": "统计最近7天日志总量", "english": "Count logs in the last 7 days"},
             {"chinese": "分析本周日志趋势和分布", "english": "Analyze weekly log trends and distributions"},
@@ -164,6 +221,7 @@ SKILLS_REGISTRY: List[Dict[str, Any]] = [
             {"title": "自动编排", "description": "查询、分析、确认、执行四步闭环"},
             {"title": "联动处置", "description": "批量封禁威胁IP并更新事件状态"},
         ],
+        "parameters": [],
         "examplePrompts": [
             {"chinese": "执行每日高危事件闭环场景", "english": "Run daily high-risk closure scenario"},
             {"chinese": "启动自动处置高危事件", "english": "Start automatic high-risk incident response"},
@@ -204,3 +262,16 @@ def get_intent_catalog() -> List[Dict[str, str]]:
         }
         for skill in skills
     ]
+
+
+def get_intent_schema() -> List[Dict[str, Any]]:
+    """Return intent definitions with their parameters for fused intent + parameter extraction."""
+    skills = sorted(SKILLS_REGISTRY, key=lambda item: item.get("order", 999))
+    return [
+        {
+            "intent": skill["intent"],
+            "description": skill["intent_description"],
+            "parameters": skill.get("parameters", []),
+        }
+        for skill in skills
+    ]
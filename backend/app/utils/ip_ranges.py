@@ -0,0 +1,206 @@
+"""
+IP Range Index
+Maps single IPs, CIDRs and IP ranges to keys with O(log n) containment lookups
+"""
+
+import ipaddress
+from typing import Any, Dict, Hashable, List, Optional, Set, Tuple
+
+
+# (ip version, first address, last address) as integers
+IpInterval = Tuple[int, int, int]
+
+# Ranges of one IP version sorted by start: (starts, ends, keys, subtree max ends)
+RangeTree = Tuple[List[int], List[int], List[Hashable], List[int]]
+
+
+def parse_ip_interval(value: str) -> Optional[IpInterval]:
+    """
+    Parse an IP, CIDR or range into an integer interval
+
+    Supported forms: "10.0.0.1", "10.0.0.0/24", "10.0.0.1-10.0.0.50",
+    "10.0.0.1-50" (IPv4 last-octet shorthand) and their IPv6 equivalents.
+
+    Returns:
+        (version, start, end) or None if the value is not an IP expression
+    """
+    value = str(value).strip()
+    if not value:
+        return None
+
+    try:
+        if "/" in value:
+            network = ipaddress.ip_network(value, strict=False)
+            return network.version, int(network.network_address), int(network.broadcast_address)
+
+        if "-" in value:
+            start_text, end_text = [part.strip() for part in value.split("-", 1)]
+            start = ipaddress.ip_address(start_text)
+            if start.version == 4 and end_text.isdigit():
+                end_text = start_text.rsplit(".", 1)[0] + "." + end_text
+            end = ipaddress.ip_address(end_text)
+            if start.version != end.version:
+                return None
+            low, high = sorted((int(start), int(end)))
+            return start.version, low, high
+
+        address = ipaddress.ip_address(value)
+        return address.version, int(address), int(address)
+    except ValueError:
+        return None
+
+
+class IpRangeIndex:
+    """
+    Index of IP expressions (IPs, CIDRs, ranges) attached to keys
+
+    Single addresses live in a hash map. Ranges are stored once each, sorted
+    by start, as an implicit augmented interval tree (every node keeps the
+    largest end in its subtree), so memory stays linear even for deeply nested
+    CIDRs and a point query visits O(log n) nodes per matching range. The tree
+    is rebuilt lazily after ranges change. Values that are not IP expressions
+    are matched literally.
+
+    Distinct expressions are reference-counted by their parsed interval, so
+    "10.0.0.0/30" and "10.0.0.0-10.0.0.3" count once however many keys hold them.
+    """
+
+    def __init__(self):
+        self._points: Dict[Tuple[int, int], Set[Hashable]] = {}
+        self._literals: Dict[str, Set[Hashable]] = {}
+        self._ranges: Dict[Hashable, List[IpInterval]] = {}
+        self._values: Dict[Hashable, List[str]] = {}
+        # version -> interval tree over every range of that version
+        self._trees: Dict[int, RangeTree] = {}
+        self._trees_stale = False
+        # normalized expression -> number of attachments
+        self._distinct: Dict[Any, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    @property
+    def distinct_count(self) -> int:
+        """Number of distinct IP expressions across all keys"""
+        return len(self._distinct)
+
+    def add(self, key: Hashable, value: str):
+        """Attach an IP expression to a key"""
+        value = str(value).strip()
+        self._values.setdefault(key, []).append(value)
+
+        interval = parse_ip_interval(value)
+        normalized = interval if interval is not None else value
+        self._distinct[normalized] = self._distinct.get(normalized, 0) + 1
+        if interval is None:
+            self._literals.setdefault(value, set()).add(key)
+        elif interval[1] == interval[2]:
+            self._points.setdefault((interval[0], interval[1]), set()).add(key)
+        else:
+            self._ranges.setdefault(key, []).append(interval)
+            self._trees_stale = True
+
+    def remove(self, key: Hashable):
+        """Detach every IP expression of a key"""
+        for value in self._values.pop(key, []):
+            interval = parse_ip_interval(value)
+            normalized = interval if interval is not None else value
+            remaining = self._distinct.get(normalized, 0) - 1
+            if remaining > 0:
+                self._distinct[normalized] = remaining
+            else:
+                self._distinct.pop(normalized, None)
+
+            if interval is None:
+                self._discard(self._literals, value, key)
+            elif interval[1] == interval[2]:
+                self._discard(self._points, (interval[0], interval[1]), key)
+
+        if self._ranges.pop(key, None) is not None:
+            self._trees_stale = True
+
+    def lookup(self, ip_address: str) -> Set[Hashable]:
+        """Return the keys whose IP expressions contain the given address"""
+        ip_address = str(ip_address).strip()
+        keys = set(self._literals.get(ip_address, ()))
+
+        interval = parse_ip_interval(ip_address)
+        if interval is None or interval[1] != interval[2]:
+            return keys
+
+        version, point = interval[0], interval[1]
+        keys.update(self._points.get((version, point), ()))
+
+        if self._trees_stale:
+            self._rebuild_trees()
+        tree = self._trees.get(version)
+        if tree:
+            keys.update(self._stab(tree, point))
+
+        return keys
+
+    def lookup_many(self, ip_addresses: List[str]) -> Dict[str, Set[Hashable]]:
+        """Return the covering keys for each address"""
+        return {ip_address: self.lookup(ip_address) for ip_address in ip_addresses}
+
+    def _rebuild_trees(self):
+        """Sort every range by start and compute subtree max ends, per IP version"""
+        entries: Dict[int, List[Tuple[int, int, Hashable]]] = {}
+        for key, intervals in self._ranges.items():
+            for version, start, end in intervals:
+                entries.setdefault(version, []).append((start, end, key))
+
+        trees = {}
+        for version, version_entries in entries.items():
+            version_entries.sort(key=lambda entry: (entry[0], entry[1]))
+            starts = [entry[0] for entry in version_entries]
+            ends = [entry[1] for entry in version_entries]
+            keys = [entry[2] for entry in version_entries]
+            max_ends = list(ends)
+            self._fill_max_ends(max_ends, 0, len(max_ends))
+            trees[version] = (starts, ends, keys, max_ends)
+
+        self._trees = trees
+        self._trees_stale = False
+
+    @classmethod
+    def _fill_max_ends(cls, max_ends: List[int], low: int, high: int) -> int:
+        """Store at each implicit node (the middle of [low, high)) the largest end in its subtree"""
+        if low >= high:
+            return -1
+        middle = (low + high) // 2
+        max_ends[middle] = max(
+            max_ends[middle],
+            cls._fill_max_ends(max_ends, low, middle),
+            cls._fill_max_ends(max_ends, middle + 1, high)
+        )
+        return max_ends[middle]
+
+    @staticmethod
+    def _stab(tree: RangeTree, point: int) -> Set[Hashable]:
+        """Keys of every range containing the point"""
+        starts, ends, keys, max_ends = tree
+        found: Set[Hashable] = set()
+        pending = [(0, len(starts))]
+        while pending:
+            low, high = pending.pop()
+            if low >= high:
+                continue
+            middle = (low + high) // 2
+            if max_ends[middle] < point:
+                continue  # nothing in this subtree reaches the point
+            pending.append((low, middle))
+            if starts[middle] <= point:
+                if ends[middle] >= point:
+                    found.add(keys[middle])
+                # Ranges to the right start no earlier than this one
+                pending.append((middle + 1, high))
+        return found
+
+    @staticmethod
+    def _discard(mapping: Dict[Any, Set[Hashable]], value: Any, key: Hashable):
+        keys = mapping.get(value)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del mapping[value]
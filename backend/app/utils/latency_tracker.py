@@ -0,0 +1,131 @@
+"""
+XDR Latency Tracker
+Passively records the latency and outcome of every XDR call per appliance and endpoint
+"""
+
+import re
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+
+# Rolling window per endpoint
+LATENCY_WINDOW_SIZE = 512  # most recent samples kept
+LATENCY_WINDOW_SECONDS = 300.0  # samples older than this are ignored
+
+# Registry bounds
+LATENCY_MAX_ENDPOINTS = 1024
+
+# Path segments that identify a resource rather than an endpoint
+_ID_SEGMENT = re.compile(
+    r"^(?:[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}"
+    r"|incident-[0-9a-fA-F-]+|alert-[0-9a-fA-F-]+|\d+)$"
+)
+
+# (recorded_at, latency in ms, succeeded)
+LatencySample = Tuple[float, float, bool]
+
+
+def endpoint_key(url: str) -> Tuple[str, str]:
+    """
+    Split a request URL into (appliance origin, endpoint template)
+
+    Resource IDs in the path are replaced with {id}, so
+    /api/xdr/v1/incidents/<uuid>/proof is tracked as one endpoint.
+    """
+    parsed = urlparse(url)
+    origin = f"{parsed.scheme}://{parsed.netloc}".lower() if parsed.netloc else url.rstrip('/')
+    segments = ["{id}" if _ID_SEGMENT.match(segment) else segment for segment in parsed.path.split('/')]
+    return origin, '/'.join(segments) or '/'
+
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+    rank = max(1, int(-(-fraction * len(ordered) // 1)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def _summarize(samples: List[LatencySample]) -> Dict[str, Any]:
+    latencies = sorted(latency for _, latency, _ in samples)
+    failures = sum(1 for _, _, succeeded in samples if not succeeded)
+    return {
+        "count": len(samples),
+        "p50": round(_percentile(latencies, 0.50), 2),
+        "p95": round(_percentile(latencies, 0.95), 2),
+        "p99": round(_percentile(latencies, 0.99), 2),
+        "errorRate": round(failures / len(samples) * 100, 1)
+    }
+
+
+class LatencyTracker:
+    """
+    Rolling latency samples per (appliance, endpoint)
+
+    Recording is O(1) under a lock; percentiles are computed on read over the
+    last LATENCY_WINDOW_SIZE samples younger than LATENCY_WINDOW_SECONDS.
+    """
+
+    def __init__(
+        self,
+        window_size: int = LATENCY_WINDOW_SIZE,
+        window_seconds: float = LATENCY_WINDOW_SECONDS,
+        max_endpoints: int = LATENCY_MAX_ENDPOINTS
+    ):
+        self.window_size = window_size
+        self.window_seconds = window_seconds
+        self.max_endpoints = max_endpoints
+        self._samples: Dict[Tuple[str, str], Deque[LatencySample]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, url: str, latency_ms: float, succeeded: bool = True):
+        """Record one completed (or failed) call"""
+        key = endpoint_key(url)
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None:
+                if len(self._samples) >= self.max_endpoints:
+                    # Drop the endpoint that was called least recently
+                    oldest = min(self._samples, key=lambda existing: self._samples[existing][-1][0])
+                    del self._samples[oldest]
+                samples = deque(maxlen=self.window_size)
+                self._samples[key] = samples
+            samples.append((time.monotonic(), latency_ms, succeeded))
+
+    def summary(self, base_url: str) -> Optional[Dict[str, Any]]:
+        """
+        Latency percentiles of one appliance
+
+        Args:
+            base_url: Any URL on the appliance
+
+        Returns:
+            {"count", "p50", "p95", "p99", "errorRate", "endpoints": {path: {...}}}
+            (latencies in ms), or None if no call was recorded in the window
+        """
+        origin = endpoint_key(base_url)[0]
+        cutoff = time.monotonic() - self.window_seconds
+        with self._lock:
+            recent = {
+                path: [sample for sample in samples if sample[0] >= cutoff]
+                for (sample_origin, path), samples in self._samples.items()
+                if sample_origin == origin
+            }
+
+        endpoints = {path: _summarize(samples) for path, samples in recent.items() if samples}
+        if not endpoints:
+            return None
+
+        overall = _summarize([sample for samples in recent.values() for sample in samples])
+        overall["endpoints"] = endpoints
+        return overall
+
+    def clear(self):
+        """Drop every sample"""
+        with self._lock:
+            self._samples.clear()
+
+
+# 全局延迟统计实例
+latency_tracker = LatencyTracker()
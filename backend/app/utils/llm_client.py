@@ -0,0 +1,72 @@
+"""
+Shared LLM HTTP Client
+Pools keep-alive connections per LLM provider endpoint so chat turns reuse warm TCP/TLS sessions
+"""
+
+import threading
+from typing import Dict, Tuple
+
+import httpx
+
+from .xdr_client import HTTP2_AVAILABLE, _origin
+
+
+# Connection pool limits per provider endpoint
+LLM_MAX_CONNECTIONS = 20
+LLM_MAX_KEEPALIVE_CONNECTIONS = 10
+LLM_KEEPALIVE_EXPIRY = 60.0  # chat turns are seconds apart; keep sessions warm between them
+
+# Default timeouts (seconds); callers override the read timeout per request
+LLM_CONNECT_TIMEOUT = 10.0
+LLM_READ_TIMEOUT = 60.0
+
+
+class LLMClientPool:
+    """Registry of pooled HTTP clients, one per (provider, base URL origin)"""
+
+    def __init__(
+        self,
+        max_connections: int = LLM_MAX_CONNECTIONS,
+        max_keepalive_connections: int = LLM_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry: float = LLM_KEEPALIVE_EXPIRY,
+        http2: bool = HTTP2_AVAILABLE
+    ):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.timeout = httpx.Timeout(LLM_READ_TIMEOUT, connect=LLM_CONNECT_TIMEOUT)
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self._clients: Dict[Tuple[str, str], httpx.AsyncClient] = {}
+        self._lock = threading.Lock()
+
+    def get_client(self, provider: str, base_url: str) -> httpx.AsyncClient:
+        """Return the shared client for a provider endpoint, creating it on first use"""
+        key = (provider, _origin(base_url))
+        client = self._clients.get(key)
+        if client is None or client.is_closed:
+            with self._lock:
+                client = self._clients.get(key)
+                if client is None or client.is_closed:
+                    client = httpx.AsyncClient(
+                        verify=False,  # self-hosted OpenAI-compatible gateways often use private certificates
+                        limits=self.limits,
+                        timeout=self.timeout,
+                        http2=self.http2
+                    )
+                    self._clients[key] = client
+        return client
+
+    async def aclose(self):
+        """Close every pooled client (called on application shutdown)"""
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+
+        for client in clients:
+            await client.aclose()
+
+
+# 全局大模型客户端池实例
+llm_client_pool = LLMClientPool()
@@ -0,0 +1,124 @@
+"""
+Result Cache
+Async TTL cache with stale-while-revalidate and single-flight loading for expensive aggregate results
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+# Cache bounds
+RESULT_CACHE_MAX_SIZE = 256
+
+Loader = Callable[[], Awaitable[Any]]
+
+logger = logging.getLogger(__name__)
+
+
+class ResultCache:
+    """
+    Cache of coroutine results keyed by caller-defined keys
+
+    - Fresh entries (younger than ttl) are returned directly.
+    - Stale entries (younger than ttl + stale_ttl) are returned immediately
+      while one background task reloads them.
+    - On a miss, concurrent callers for the same key share a single load.
+
+    Load failures are never cached; a failed background reload keeps the
+    stale value until it expires.
+    """
+
+    def __init__(self, max_size: int = RESULT_CACHE_MAX_SIZE):
+        self.max_size = max_size
+        # key -> (loaded_at, ttl, stale_ttl, value)
+        self._entries: "OrderedDict[Hashable, Tuple[float, float, float, Any]]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    async def get_or_load(
+        self,
+        key: Hashable,
+        loader: Loader,
+        ttl: float,
+        stale_ttl: float = 0.0
+    ) -> Any:
+        """
+        Return the cached value for a key, loading it if needed
+
+        Args:
+            key: Cache key (include everything the result depends on)
+            loader: Zero-argument coroutine function producing the value
+            ttl: Seconds a value is served without reloading
+            stale_ttl: Extra seconds a value may be served while it reloads in the background
+
+        Returns:
+            The cached or freshly loaded value
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            loaded_at, entry_ttl, entry_stale_ttl, value = entry
+            age = time.monotonic() - loaded_at
+            if age < entry_ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            if age < entry_ttl + entry_stale_ttl:
+                self._entries.move_to_end(key)
+                self.stale_hits += 1
+                self._load(key, loader, ttl, stale_ttl)
+                return value
+            del self._entries[key]
+
+        self.misses += 1
+        # Shield so a cancelled caller (e.g. a closed browser tab) doesn't abort the shared load
+        return await asyncio.shield(self._load(key, loader, ttl, stale_ttl))
+
+    def invalidate(self, key: Hashable):
+        """Drop the cached value for a key"""
+        self._entries.pop(key, None)
+
+    def clear(self):
+        """Drop every cached value"""
+        self._entries.clear()
+
+    async def aclose(self):
+        """Cancel in-flight loads and drop every value (called on application shutdown)"""
+        tasks = list(self._inflight.values())
+        self._inflight.clear()
+        self._entries.clear()
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+
+    def _load(self, key: Hashable, loader: Loader, ttl: float, stale_ttl: float) -> asyncio.Task:
+        """Start a load for a key unless one is already running (single-flight)"""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.get_running_loop().create_task(self._run_loader(key, loader, ttl, stale_ttl))
+            # Background reloads have no awaiter; retrieve their failure so it isn't reported as unhandled
+            task.add_done_callback(lambda done: done.cancelled() or done.exception())
+            self._inflight[key] = task
+        return task
+
+    async def _run_loader(self, key: Hashable, loader: Loader, ttl: float, stale_ttl: float) -> Any:
+        try:
+            value = await loader()
+            self._entries[key] = (time.monotonic(), ttl, stale_ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+            return value
+        except Exception as e:
+            logger.warning("Result cache load failed: %s", e)
+            raise
+        finally:
+            self._inflight.pop(key, None)
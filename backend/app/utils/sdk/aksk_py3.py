@@ -3,8 +3,8 @@ import binascii
 import hashlib
 import hmac
 import json
-import struct
 import urllib.parse
+from collections import Counter
 from datetime import datetime
 from Crypto.Cipher import AES  # 引用pycryptodome库
 from urllib.parse import urlparse
@@ -24,6 +24,9 @@ AUTH_CODE_PARAMS = "%s+%s+%s+%s+%s+%s+%s+%s"
 AUTH_INFO_MAP_SIZE = 4
 MAP_STRING_SIZE = 2
 AUTH_CODE_PARAMS_NUM = 14
+SPACE_BYTE = 0x20
+# payload 只允许 ASCII 字节(0..127), 计数排序按此顺序输出
+ASCII_BYTE_ORDER = range(0x80)
 
 
 class Signature(object):
@@ -155,25 +158,19 @@ class Signature(object):
 
     def __payload_transform(self, payload):
         payload = payload.encode("utf-8")
-
-        byte_values = [struct.unpack('b', bytes([byte]))[0] for byte in payload]
-        byte_values.sort()
-        new_payload = bytearray()
-        for byte_value in byte_values:
-            new_payload.append(byte_value)
-        new_payload = self.__remove_spaces(new_payload)
+        if not payload.isascii():
+            # 与原逐字节实现一致: 非ASCII字节按有符号值为负, 无法写回 bytearray
+            raise ValueError("byte must be in range(0, 256)")
+
+        # 计数排序: 按字节值升序重排并去掉空格, 结果与逐字节排序一致
+        counts = Counter(payload)
+        new_payload = b"".join(
+            bytes((value,)) * counts[value]
+            for value in ASCII_BYTE_ORDER
+            if value in counts and value != SPACE_BYTE
+        )
         return self.__sha256_hex_upper(new_payload)
 
-    @staticmethod
-    def __remove_spaces(b):
-        j = 0
-        for i in range(len(b)):
-            if b[i] != 32:
-                if i != j:
-                    b[j] = b[i]
-                j += 1
-        return b[:j]
-
     @staticmethod
     def __hmac_sha256_hex(secret_key, data):
         mac = hmac.new(secret_key.encode('utf-8'), data.encode('utf-8'), hashlib.sha256)
@@ -0,0 +1,87 @@
+"""
+Signature Cache
+Keeps decoded AK/SK signers per auth code so the AES decode runs once, not on every XDR call
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Tuple
+
+from .sdk.aksk_py3 import Signature
+
+
+# Cache bounds
+SIGNATURE_CACHE_MAX_SIZE = 128
+SIGNATURE_CACHE_TTL = 3600.0  # seconds
+
+
+def fingerprint_auth_code(auth_code: str) -> str:
+    """Hash the auth code so the raw secret is never used as a dict key"""
+    return hashlib.sha256(auth_code.encode("utf-8")).hexdigest()
+
+
+class SignatureCache:
+    """Thread-safe LRU cache of decoded Signature objects with a TTL"""
+
+    def __init__(self, max_size: int = SIGNATURE_CACHE_MAX_SIZE, ttl: float = SIGNATURE_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, Signature]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, auth_code: str) -> Signature:
+        """
+        Return the signer for an auth code, decoding it on a miss
+
+        Args:
+            auth_code: Flux authentication code
+
+        Returns:
+            Signature ready to sign requests
+
+        Raises:
+            Exception: If the auth code cannot be decoded (failures are not cached)
+        """
+        key = fingerprint_auth_code(auth_code)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                created_at, signature = entry
+                if now - created_at < self.ttl:
+                    self._entries.move_to_end(key)
+                    return signature
+                del self._entries[key]
+
+        # Decode outside the lock; concurrent misses for the same code just decode twice
+        signature = Signature(auth_code=auth_code)
+
+        with self._lock:
+            self._entries[key] = (now, signature)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+        return signature
+
+    def invalidate(self, auth_code: str):
+        """Drop the cached signer for an auth code"""
+        with self._lock:
+            self._entries.pop(fingerprint_auth_code(auth_code), None)
+
+    def clear(self):
+        """Drop every cached signer"""
+        with self._lock:
+            self._entries.clear()
+
+
+# 全局签名缓存实例
+signature_cache = SignatureCache()
+
+
+def get_signature(auth_code: str) -> Signature:
+    """Return a cached Signature for the given auth code"""
+    return signature_cache.get(auth_code)
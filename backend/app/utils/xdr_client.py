@@ -0,0 +1,148 @@
+"""
+Shared XDR HTTP Client
+Pools keep-alive connections per Flux appliance so services reuse TCP/TLS sessions
+"""
+
+import asyncio
+import threading
+import time
+from typing import Dict, Optional, Union
+from urllib.parse import urlparse
+
+import httpx
+import requests
+
+from .latency_tracker import latency_tracker
+
+try:
+    import h2  # noqa: F401  # optional, enables HTTP/2 negotiation via ALPN
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+# Connection pool limits per appliance
+XDR_MAX_CONNECTIONS = 20
+XDR_MAX_KEEPALIVE_CONNECTIONS = 10
+XDR_KEEPALIVE_EXPIRY = 30.0
+
+# Maximum in-flight requests per appliance, shared by every fan-out
+XDR_MAX_CONCURRENT_REQUESTS = 20
+
+# Default timeouts (seconds)
+XDR_CONNECT_TIMEOUT = 10.0
+XDR_READ_TIMEOUT = 30.0
+
+
+def _origin(url: str) -> str:
+    """Normalize a URL to scheme://host[:port] so every path on one appliance shares a pool"""
+    parsed = urlparse(url)
+    if not parsed.scheme or not parsed.netloc:
+        return url.rstrip('/')
+    return f"{parsed.scheme}://{parsed.netloc}".lower()
+
+
+class XdrClientPool:
+    """Registry of pooled HTTP clients, one per Flux appliance (base URL)"""
+
+    def __init__(
+        self,
+        max_connections: int = XDR_MAX_CONNECTIONS,
+        max_keepalive_connections: int = XDR_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry: float = XDR_KEEPALIVE_EXPIRY,
+        http2: bool = HTTP2_AVAILABLE,
+        max_concurrent_requests: int = XDR_MAX_CONCURRENT_REQUESTS
+    ):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.timeout = httpx.Timeout(XDR_READ_TIMEOUT, connect=XDR_CONNECT_TIMEOUT)
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self.max_concurrent_requests = max_concurrent_requests
+        self._async_clients: Dict[str, httpx.AsyncClient] = {}
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._lock = threading.Lock()
+
+    def get_async_client(self, base_url: str) -> httpx.AsyncClient:
+        """Return the shared async client for an appliance, creating it on first use"""
+        key = _origin(base_url)
+        client = self._async_clients.get(key)
+        if client is None or client.is_closed:
+            with self._lock:
+                client = self._async_clients.get(key)
+                if client is None or client.is_closed:
+                    client = httpx.AsyncClient(
+                        verify=False,  # XDR appliances commonly use self-signed certificates
+                        limits=self.limits,
+                        timeout=self.timeout,
+                        http2=self.http2
+                    )
+                    self._async_clients[key] = client
+        return client
+
+    def get_semaphore(self, base_url: str) -> asyncio.Semaphore:
+        """Return the concurrency limiter for an appliance so parallel fan-outs don't overload it"""
+        key = _origin(base_url)
+        semaphore = self._semaphores.get(key)
+        if semaphore is None:
+            with self._lock:
+                semaphore = self._semaphores.setdefault(
+                    key, asyncio.Semaphore(self.max_concurrent_requests)
+                )
+        return semaphore
+
+    async def aclose(self):
+        """Close every pooled client (called on application shutdown)"""
+        with self._lock:
+            clients = list(self._async_clients.values())
+            self._async_clients.clear()
+            self._semaphores.clear()
+
+        for client in clients:
+            await client.aclose()
+
+
+# 全局客户端池实例
+xdr_client_pool = XdrClientPool()
+
+
+async def send_xdr_request(
+    req: requests.Request,
+    timeout: Optional[Union[float, httpx.Timeout]] = None
+) -> httpx.Response:
+    """
+    Send a signed request through the shared pool for its appliance
+
+    Requests to the same appliance are capped at XDR_MAX_CONCURRENT_REQUESTS in flight;
+    callers can fan out with asyncio.gather freely. Every call's latency (excluding
+    time queued for the semaphore) and outcome is recorded in latency_tracker.
+
+    Args:
+        req: Request already signed by Signature.signature()
+        timeout: Optional per-request timeout override
+
+    Returns:
+        httpx.Response
+    """
+    # Preparing keeps the signed headers and body byte-identical to what was signed
+    prepared = req.prepare()
+    client = xdr_client_pool.get_async_client(prepared.url)
+    kwargs = {"timeout": timeout} if timeout is not None else {}
+    async with xdr_client_pool.get_semaphore(prepared.url):
+        started = time.perf_counter()
+        try:
+            response = await client.request(
+                prepared.method,
+                prepared.url,
+                headers=dict(prepared.headers),
+                content=prepared.body,
+                **kwargs
+            )
+        except httpx.HTTPError:
+            latency_tracker.record(prepared.url, (time.perf_counter() - started) * 1000, succeeded=False)
+            raise
+        latency_tracker.record(prepared.url, (time.perf_counter() - started) * 1000, succeeded=response.status_code < 400)
+        return response
+
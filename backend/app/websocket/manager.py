@@ -1,5 +1,6 @@
+import asyncio
 from fastapi import WebSocket
-from typing import Dict
+from typing import Dict, Set
 
 
 class ConnectionManager:
@@ -7,6 +8,7 @@ class ConnectionManager:
 
     def __init__(self):
         self.active_connections: Dict[str, WebSocket] = {}
+        self.topics: Dict[str, Set[WebSocket]] = {}
 
     async def connect(self, task_id: str, websocket: WebSocket):
         """接受新的 WebSocket 连接"""
@@ -28,6 +30,33 @@ class ConnectionManager:
         for connection in self.active_connections.values():
             await connection.send_json(message)
 
+    def subscribe(self, topic: str, websocket: WebSocket):
+        """订阅主题 (连接需已 accept)"""
+        self.topics.setdefault(topic, set()).add(websocket)
+
+    def unsubscribe(self, topic: str, websocket: WebSocket):
+        """取消订阅主题"""
+        subscribers = self.topics.get(topic)
+        if subscribers is not None:
+            subscribers.discard(websocket)
+            if not subscribers:
+                del self.topics[topic]
+
+    def subscriber_count(self, topic: str) -> int:
+        """主题的订阅者数量"""
+        return len(self.topics.get(topic, ()))
+
+    async def publish(self, topic: str, message: dict):
+        """向主题的所有订阅者推送消息, 发送失败的连接会被移除"""
+        subscribers = list(self.topics.get(topic, ()))
+        results = await asyncio.gather(
+            *[websocket.send_json(message) for websocket in subscribers],
+            return_exceptions=True
+        )
+        for websocket, result in zip(subscribers, results):
+            if isinstance(result, Exception):
+                self.unsubscribe(topic, websocket)
+
 
 # 全局连接管理器实例
 manager = ConnectionManager()
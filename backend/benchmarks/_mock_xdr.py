@@ -0,0 +1,62 @@
+"""
+Mock XDR Appliance for Benchmarks
+Routes every XDR call to an in-process httpx.MockTransport with a fixed response latency
+"""
+
+import asyncio
+import os
+import sys
+import time
+from typing import Awaitable, Callable, Dict
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils import xdr_client  # noqa: E402
+from app.utils.sdk.aksk_py3 import Signature  # noqa: E402
+from app.utils.signature_cache import fingerprint_auth_code, signature_cache  # noqa: E402
+
+
+BASE_URL = "https://xdr.bench"
+AUTH_CODE = "benchmark-auth-code"
+
+Handler = Callable[[httpx.Request], Dict]
+
+
+def install_mock_xdr(respond: Handler, latency: float) -> Dict[str, int]:
+    """
+    Point the shared XDR pool at a mock appliance
+
+    Args:
+        respond: Builds the JSON body for a request
+        latency: Seconds the mock waits before answering each request
+
+    Returns:
+        Live counters ({"requests": n}) updated as calls complete
+    """
+    counters = {"requests": 0}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(latency)
+        counters["requests"] += 1
+        return httpx.Response(200, json=respond(request))
+
+    pool = xdr_client.XdrClientPool()
+    pool._async_clients[xdr_client._origin(BASE_URL)] = httpx.AsyncClient(
+        transport=httpx.MockTransport(handler), limits=pool.limits
+    )
+    xdr_client.xdr_client_pool = pool
+
+    # Seed the signer cache so AUTH_CODE resolves without a real encoded auth code
+    signature_cache._entries[fingerprint_auth_code(AUTH_CODE)] = (
+        time.monotonic(), Signature(ak="bench-ak", sk="bench-sk")
+    )
+    return counters
+
+
+async def timed(coroutine: Awaitable) -> float:
+    """Wall time of one awaited call, in seconds"""
+    started = time.perf_counter()
+    await coroutine
+    return time.perf_counter() - started
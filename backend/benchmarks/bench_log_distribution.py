@@ -0,0 +1,52 @@
+"""
+Log Distribution Benchmark
+The 13 severity/direction/product slices of _get_distribution against a mock appliance
+
+Usage: python benchmarks/bench_log_distribution.py [latency_seconds]
+"""
+
+import asyncio
+import sys
+import time
+
+from _mock_xdr import AUTH_CODE, BASE_URL, install_mock_xdr, timed
+from app.services.log_count_cache import log_count_cache
+from app.services.network_logs_service import NetworkLogsService
+
+
+def _respond(request):
+    return {"code": "Success", "data": {"total": 42}}
+
+
+async def _sequential(service: NetworkLogsService, params: dict):
+    """Reference: the slices fetched one after another"""
+    for field, values in [
+        ("severities", [0, 1, 2, 3, 4]),
+        ("accessDirections", [1, 2, 3]),
+        ("productTypes", ["STA", "EDR", "AC", "CWPP", "SSL VPN"]),
+    ]:
+        for value in values:
+            await service._fetch_count(AUTH_CODE, BASE_URL, {**params, field: [value]})
+
+
+async def main(latency: float):
+    counters = install_mock_xdr(_respond, latency)
+    service = NetworkLogsService()
+    now = int(time.time())
+    # An open window (ending now) is never served from the closed-day cache
+    params = {"startTimestamp": now - 3600, "endTimestamp": now}
+
+    print(f"mock latency {latency * 1000:.0f}ms")
+    for label, run in [
+        ("single _fetch_count", lambda: service._fetch_count(AUTH_CODE, BASE_URL, params)),
+        ("sequential slices", lambda: _sequential(service, params)),
+        ("_get_distribution", lambda: service._get_distribution(AUTH_CODE, BASE_URL, params)),
+    ]:
+        log_count_cache.clear()
+        counters["requests"] = 0
+        elapsed = await timed(run())
+        print(f"  {label:<22} {elapsed:6.2f}s  {counters['requests']} XDR calls")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(float(sys.argv[1]) if len(sys.argv) > 1 else 0.2))
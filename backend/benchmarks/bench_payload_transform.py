@@ -0,0 +1,62 @@
+"""
+Payload Transform Benchmark
+Signature.__payload_transform (counting sort) vs the original per-byte sort, 1KB-1MB payloads
+
+Usage: python benchmarks/bench_payload_transform.py
+"""
+
+import hashlib
+import json
+import os
+import struct
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.sdk.aksk_py3 import Signature  # noqa: E402
+
+
+SIZES = [1024, 10 * 1024, 100 * 1024, 1024 * 1024]
+
+
+def _legacy_transform(payload: str) -> str:
+    """The original implementation"""
+    byte_values = [struct.unpack('b', bytes([byte]))[0] for byte in payload.encode("utf-8")]
+    byte_values.sort()
+    new_payload = bytearray()
+    for byte_value in byte_values:
+        new_payload.append(byte_value)
+    j = 0
+    for i in range(len(new_payload)):
+        if new_payload[i] != 32:
+            if i != j:
+                new_payload[j] = new_payload[i]
+            j += 1
+    return hashlib.sha256(new_payload[:j]).hexdigest().upper()
+
+
+def _payload(size: int) -> str:
+    """A dealstatus-style JSON body of roughly the given size"""
+    uuids = []
+    body = ""
+    while len(body) < size:
+        uuids.append(f"incident-{len(uuids):08d}-0000-0000-0000-000000000000")
+        body = json.dumps({"uuIds": uuids, "dealStatus": 40, "dealComment": "batch"})
+    return body[:size]
+
+
+def main():
+    transform = Signature(ak="bench-ak", sk="bench-sk")._Signature__payload_transform
+    print(f"{'size':>8}  {'legacy':>10}  {'counting':>10}  speedup")
+    for size in SIZES:
+        payload = _payload(size)
+        assert transform(payload) == _legacy_transform(payload)
+        number = max(1, 1024 * 1024 // size // 4)
+        legacy = min(timeit.repeat(lambda: _legacy_transform(payload), number=number, repeat=3)) / number
+        counting = min(timeit.repeat(lambda: transform(payload), number=number, repeat=3)) / number
+        print(f"{size // 1024:>6}KB  {legacy * 1000:>8.2f}ms  {counting * 1000:>8.3f}ms  {legacy / counting:6.0f}x")
+
+
+if __name__ == "__main__":
+    main()
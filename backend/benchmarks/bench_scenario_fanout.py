@@ -0,0 +1,57 @@
+"""
+Scenario Fan-out Benchmark
+Top-10 incident analysis (proof + IP entities per incident) against a mock appliance
+
+Usage: python benchmarks/bench_scenario_fanout.py [latency_seconds]
+"""
+
+import asyncio
+import sys
+
+import httpx
+
+from _mock_xdr import AUTH_CODE, BASE_URL, install_mock_xdr, timed
+from app.services.scenario_orchestration_service import ScenarioOrchestrationService
+
+
+TOP_INCIDENTS = 10
+
+
+def _respond(request: httpx.Request):
+    path = request.url.path
+    if path.endswith("/proof"):
+        return {"code": "Success", "data": {"name": path.split("/")[-2], "incidentTimeLines": []}}
+    if path.endswith("/entities/ip"):
+        return {"code": "Success", "data": {"item": [
+            {"ip": "8.8.8.8", "threatLevel": 3, "ndrDealStatusInfo": {"status": ""}}
+        ]}}
+    return {"code": "Success", "data": {}}
+
+
+async def _sequential(service: ScenarioOrchestrationService, incidents):
+    """Reference: each incident's two lookups awaited one after another"""
+    for incident in incidents:
+        await service.incidents_service.get_incident_proof(AUTH_CODE, BASE_URL, incident["uuId"])
+        await service.incidents_service.get_incident_entities_ip(AUTH_CODE, BASE_URL, incident["uuId"])
+
+
+async def main(latency: float):
+    counters = install_mock_xdr(_respond, latency)
+    service = ScenarioOrchestrationService()
+    incidents = [
+        {"uuId": f"incident-{index:08d}-0000-0000-0000-000000000000", "name": f"incident {index}", "severity": 4}
+        for index in range(TOP_INCIDENTS)
+    ]
+
+    print(f"mock latency {latency * 1000:.0f}ms, {TOP_INCIDENTS} incidents")
+    for label, run in [
+        ("sequential", lambda: _sequential(service, incidents)),
+        ("_step2_analyze_top_incidents", lambda: service._step2_analyze_top_incidents(AUTH_CODE, BASE_URL, incidents)),
+    ]:
+        counters["requests"] = 0
+        elapsed = await timed(run())
+        print(f"  {label:<30} {elapsed:6.2f}s  {counters['requests']} XDR calls  ~{elapsed / latency:.1f} round trips")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(float(sys.argv[1]) if len(sys.argv) > 1 else 0.2))
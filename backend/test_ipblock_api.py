@@ -5,6 +5,7 @@
 """
 
 import sys
+import asyncio
 sys.path.append('/Users/hexing/Flux/backend')
 
 from app.services.ipblock_service import IpBlockService
@@ -57,7 +58,7 @@ print(f"原因: {test_params['reason']}")
 
 print("\n[执行封禁]")
 
-result = service.block_ip(
+result = asyncio.run(service.block_ip(
     ip_address=test_params["ip_address"],
     device_id=test_params["device_id"],
     device_name=test_params["device_name"],
@@ -68,7 +69,7 @@ result = service.block_ip(
     time_value=None,
     time_unit=test_params["time_unit"],
     reason=test_params["reason"]
-)
+))
 
 print("\n" + "=" * 80)
 print("封禁结果")
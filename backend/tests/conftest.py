@@ -0,0 +1,49 @@
+"""
+Shared fixtures: run backend tests against an in-process mock XDR appliance
+"""
+
+import os
+import sys
+import time
+
+import httpx
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils import xdr_client  # noqa: E402
+from app.utils.sdk.aksk_py3 import Signature  # noqa: E402
+from app.utils.signature_cache import fingerprint_auth_code, signature_cache  # noqa: E402
+
+
+XDR_BASE_URL = "https://xdr.test"
+
+
+@pytest.fixture
+def mock_xdr(monkeypatch):
+    """
+    Route every XDR call to a fresh client pool backed by httpx.MockTransport
+
+    Returns a function taking the (sync or async) request handler; the
+    installed pool is returned so tests can inspect it.
+    """
+    pool = xdr_client.XdrClientPool()
+    monkeypatch.setattr(xdr_client, "xdr_client_pool", pool)
+
+    def install(handler):
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler), limits=pool.limits)
+        pool._async_clients[xdr_client._origin(XDR_BASE_URL)] = client
+        return pool
+
+    return install
+
+
+@pytest.fixture
+def auth_code(monkeypatch):
+    """An auth code whose signer is pre-seeded in the signature cache"""
+    code = "test-auth-code"
+    monkeypatch.setitem(
+        signature_cache._entries, fingerprint_auth_code(code),
+        (time.monotonic(), Signature(ak="test-ak", sk="test-sk"))
+    )
+    return code
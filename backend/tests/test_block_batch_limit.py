@@ -0,0 +1,35 @@
+"""
+/ipblock/block-batch rejects oversized IP lists before any XDR write
+"""
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.ipblock_service import IpBlockService
+from conftest import XDR_BASE_URL
+
+
+def _request(ip_count: int):
+    return {
+        "ips": [f"10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}" for i in range(ip_count)],
+        "device_id": 57,
+        "device_name": "物联网安全网关",
+        "ak": "test-ak",
+        "sk": "test-sk",
+        "flux_base_url": XDR_BASE_URL,
+    }
+
+
+def test_oversized_batch_is_rejected_with_422(mock_xdr):
+    writes = []
+
+    def handler(request):
+        writes.append(request)
+        raise AssertionError("no XDR call expected")
+
+    mock_xdr(handler)
+    client = TestClient(app)
+    response = client.post("/api/v1/ipblock/block-batch", json=_request(IpBlockService.BLOCK_IPS_MAX_PER_REQUEST + 1))
+
+    assert response.status_code == 422
+    assert writes == []
@@ -0,0 +1,133 @@
+"""
+Block rule index: every rule page, regardless of rule age
+"""
+
+import asyncio
+import json
+import time
+
+import httpx
+
+from app.services import block_rule_index, ipblock_service
+from app.services.block_rule_index import BlockRuleIndex, BlockRuleIndexRegistry
+from app.services.ipblock_service import IpBlockService
+from conftest import XDR_BASE_URL
+
+
+DAY = 86400
+RULE_COUNT = 250
+
+
+class MockRuleList:
+    """blockiprule/list that, like the real API, returns only the last 7 days without a time range"""
+
+    def __init__(self, now: int):
+        self.total_offset = 0
+        self.rules = [
+            {
+                "id": rule_id,
+                "name": f"rule-{rule_id}",
+                "status": "block success",
+                "createTime": now - rule_id * DAY // 5,  # spread over ~50 days
+                "updateTime": now - rule_id * DAY // 5,
+                "blockIpRule": {"type": "SRC_IP", "view": [f"10.0.{rule_id // 200}.{rule_id % 200}"]},
+                "devices": [{"devId": 57, "devName": "物联网安全网关"}],
+            }
+            for rule_id in range(RULE_COUNT)
+        ]
+        self.now = now
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        start = body.get("startTimestamp", self.now - 7 * DAY)
+        end = body.get("endTimestamp", self.now + DAY)
+        items = [rule for rule in self.rules if start <= rule["createTime"] <= end]
+        for search in body.get("searchInfos") or []:
+            items = [rule for rule in items if search["fieldValue"] in rule["blockIpRule"]["view"]]
+        items.sort(key=lambda rule: rule["updateTime"], reverse=True)
+        size, page = body["pageSize"], body["page"]
+        return httpx.Response(200, json={"code": "Success", "data": {
+            "item": items[(page - 1) * size:page * size],
+            "total": len(items) + self.total_offset,
+        }})
+
+
+def _service():
+    return IpBlockService(base_url=XDR_BASE_URL, ak="test-ak", sk="test-sk")
+
+
+def test_full_sync_includes_rules_older_than_seven_days(mock_xdr):
+    mock_xdr(MockRuleList(int(time.time())))
+    index = BlockRuleIndex(_service().search_rules)
+
+    assert asyncio.run(index.refresh(full=True))
+    assert index.rule_count == RULE_COUNT
+    assert index.blocked_count == RULE_COUNT
+    # Rule 240 was created ~48 days ago
+    assert [rule["id"] for rule in index.lookup("10.0.1.40")] == [240]
+
+
+def test_full_sync_rejects_incomplete_snapshot(mock_xdr):
+    rule_list = MockRuleList(int(time.time()))
+    rule_list.total_offset = 1  # a rule appeared after the first page was read
+    mock_xdr(rule_list)
+    index = BlockRuleIndex(_service().search_rules)
+
+    assert not asyncio.run(index.refresh(full=True))
+    assert not index.ready
+
+
+def test_live_check_finds_old_rule(mock_xdr):
+    mock_xdr(MockRuleList(int(time.time())))
+
+    result = asyncio.run(_service().check_ip_blocked("10.0.1.40", fresh=True))
+
+    assert result["success"] and result["blocked"]
+
+
+def test_count_blocked_includes_old_rules(mock_xdr, auth_code, monkeypatch):
+    mock_xdr(MockRuleList(int(time.time())))
+    registry = BlockRuleIndexRegistry()
+    monkeypatch.setattr(ipblock_service, "block_rule_index_registry", registry)
+
+    async def scenario():
+        try:
+            return await IpBlockService(base_url=XDR_BASE_URL, auth_code=auth_code).count_blocked()
+        finally:
+            await registry.aclose()
+
+    result = asyncio.run(scenario())
+
+    assert result == {"success": True, "blocked_ips": RULE_COUNT, "rules": RULE_COUNT}
+
+
+async def _no_rules(**kwargs):
+    return {"success": True, "data": {"item": [], "total": 0}}
+
+
+def test_registry_evicts_least_recently_used_index():
+    async def scenario():
+        registry = BlockRuleIndexRegistry(max_indexes=2)
+        first = registry.get("https://a.test", "code", _no_rules)
+        await asyncio.sleep(0)
+        registry.get("https://b.test", "code", _no_rules)
+        registry.get("https://c.test", "code", _no_rules)
+        evicted = first._task is None
+        size = len(registry)
+        await registry.aclose()
+        return size, evicted
+
+    assert asyncio.run(scenario()) == (2, True)
+
+
+def test_registry_drops_idle_index(monkeypatch):
+    monkeypatch.setattr(block_rule_index, "BLOCK_RULE_REFRESH_INTERVAL", 0.01)
+    monkeypatch.setattr(block_rule_index, "BLOCK_RULE_IDLE_TIMEOUT", 0.0)
+
+    async def scenario():
+        registry = BlockRuleIndexRegistry()
+        registry.get("https://a.test", "code", _no_rules)
+        await asyncio.sleep(0.05)
+        return len(registry)
+
+    assert asyncio.run(scenario()) == 0
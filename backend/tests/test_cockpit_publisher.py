@@ -0,0 +1,39 @@
+"""
+A cockpit subscription that fails before it is registered leaves no feed behind
+"""
+
+import asyncio
+
+import pytest
+
+from app.services import cockpit_publisher as publisher_module
+from app.services.cockpit_publisher import CockpitFeed, CockpitPublisher
+
+
+class FakeWebSocket:
+    def __init__(self, fail_send: bool = False):
+        self.fail_send = fail_send
+        self.sent = []
+
+    async def send_json(self, message):
+        if self.fail_send:
+            raise RuntimeError("connection closed")
+        self.sent.append(message)
+
+
+@pytest.mark.parametrize("failing_step", ["snapshot", "send"])
+def test_failed_subscribe_drops_the_feed(monkeypatch, failing_step):
+    async def snapshot(self):
+        if failing_step == "snapshot":
+            raise RuntimeError("appliance unavailable")
+        return {"statistics": {}, "monitoring": {}}
+
+    monkeypatch.setattr(CockpitFeed, "snapshot", snapshot)
+    publisher = CockpitPublisher()
+    websocket = FakeWebSocket(fail_send=failing_step == "send")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(publisher.subscribe(websocket, "test-auth-code", "https://xdr.test"))
+
+    assert publisher._feeds == {}
+    assert not publisher_module.manager.subscriber_count(publisher.topic("test-auth-code", "https://xdr.test", "week"))
@@ -0,0 +1,57 @@
+"""
+A failed cockpit refresh raises instead of returning zero/"offline" defaults, so the cached value survives
+"""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.services.dashboard_service import DashboardService, dashboard_result_cache, incident_count_cache
+from conftest import XDR_BASE_URL
+
+
+INCIDENT = {"uuId": "incident-1", "severity": 4, "name": "Brute force", "endTime": 1700000000}
+
+
+def test_failed_refresh_keeps_the_cached_value(mock_xdr, auth_code):
+    state = {"healthy": True}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if not state["healthy"]:
+            return httpx.Response(503)
+        return httpx.Response(200, json={"code": "Success", "data": {"total": 1, "item": [INCIDENT]}})
+
+    mock_xdr(handler)
+    dashboard_result_cache.clear()
+    service = DashboardService()
+
+    async def scenario():
+        first = await service.get_monitoring(auth_code, XDR_BASE_URL)
+        assert first["activeAlerts"] == 1
+
+        # Age the entry into its stale window, then refresh against a failing appliance
+        state["healthy"] = False
+        key = service._cache_key("monitoring", auth_code, XDR_BASE_URL)
+        loaded_at, ttl, stale_ttl, value = dashboard_result_cache._entries[key]
+        dashboard_result_cache._entries[key] = (loaded_at - ttl - 1, ttl, stale_ttl, value)
+
+        assert await service.get_monitoring(auth_code, XDR_BASE_URL) is first
+        while dashboard_result_cache._inflight:
+            await asyncio.sleep(0.01)
+        return first, dashboard_result_cache._entries[key][3]
+
+    first, cached = asyncio.run(scenario())
+    assert cached is first
+
+
+def test_statistics_load_raises_when_the_appliance_fails(mock_xdr, auth_code):
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"code": "Failed", "message": "unavailable"})
+
+    mock_xdr(handler)
+    incident_count_cache.clear()
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(DashboardService()._load_statistics(auth_code, XDR_BASE_URL))
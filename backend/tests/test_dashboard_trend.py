@@ -0,0 +1,38 @@
+"""
+Cockpit trend/distribution counts bucket incidents by creation time and only refetch today
+"""
+
+import asyncio
+import json
+import time
+
+import httpx
+
+from app.services.dashboard_service import DashboardService, incident_count_cache
+from conftest import XDR_BASE_URL
+
+
+def test_trend_counts_use_a_fixed_time_field(mock_xdr, auth_code):
+    requested = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        requested.append(body)
+        return httpx.Response(200, json={"code": "Success", "data": {"total": 3, "item": []}})
+
+    mock_xdr(handler)
+    incident_count_cache.clear()
+    service = DashboardService()
+
+    trend, distribution = asyncio.run(service._fetch_trend_and_distribution(auth_code, XDR_BASE_URL, days=7))
+
+    assert [day["count"] for day in trend] == [3] * 7
+    assert distribution["severity"]["严重"] == 6
+    assert requested and all(body["timeField"] == "insertTime" for body in requested)
+
+    # Warm: closed days and the closed part of the window come from the cache
+    requested.clear()
+    asyncio.run(service._fetch_trend_and_distribution(auth_code, XDR_BASE_URL, days=7))
+
+    unsettled = time.time() - incident_count_cache.settle_seconds - 5
+    assert requested and all(body["endTimestamp"] > unsettled for body in requested)
@@ -0,0 +1,55 @@
+"""
+XDR calls must not block the event loop while they wait on the appliance
+"""
+
+import asyncio
+import time
+
+import httpx
+
+from app.services.ipblock_service import IpBlockService
+from conftest import XDR_BASE_URL
+
+
+SLOW_CALLS = 50
+XDR_DELAY = 0.2  # seconds per mock XDR response
+TICK = 0.01
+MAX_LOOP_LAG = 0.1  # seconds a tick may be late
+
+
+async def _slow_devices(request: httpx.Request) -> httpx.Response:
+    await asyncio.sleep(XDR_DELAY)
+    return httpx.Response(200, json={"code": "Success", "data": {"item": [
+        {"deviceId": 57, "deviceName": "物联网安全网关", "deviceType": "AF", "deviceStatus": "online"}
+    ]}})
+
+
+async def _measure_lag(stop: asyncio.Event) -> float:
+    """Largest delay between when a tick was due and when it ran"""
+    worst = 0.0
+    while not stop.is_set():
+        due = time.perf_counter() + TICK
+        await asyncio.sleep(TICK)
+        worst = max(worst, time.perf_counter() - due)
+    return worst
+
+
+def test_concurrent_slow_xdr_calls_keep_loop_responsive(mock_xdr):
+    mock_xdr(_slow_devices)
+    service = IpBlockService(base_url=XDR_BASE_URL, ak="test-ak", sk="test-sk")
+
+    async def scenario():
+        stop = asyncio.Event()
+        monitor = asyncio.create_task(_measure_lag(stop))
+        started = time.perf_counter()
+        results = await asyncio.gather(*(service.get_available_devices("AF") for _ in range(SLOW_CALLS)))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        return results, elapsed, await monitor
+
+    results, elapsed, worst_lag = asyncio.run(scenario())
+
+    assert all(result["success"] for result in results)
+    assert worst_lag < MAX_LOOP_LAG
+    # Calls overlap (capped per appliance) instead of running one after another
+    assert elapsed < SLOW_CALLS * XDR_DELAY / 2
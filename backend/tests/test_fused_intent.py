@@ -0,0 +1,41 @@
+"""
+A tool-intent turn the local router misses costs exactly one LLM call (fused intent + params)
+"""
+
+import asyncio
+import json
+
+from app.services import llm_service
+from app.services.llm_service import LLMService
+
+
+def test_tool_intent_miss_costs_one_llm_call(monkeypatch):
+    calls = []
+    reply = {
+        "intent": "get_incidents",
+        "confidence": 0.95,
+        "params": {"severities": [3], "time_range_days": 7}
+    }
+
+    async def chat(self, messages, provider, api_key, base_url=None, **kwargs):
+        calls.append(messages)
+        return {"success": True, "message": json.dumps(reply)}
+
+    handled = {}
+
+    async def handle(self, user_message, messages, provider, api_key, base_url=None,
+                     auth_code=None, flux_base_url=None, extracted_params=None):
+        handled["params"] = extracted_params
+        return {"success": True, "type": "text", "message": "ok"}
+
+    monkeypatch.setattr(LLMService, "chat", chat)
+    monkeypatch.setattr(LLMService, "_handle_get_incidents_intent", handle)
+    monkeypatch.setattr(llm_service.intent_router, "route", lambda message: None)
+    monkeypatch.setattr(llm_service.intent_router, "learn", lambda message, intent, confidence: None)
+
+    messages = [{"role": "user", "content": "最近7天的高危事件"}]
+    result = asyncio.run(LLMService()._route_intent(messages, "zhipu", "test-key"))
+
+    assert result["message"] == "ok"
+    assert len(calls) == 1
+    assert handled["params"] is not None
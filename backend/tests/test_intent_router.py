@@ -0,0 +1,144 @@
+"""
+Local intent routing, online learning and speculative parameter extraction
+"""
+
+import asyncio
+
+import pytest
+
+from app.services import llm_service
+from app.services.intent_router import (
+    GENERAL_CHAT_INTENT,
+    ROUTER_LEARN_MIN_CONFIDENCE,
+    ROUTER_REBUILD_EVERY,
+    IntentRouter,
+    SpeculationStats
+)
+from app.services.llm_service import LLMService
+from app.services.skills_registry import SKILLS_REGISTRY
+
+
+@pytest.mark.parametrize("skill", SKILLS_REGISTRY, ids=lambda skill: skill["intent"])
+def test_registry_example_routes_to_its_intent(skill):
+    router = IntentRouter()
+    prompt = skill["examplePrompts"][0]["chinese"]
+
+    result = router.route(prompt)
+
+    assert result is not None and result["intent"] == skill["intent"]
+    assert result["source"] == "local"
+
+
+def test_unrelated_text_falls_back_to_the_llm():
+    router = IntentRouter()
+
+    assert router.route("今天天气怎么样") is None
+    assert router.route("讲个笑话") is None
+    assert router.route("你好")["intent"] == GENERAL_CHAT_INTENT
+    assert router.fallbacks == 2 and router.local_hits == 1
+
+
+def test_learn_ignores_low_confidence_and_unknown_intents():
+    router = IntentRouter()
+
+    router.learn("帮我看看这台主机", "get_incidents", ROUTER_LEARN_MIN_CONFIDENCE - 0.01)
+    router.learn("帮我看看这台主机", "no_such_intent", 1.0)
+    router.learn("", "get_incidents", 1.0)
+    assert len(router._learned) == 0
+
+    router.learn("帮我看看这台主机", "get_incidents", ROUTER_LEARN_MIN_CONFIDENCE)
+    assert list(router._learned) == [("帮我看看这台主机", "get_incidents")]
+
+
+def test_model_rebuilds_after_enough_learned_messages():
+    router = IntentRouter()
+    message = "qzxv wkjb"
+    assert router.route(message) is None
+
+    for _ in range(ROUTER_REBUILD_EVERY - 1):
+        router.learn(message, "get_log_count", 1.0)
+    assert router.route(message) is None  # not rebuilt yet
+
+    router.learn(message, "get_log_count", 1.0)
+    assert router.route(message)["intent"] == "get_log_count"
+    assert router._pending == 0
+
+
+def test_speculation_hit_reuses_the_kept_task(monkeypatch):
+    stats = SpeculationStats()
+    monkeypatch.setattr(llm_service, "speculation_stats", stats)
+    calls = {"proof": 0, "incidents": 0}
+    cancelled = []
+
+    async def extract_proof(*args):
+        calls["proof"] += 1
+        return {"incident_id": "incident-abc", "source": "speculative"}
+
+    async def extract_incidents(*args):
+        calls["incidents"] += 1
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            cancelled.append("get_incidents")
+            raise
+
+    async def detect(*args):
+        await asyncio.sleep(0.01)
+        return {"intent": "get_incident_proof", "confidence": 0.95, "params": {"source": "fused"}}
+
+    service = LLMService()
+    monkeypatch.setattr(service, "_param_extractors", lambda: {
+        "get_incident_proof": extract_proof,
+        "get_incidents": extract_incidents
+    })
+    monkeypatch.setattr(service, "_detect_intent_with_params", detect)
+
+    async def scenario():
+        result = await service._detect_intent_speculatively(
+            "查询事件 incident-abc 的举证", [], "zhipu", "test-key", None,
+            ["get_incident_proof", "get_incidents"]
+        )
+        await asyncio.sleep(0)
+        return result
+
+    result = asyncio.run(scenario())
+
+    assert result["intent"] == "get_incident_proof"
+    assert result["params"]["source"] == "speculative"
+    assert calls == {"proof": 1, "incidents": 1}
+    assert cancelled == ["get_incidents"]
+    assert stats.snapshot() == {
+        "turns": 1, "launched": 2, "hits": 1, "misses": 0, "cancelled": 1, "hitRate": 100.0
+    }
+
+
+def test_speculation_miss_uses_the_fused_params(monkeypatch):
+    stats = SpeculationStats()
+    monkeypatch.setattr(llm_service, "speculation_stats", stats)
+
+    async def extract(*args):
+        return {"source": "speculative"}
+
+    async def detect(*args):
+        return {"intent": "get_log_count", "confidence": 0.9, "params": {"source": "fused"}}
+
+    service = LLMService()
+    monkeypatch.setattr(service, "_param_extractors", lambda: {"get_incident_proof": extract, "get_incidents": extract})
+    monkeypatch.setattr(service, "_detect_intent_with_params", detect)
+
+    result = asyncio.run(service._detect_intent_speculatively(
+        "message", [], "zhipu", "test-key", None, ["get_incident_proof", "get_incidents"]
+    ))
+
+    assert result["params"] == {"source": "fused"}
+    assert stats.misses == 1 and stats.cancelled == 2
+
+
+def test_speculation_only_between_close_skills():
+    service = LLMService()
+
+    # Small talk and a single clear skill go to the fused call alone
+    assert service._speculation_candidates("今天天气怎么样") == []
+    assert service._speculation_candidates("hi there") == []
+    assert service._speculation_candidates("统计最近一周日志有多少") == []
+    assert service._speculation_candidates("查询事件 incident-abc 的举证") == ["get_incident_proof", "get_incidents"]
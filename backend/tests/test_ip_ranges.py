@@ -0,0 +1,61 @@
+"""
+IpRangeIndex containment lookups against a brute-force scan
+"""
+
+import ipaddress
+import random
+
+from app.utils.ip_ranges import IpRangeIndex, parse_ip_interval
+
+
+def _brute_force(intervals, ip_address):
+    version, point, _ = parse_ip_interval(ip_address)
+    return {key for key, (interval_version, start, end) in intervals if interval_version == version and start <= point <= end}
+
+
+def _random_expression(rng):
+    base = ipaddress.IPv4Address(rng.choice([0x0A000000, 0xC0A80000]) + rng.getrandbits(12))
+    shape = rng.random()
+    if shape < 0.4:
+        return f"{base}/{rng.randint(16, 32)}"
+    if shape < 0.7:
+        return f"{base}-{ipaddress.IPv4Address(int(base) + rng.randint(0, 600))}"
+    return str(base)
+
+
+def test_lookup_matches_brute_force_with_overlaps_and_removals():
+    rng = random.Random(7)
+    index = IpRangeIndex()
+    rules = {}
+    for key in range(300):
+        rules[key] = [_random_expression(rng) for _ in range(rng.randint(1, 3))]
+        for value in rules[key]:
+            index.add(key, value)
+    for key in rng.sample(sorted(rules), 100):
+        index.remove(key)
+        del rules[key]
+    index.add("v6", "2001:db8::/32")
+    rules["v6"] = ["2001:db8::/32"]
+
+    intervals = [(key, parse_ip_interval(value)) for key, values in rules.items() for value in values]
+    probes = [str(ipaddress.IPv4Address(rng.choice([0x0A000000, 0xC0A80000]) + rng.getrandbits(13))) for _ in range(2000)]
+    probes += ["2001:db8::1", "2001:db9::1", "10.0.0.0", "192.168.15.255"]
+    for ip_address in probes:
+        assert index.lookup(ip_address) == _brute_force(intervals, ip_address)
+
+
+def test_nested_ranges_are_stored_once():
+    index = IpRangeIndex()
+    nested = 2000
+    base = int(ipaddress.IPv4Address("10.0.0.0"))
+    for key in range(nested):
+        start = ipaddress.IPv4Address(base + key)
+        end = ipaddress.IPv4Address(base + 2 * nested - key)
+        index.add(key, f"{start}-{end}")
+
+    assert index.lookup("10.0.15.160") == {0}  # base + 4000: only the outermost range reaches it
+    assert index.lookup(str(ipaddress.IPv4Address(base + nested))) == set(range(nested))
+    assert index.lookup(str(ipaddress.IPv4Address(base + 10))) == set(range(11))
+
+    starts, ends, keys, max_ends = index._trees[4]
+    assert len(starts) == len(ends) == len(keys) == len(max_ends) == nested
@@ -0,0 +1,40 @@
+"""
+The anomaly detector scores closed days only; today's partial count is never queried or flagged
+"""
+
+import asyncio
+import json
+import time
+from datetime import date, datetime
+
+import httpx
+
+from app.services.log_anomaly_detector import log_anomaly_detector
+from app.services.log_count_cache import log_count_cache
+from app.services.network_logs_service import NetworkLogsService
+from conftest import XDR_BASE_URL
+
+
+def test_only_closed_days_are_scored(mock_xdr, auth_code):
+    spike_day = date.today().toordinal() - 3
+    requested = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        requested.append((body["startTimestamp"], body["endTimestamp"]))
+        day = date.fromtimestamp(body["startTimestamp"]).toordinal()
+        return httpx.Response(200, json={"code": "Success", "data": {"total": 10000 if day == spike_day else 1000}})
+
+    mock_xdr(handler)
+    log_count_cache.clear()
+    log_anomaly_detector.clear()
+
+    result = asyncio.run(NetworkLogsService().detect_anomalies(auth_code, XDR_BASE_URL, lookback_days=7))
+
+    assert result["success"]
+    anomalies = result["data"]["anomalies"]
+    assert [anomaly["date"] for anomaly in anomalies] == [date.fromordinal(spike_day).isoformat()]
+    assert "today" not in result["data"]
+    today_start = int(datetime.fromordinal(date.today().toordinal()).timestamp())
+    assert requested and all(end <= today_start for _, end in requested)
+    assert all(end <= time.time() for _, end in requested)
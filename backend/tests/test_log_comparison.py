@@ -0,0 +1,48 @@
+"""
+Shifted comparison windows reuse whole-day cache buckets and fetch their partial edges live
+"""
+
+import asyncio
+import json
+import time
+
+import httpx
+
+from app.services.log_count_cache import log_count_cache
+from app.services.network_logs_service import NetworkLogsService
+from conftest import XDR_BASE_URL
+
+
+DAY = 86400
+
+
+def test_comparison_windows_are_day_aligned(mock_xdr, auth_code):
+    requested = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        requested.append((body["startTimestamp"], body["endTimestamp"]))
+        # One log per second, so any split of a window sums to its length
+        return httpx.Response(200, json={"code": "Success", "data": {"total": body["endTimestamp"] - body["startTimestamp"]}})
+
+    mock_xdr(handler)
+    log_count_cache.clear()
+    service = NetworkLogsService()
+    end_ts = int(time.time()) - 3 * 3600
+    start_ts = end_ts - 7 * DAY
+    params = {"startTimestamp": start_ts, "endTimestamp": end_ts}
+
+    counts = asyncio.run(service._get_comparison(auth_code, XDR_BASE_URL, start_ts, end_ts, params))
+
+    assert counts == {"last_week": 7 * DAY, "last_month": 7 * DAY}
+    cached_days = len(log_count_cache)
+    assert cached_days <= 2 * 7
+
+    # Warm: only the partial first/last day of each shifted window is queried, and nothing new is cached
+    requested.clear()
+    counts = asyncio.run(service._get_comparison(auth_code, XDR_BASE_URL, start_ts, end_ts, params))
+
+    assert counts == {"last_week": 7 * DAY, "last_month": 7 * DAY}
+    assert len(requested) <= 4
+    assert all(end - start < DAY for start, end in requested)
+    assert len(log_count_cache) == cached_days
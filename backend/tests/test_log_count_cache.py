@@ -0,0 +1,67 @@
+"""
+Log count cache: closed days are kept until evicted and fetched once across concurrent fan-outs
+"""
+
+import asyncio
+import json
+import time
+from collections import Counter
+
+import httpx
+
+from app.services.log_count_cache import LogCountCache, log_count_cache
+from app.services.network_logs_service import NetworkLogsService
+from conftest import XDR_BASE_URL
+
+
+DAY = 86400
+
+
+def _closed_key(cache: LogCountCache, day: int):
+    start = int(time.time()) - (day + 2) * DAY
+    return cache.key(XDR_BASE_URL, "code", {"startTimestamp": start, "endTimestamp": start + DAY})
+
+
+def test_closed_days_stay_until_evicted_by_size():
+    cache = LogCountCache(max_size=2)
+    keys = [_closed_key(cache, day) for day in range(3)]
+    for day, key in enumerate(keys):
+        cache.put(key, day)
+
+    assert cache.get(keys[0]) is None
+    assert [cache.get(key) for key in keys[1:]] == [1, 2]
+
+
+def test_trend_and_series_share_cold_day_fetches(mock_xdr, auth_code):
+    windows = Counter()
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        windows[(body["startTimestamp"], body["endTimestamp"])] += 1
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json={"code": "Success", "data": {"total": 100}})
+
+    mock_xdr(handler)
+    log_count_cache.clear()
+    service = NetworkLogsService()
+    end_ts = int(time.time())
+    start_ts = end_ts - 30 * DAY
+    params = {"startTimestamp": start_ts, "endTimestamp": end_ts, "severities": [3]}
+
+    async def scenario():
+        return await asyncio.gather(
+            service._get_trend(auth_code, XDR_BASE_URL, start_ts, end_ts, params),
+            service._get_series_anomalies(auth_code, XDR_BASE_URL, start_ts, end_ts, params),
+        )
+
+    trend, _ = asyncio.run(scenario())
+
+    assert len(trend) >= 30
+    closed = {window: fetches for window, fetches in windows.items() if window[1] <= end_ts - log_count_cache.settle_seconds}
+    assert len(closed) >= 29
+    assert set(closed.values()) == {1}
+
+    # A warm repeat only refetches the still-open windows
+    windows.clear()
+    asyncio.run(service._get_trend(auth_code, XDR_BASE_URL, start_ts, end_ts, params))
+    assert sum(windows.values()) <= 2
@@ -0,0 +1,58 @@
+"""
+Signature payload transform: counting sort must match the original per-byte sort
+"""
+
+import json
+import random
+import string
+import struct
+
+import pytest
+
+from app.utils.sdk.aksk_py3 import Signature
+
+
+def _legacy_transform(payload: str) -> bytes:
+    """The original implementation, minus the final SHA-256"""
+    byte_values = [struct.unpack('b', bytes([byte]))[0] for byte in payload.encode("utf-8")]
+    byte_values.sort()
+    new_payload = bytearray()
+    for byte_value in byte_values:
+        new_payload.append(byte_value)
+    return bytes(byte for byte in new_payload if byte != 32)
+
+
+@pytest.fixture
+def transform(monkeypatch):
+    """Signature.__payload_transform returning the transformed bytes instead of their hash"""
+    monkeypatch.setattr(Signature, "_Signature__sha256_hex_upper", staticmethod(bytes))
+    signature = Signature(ak="test-ak", sk="test-sk")
+    return signature._Signature__payload_transform
+
+
+def _random_payloads(count: int):
+    rng = random.Random(20261017)
+    ascii_chars = string.printable + "\x00\x01\x7f"
+    for _ in range(count):
+        yield "".join(rng.choice(ascii_chars) for _ in range(rng.randint(0, 4096)))
+    for _ in range(count):
+        body = {
+            "uuIds": [f"incident-{rng.getrandbits(128):032x}" for _ in range(rng.randint(0, 200))],
+            "dealStatus": rng.choice([0, 10, 40]),
+            "dealComment": "批量处置",  # json.dumps escapes non-ASCII, as signed request bodies do
+        }
+        yield json.dumps(body)
+
+
+def test_matches_legacy_transform_byte_for_byte(transform):
+    for payload in ["", " ", "   ", "{}", "a b  c"]:
+        assert transform(payload) == _legacy_transform(payload)
+    for payload in _random_payloads(100):
+        assert transform(payload) == _legacy_transform(payload)
+
+
+def test_non_ascii_payload_raises_like_legacy(transform):
+    with pytest.raises(ValueError):
+        _legacy_transform("封禁原因")
+    with pytest.raises(ValueError):
+        transform("封禁原因")
@@ -33,6 +33,7 @@ import { IncidentUpdateTable } from './IncidentUpdateTable';
 import { IncidentEntitiesTable } from './IncidentEntitiesTable';
 import { SkillsPanel } from './SkillsPanel';
 import { ScenarioProgressDialog } from './ScenarioProgressDialog';
+import { streamChat } from '../../services/chatService';
 import type { AssetParams } from '../../types/asset';
 import type { AssetSummary } from '../../types/asset';
 import type { IPBlockParams, IPBlockStatus, IPBlockSummary } from '../../types/ipblock';
@@ -378,13 +379,10 @@ export const ChatInterface = () => {
       const fluxBaseUrl = localStorage.getItem('flux_base_url');
       const requestMessages = buildRequestMessages(messages, userMessage);
 
-      // 调用后端API
-      const response = await fetch('http://localhost:8000/api/v1/llm/chat', {
-        method: 'POST',
-        headers: {
-          'Content-Type': 'application/json',
-        },
-        body: JSON.stringify({
+      // 调用后端流式API：普通回复逐段显示，技能结果在最后一次性返回
+      const streaming: { messageId: string | null } = { messageId: null };
+      const data = await streamChat(
+        {
           messages: requestMessages.map(m => ({
             role: m.role,
             content: m.content,
@@ -394,14 +392,19 @@ export const ChatInterface = () => {
           base_url: llmConfig.baseUrl,
           auth_code: fluxAuthCode,  // 新增：Flux认证码
           flux_base_url: fluxBaseUrl,  // 新增：Flux API地址
-        }),
-      });
-
-      if (!response.ok) {
-        throw new Error('API请求失败');
-      }
-
-      const data = await response.json();
+        },
+        (content) => {
+          if (!streaming.messageId) {
+            const id = (Date.now() + 1).toString();
+            streaming.messageId = id;
+            setLoading(false);
+            setMessages((prev) => [...prev, { id, role: 'assistant', content, timestamp: new Date() }]);
+          } else {
+            const id = streaming.messageId;
+            setMessages((prev) => prev.map((m) => (m.id === id ? { ...m, content: m.content + content } : m)));
+          }
+        }
+      );
 
       // 检查响应类型
       if (data.type === 'asset_confirmation' && data.asset_params) {
@@ -604,15 +607,21 @@ export const ChatInterface = () => {
           full_data: data
         });
 
-        // 普通消息
-        const assistantMessage: Message = {
-          id: (Date.now() + 1).toString(),
-          role: 'assistant',
-          content: data.message || '抱歉,我现在无法回复。',
-          timestamp: new Date(),
-        };
+        if (streaming.messageId) {
+          // 流式回复已逐段显示，用最终完整内容校正
+          const id = streaming.messageId;
+          setMessages((prev) => prev.map((m) => (m.id === id ? { ...m, content: data.message || m.content } : m)));
+        } else {
+          // 普通消息
+          const assistantMessage: Message = {
+            id: (Date.now() + 1).toString(),
+            role: 'assistant',
+            content: data.message || '抱歉,我现在无法回复。',
+            timestamp: new Date(),
+          };
 
-        setMessages((prev) => [...prev, assistantMessage]);
+          setMessages((prev) => [...prev, assistantMessage]);
+        }
       }
     } catch (error: any) {
       const errorMessage: Message = {
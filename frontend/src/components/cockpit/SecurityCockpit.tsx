@@ -14,13 +14,15 @@ import {
   Alert,
   Fab,
   Toolbar,
+  ToggleButton,
+  ToggleButtonGroup,
 } from '@mui/material';
 import { Chat as ChatIcon } from '@mui/icons-material';
 import { ScenarioCardsPanel } from './panels/ScenarioCardsPanel';
 import { StatisticsPanel } from './panels/StatisticsPanel';
 import { MonitoringPanel } from './panels/MonitoringPanel';
-import { fetchCockpitData } from '../../services/cockpitService';
-import type { DashboardStatistics, MonitoringData } from '../../types/cockpit';
+import { fetchCockpitData, subscribeCockpitUpdates } from '../../services/cockpitService';
+import type { CockpitStreamMessage, DashboardStatistics, MonitoringData } from '../../types/cockpit';
 import { cockpitTheme } from '../../theme';
 
 interface SecurityCockpitProps {
@@ -28,19 +30,21 @@ interface SecurityCockpitProps {
   onModeChange: () => void;
 }
 
-const REFRESH_INTERVAL = 30000; // 30 seconds
+const REFRESH_INTERVAL = 30000; // 30 seconds (polling fallback when push is unavailable)
 
 export function SecurityCockpit({ onScenarioStart, onModeChange }: SecurityCockpitProps) {
   const [statistics, setStatistics] = useState<DashboardStatistics | null>(null);
   const [monitoring, setMonitoring] = useState<MonitoringData | null>(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
+  const [streaming, setStreaming] = useState(false);
+  const [timeRange, setTimeRange] = useState<'week' | 'month'>('week');
 
   // Fetch cockpit data
   const fetchData = useCallback(async () => {
     try {
       setError(null);
-      const data = await fetchCockpitData('week');
+      const data = await fetchCockpitData(timeRange);
       setStatistics(data.statistics);
       setMonitoring(data.monitoring);
     } catch (err) {
@@ -70,21 +74,44 @@ export function SecurityCockpit({ onScenarioStart, onModeChange }: SecurityCockp
     } finally {
       setLoading(false);
     }
-  }, []);
+  }, [timeRange]);
 
   // Initial data fetch
   useEffect(() => {
     fetchData();
   }, [fetchData]);
 
-  // Auto-refresh data
+  // Push updates: snapshot first, then changed fields only (resubscribes when the time range changes)
   useEffect(() => {
+    const handleMessage = (message: CockpitStreamMessage) => {
+      if (message.type === 'error') {
+        setStreaming(false);
+        return;
+      }
+      setStreaming(true);
+      setError(null);
+      setLoading(false);
+      if (message.statistics) {
+        setStatistics((prev) => ({ ...prev, ...message.statistics } as DashboardStatistics));
+      }
+      if (message.monitoring) {
+        setMonitoring((prev) => ({ ...prev, ...message.monitoring } as MonitoringData));
+      }
+    };
+
+    return subscribeCockpitUpdates(timeRange, handleMessage, () => setStreaming(false));
+  }, [timeRange]);
+
+  // Auto-refresh data (only while push updates are unavailable)
+  useEffect(() => {
+    if (streaming) return;
+
     const interval = setInterval(() => {
       fetchData();
     }, REFRESH_INTERVAL);
 
     return () => clearInterval(interval);
-  }, [fetchData]);
+  }, [fetchData, streaming]);
 
   // Handle scenario start
   const handleScenarioStart = (scenarioId: string) => {
@@ -125,14 +152,27 @@ export function SecurityCockpit({ onScenarioStart, onModeChange }: SecurityCockp
               </Typography>
             </Box>
 
-            {/* Switch to Chat Mode Button */}
-            <Button
-              variant="outlined"
-              startIcon={<ChatIcon />}
-              onClick={onModeChange}
-            >
-              切换到对话模式
-            </Button>
+            <Box sx={{ display: 'flex', alignItems: 'center', gap: 2 }}>
+              {/* Statistics Time Range */}
+              <ToggleButtonGroup
+                size="small"
+                exclusive
+                value={timeRange}
+                onChange={(_, value) => value && setTimeRange(value)}
+              >
+                <ToggleButton value="week">近7天</ToggleButton>
+                <ToggleButton value="month">近30天</ToggleButton>
+              </ToggleButtonGroup>
+
+              {/* Switch to Chat Mode Button */}
+              <Button
+                variant="outlined"
+                startIcon={<ChatIcon />}
+                onClick={onModeChange}
+              >
+                切换到对话模式
+              </Button>
+            </Box>
           </Container>
         </Toolbar>
       </Box>
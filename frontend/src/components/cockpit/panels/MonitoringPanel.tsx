@@ -94,7 +94,7 @@ export function MonitoringPanel({ monitoring, loading = false }: MonitoringPanel
             {monitoring.performanceMetrics && (
               <Grid item xs={12} sm={6}>
                 <StatCard
-                  title="API延迟"
+                  title="API延迟 (P50)"
                   value={monitoring.performanceMetrics.apiLatency}
                   unit="ms"
                   icon={<Speed />}
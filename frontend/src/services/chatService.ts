@@ -0,0 +1,88 @@
+/**
+ * Chat Service
+ * Streams chat replies from the backend over Server-Sent Events
+ */
+
+export interface ChatRequestBody {
+  messages: { role: string; content: string }[];
+  provider: string;
+  api_key: string;
+  base_url?: string;
+  auth_code?: string | null;
+  flux_base_url?: string | null;
+}
+
+/**
+ * Send a chat turn to /api/v1/llm/chat/stream
+ *
+ * Plain chat replies arrive as `token` events and are passed to onToken as they
+ * stream in. Skill results (incident lists, block confirmations, ...) and the
+ * final text arrive as one `result` event with the same shape as /api/v1/llm/chat.
+ *
+ * @param body - Chat request (same as /api/v1/llm/chat)
+ * @param onToken - Called with each streamed text fragment
+ * @returns The final `result` payload
+ */
+export async function streamChat(
+  body: ChatRequestBody,
+  onToken: (content: string) => void
+): Promise<any> {
+  const response = await fetch('http://localhost:8000/api/v1/llm/chat/stream', {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+    },
+    body: JSON.stringify(body),
+  });
+
+  if (!response.ok || !response.body) {
+    throw new Error('API请求失败');
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  let result: any = null;
+
+  const handleEvent = (block: string) => {
+    let event = 'message';
+    const dataLines: string[] = [];
+    for (const line of block.split('\n')) {
+      if (line.startsWith('event:')) {
+        event = line.slice(6).trim();
+      } else if (line.startsWith('data:')) {
+        dataLines.push(line.slice(5).trimStart());
+      }
+    }
+    if (dataLines.length === 0) return;
+
+    const data = JSON.parse(dataLines.join('\n'));
+    if (event === 'token') {
+      onToken(data.content || '');
+    } else if (event === 'result') {
+      result = data;
+    }
+  };
+
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) break;
+
+    buffer += decoder.decode(value, { stream: true });
+    let separator = buffer.indexOf('\n\n');
+    while (separator !== -1) {
+      handleEvent(buffer.slice(0, separator));
+      buffer = buffer.slice(separator + 2);
+      separator = buffer.indexOf('\n\n');
+    }
+  }
+
+  if (buffer.trim()) {
+    handleEvent(buffer);
+  }
+
+  if (!result) {
+    throw new Error('响应意外中断');
+  }
+  return result;
+}
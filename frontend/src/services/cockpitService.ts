@@ -4,6 +4,7 @@
  */
 
 import type {
+  CockpitStreamMessage,
   DashboardStatistics,
   DashboardStatisticsResponse,
   MonitoringData,
@@ -141,3 +142,88 @@ export async function fetchCockpitData(
     throw error;
   }
 }
+
+// Reconnect backoff for the cockpit stream (doubles per failed attempt, with jitter)
+const RECONNECT_BASE_DELAY = 1000;
+const RECONNECT_MAX_DELAY = 30000;
+
+/**
+ * Subscribe to cockpit updates pushed by the backend
+ *
+ * The server sends a full snapshot first, then only changed fields.
+ * One server-side poller per appliance serves every subscribed cockpit.
+ * A dropped connection is reopened with exponential backoff (and a fresh
+ * snapshot) until the subscription is closed.
+ *
+ * @param timeRange - Time range for statistics ('week' | 'month')
+ * @param onMessage - Called with each snapshot/delta message
+ * @param onClose - Called whenever the stream drops (callers can poll until the next snapshot)
+ * @param authCode - Flux authentication code
+ * @param baseUrl - Flux API base URL
+ * @returns Function that closes the subscription
+ */
+export function subscribeCockpitUpdates(
+  timeRange: 'week' | 'month',
+  onMessage: (message: CockpitStreamMessage) => void,
+  onClose: () => void,
+  authCode?: string,
+  baseUrl?: string
+): () => void {
+  const effectiveAuthCode = authCode || localStorage.getItem('flux_auth_code');
+  const effectiveBaseUrl = baseUrl || localStorage.getItem('flux_base_url');
+
+  if (!effectiveAuthCode || !effectiveBaseUrl) {
+    onClose();
+    return () => {};
+  }
+
+  let ws: WebSocket | null = null;
+  let closedByClient = false;
+  let attempts = 0;
+  let reconnectTimer: ReturnType<typeof setTimeout> | undefined;
+
+  const connect = () => {
+    const socket = new WebSocket('ws://localhost:8000/api/v1/dashboard/ws');
+    ws = socket;
+
+    socket.onopen = () => {
+      // Credentials go in the first message, not the URL
+      socket.send(JSON.stringify({
+        type: 'subscribe',
+        auth_code: effectiveAuthCode,
+        base_url: effectiveBaseUrl,
+        time_range: timeRange,
+      }));
+    };
+
+    socket.onmessage = (event) => {
+      try {
+        const message: CockpitStreamMessage = JSON.parse(event.data);
+        if (message.type === 'snapshot') {
+          attempts = 0;
+        }
+        onMessage(message);
+      } catch (error) {
+        console.error('Failed to parse cockpit update:', error);
+      }
+    };
+
+    socket.onclose = (event) => {
+      if (closedByClient) return;
+      onClose();
+      // 1008: the server rejected the subscribe request, retrying would not help
+      if (event.code === 1008) return;
+      const delay = Math.min(RECONNECT_BASE_DELAY * 2 ** attempts, RECONNECT_MAX_DELAY);
+      attempts += 1;
+      reconnectTimer = setTimeout(connect, delay * (0.5 + Math.random() / 2));
+    };
+  };
+
+  connect();
+
+  return () => {
+    closedByClient = true;
+    clearTimeout(reconnectTimer);
+    ws?.close();
+  };
+}
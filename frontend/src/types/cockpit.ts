@@ -67,9 +67,24 @@ export interface RecentIncident {
  * Performance metrics for monitoring
  */
 export interface PerformanceMetrics {
-  apiLatency: number;    // API延迟（毫秒）
+  apiLatency: number;    // API延迟P50（毫秒）
+  latencyP95?: number;   // API延迟P95（毫秒）
+  latencyP99?: number;   // API延迟P99（毫秒）
+  sampleCount?: number;  // 最近5分钟内的XDR调用次数
   successRate: number;   // 成功率（百分比）
   errorRate: number;     // 错误率（百分比）
+  endpoints?: Record<string, EndpointLatency>;  // 按接口统计
+}
+
+/**
+ * Latency percentiles of one XDR endpoint
+ */
+export interface EndpointLatency {
+  count: number;
+  p50: number;
+  p95: number;
+  p99: number;
+  errorRate: number;
 }
 
 /**
@@ -101,6 +116,17 @@ export interface MonitoringDataResponse {
   message?: string;
 }
 
+/**
+ * Message pushed over the cockpit WebSocket
+ * (snapshot carries full data, delta only the changed fields)
+ */
+export interface CockpitStreamMessage {
+  type: 'snapshot' | 'delta' | 'error';
+  statistics?: Partial<DashboardStatistics>;
+  monitoring?: Partial<MonitoringData>;
+  message?: string;
+}
+
 /**
  * Stat card props for displaying individual statistics
  */